@@ -1,9 +1,22 @@
-from backend.utils.vectorstore import create_vectorstore
+import argparse
+from backend.utils.vectorstore import create_vectorstore, INDEX_TYPES
+from backend.utils.vecfile import DTYPES
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the RAG vectorstore.")
+    parser.add_argument("--index", choices=INDEX_TYPES, default=None,
+                        help="search index: exact brute force or a faiss ANN index "
+                             "(default: keep the live store's)")
+    parser.add_argument("--dtype", choices=DTYPES, default=None,
+                        help="on-disk vector precision, int8 stores per-row scales "
+                             "(default: keep the live store's, else VECTOR_DTYPE)")
+    parser.add_argument("--full", action="store_true",
+                        help="re-embed every chunk instead of reusing unchanged ones")
+    args = parser.parse_args()
+
     try:
         print("Building vectorstore using local embeddings...")
-        create_vectorstore()
+        create_vectorstore(index_type=args.index, dtype=args.dtype, full=args.full)
         print("Vectorstore built successfully with local embeddings!")
     except Exception as e:
         print("Failed to build vectorstore:", e)
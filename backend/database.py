@@ -1,4 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
 from dotenv import load_dotenv
 import os
 import sys
@@ -16,3 +18,63 @@ print("[database] connecting to MongoDB ...", file=sys.stderr)
 client = AsyncIOMotorClient(MONGO_URL)
 db = client["shohoj_ticket"]
 users_collection = db["users"]
+tickets_collection = db["tickets"]
+
+
+# Indexes the app relies on; created (idempotently) at startup.
+# users.email is unique so signup can be a single insert, and
+# tickets(user_email, _id) serves "my tickets" lookups in _id order.
+INDEX_PLAN = [
+    (users_collection, [("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    (tickets_collection, [("user_email", ASCENDING), ("_id", ASCENDING)], {"name": "user_email_id"}),
+]
+
+# (collection name, fields) of unique indexes confirmed to exist at startup;
+# code that relies on one must keep its own checks until it shows up here
+UNIQUE_CONFIRMED = set()
+
+
+async def ping():
+    """Round-trip to the server; raises if MongoDB is unreachable."""
+    await client.admin.command("ping")
+
+
+async def _has_unique(collection, fields: tuple) -> bool:
+    # any full unique index on exactly these fields counts, whatever its name
+    # (e.g. an older "email_1" that made create_index conflict)
+    info = await collection.index_information()
+    return any(
+        index.get("unique") and "partialFilterExpression" not in index
+        and tuple(field for field, _ in index["key"]) == fields
+        for index in info.values()
+    )
+
+
+def is_unique(collection, *fields: str) -> bool:
+    return (collection.name, fields) in UNIQUE_CONFIRMED
+
+
+async def ensure_indexes():
+    UNIQUE_CONFIRMED.clear()
+    for collection, keys, options in INDEX_PLAN:
+        spec = ", ".join(f"{field}: {direction}" for field, direction in keys)
+        flags = " unique" if options.get("unique") else ""
+        try:
+            await collection.create_index(keys, **options)
+            print(f"[database] index {collection.name}.{options['name']} {{{spec}}}{flags} ok", file=sys.stderr)
+        except PyMongoError as e:
+            # e.g. existing duplicate emails; the app still runs without it
+            print(f"[database] index {collection.name}.{options['name']} {{{spec}}}{flags} FAILED: {e}", file=sys.stderr)
+
+        if options.get("unique"):
+            fields = tuple(field for field, _ in keys)
+            try:
+                confirmed = await _has_unique(collection, fields)
+            except PyMongoError as e:
+                print(f"[database] could not list indexes of {collection.name}: {e}", file=sys.stderr)
+                confirmed = False
+            if confirmed:
+                UNIQUE_CONFIRMED.add((collection.name, fields))
+            else:
+                print(f"[database] {collection.name} {{{spec}}} is NOT unique; "
+                      "callers fall back to check-before-insert", file=sys.stderr)
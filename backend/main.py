@@ -1,17 +1,79 @@
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from backend.routes.auth import router as AuthRouter
-from backend.routes.tickets import router as tickets_router
+from backend.routes.tickets import router as tickets_router, ticket_batcher, seat_inventory
 from backend.routes.chat import router as chat_router  
+from backend.routes.fares import router as fares_router
+from backend.routes.health import router as health_router
+from backend.utils.rag import watch_vectorstore, warm_up, warmup_state, VECTORSTORE_WATCH_S
+from backend.database import ping, ensure_indexes
+from backend.utils.metrics import MetricsMiddleware, METRICS_ENABLED
+from backend.utils.rate_limit import RateLimitMiddleware, rate_limiter, RATE_LIMIT_ENABLED
+from backend.utils.responses import FastJSONResponse, GZIP_MIN_BYTES, GZIP_LEVEL
 
-app = FastAPI()
+# preload the vectorstore, embedding model and Gemini client after start-up
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "true").lower() in ("true", "1", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # fail fast if MongoDB is unreachable, then make sure indexes exist
+    await ping()
+    print("[database] MongoDB reachable", file=sys.stderr)
+    await ensure_indexes()
+
+    if ticket_batcher is not None:
+        await ticket_batcher.start()
+
+    background = []
+    if WARMUP_ON_START:
+        # runs in the background: the server accepts traffic (and /healthz
+        # answers) right away, /readyz turns 200 once this finishes
+        background.append(asyncio.create_task(warm_up()))
+    else:
+        warmup_state["done"] = True
+    if VECTORSTORE_WATCH_S > 0:
+        background.append(asyncio.create_task(watch_vectorstore()))
+    if seat_inventory is not None and seat_inventory.ledger_block:
+        background.append(asyncio.create_task(seat_inventory.run_reconciler()))
+    if RATE_LIMIT_ENABLED:
+        # feeds the limiter's load shedding
+        background.append(asyncio.create_task(rate_limiter.watch_loop_lag()))
+
+    yield
+
+    for task in background:
+        task.cancel()
+    if seat_inventory is not None:
+        # hand any locally leased seats back to Mongo
+        await seat_inventory.reconcile(idle_only=False)
+    if ticket_batcher is not None:
+        # queued bookings are written before shutdown completes
+        await ticket_batcher.stop()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 origins = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
 
+# compresses bodies above GZIP_MIN_BYTES for clients that accept gzip;
+# Starlette leaves text/event-stream alone, so chat streaming is unaffected
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES, compresslevel=GZIP_LEVEL)
+
+# inside CORS and metrics: 429/503 responses still get CORS headers (so the
+# browser can read Retry-After) and are counted by the metrics middleware
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -20,9 +82,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# added last = outermost, so the latency it records includes CORS handling
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Existing routers
 app.include_router(AuthRouter, prefix="/auth")
 app.include_router(tickets_router, prefix="/tickets")
+app.include_router(fares_router, prefix="/routes")
+app.include_router(health_router)
 
 # Chat API router
 app.include_router(chat_router, prefix="/chat")
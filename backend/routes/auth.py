@@ -2,12 +2,16 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Response, Request, Depends, status, Header
 from pydantic import BaseModel
 from jose import jwt, JWTError
+from pymongo.errors import DuplicateKeyError
 import os
 import logging
 
 from backend.models.users import UserCreate, UserLogin
-from backend.utils.hash import hash_password, verify_password
+from backend.utils.hash import ahash_password, averify_password, HashPoolSaturated
 from backend.utils.jwt import create_token, SECRET_KEY, ALGORITHM
+from backend.utils.auth_cache import PrincipalCache
+from backend.utils.metrics import stage, count
+from backend import database
 from backend.database import users_collection
 
 router = APIRouter(tags=["Authentications"])
@@ -21,6 +25,9 @@ COOKIE_SAMESITE = os.getenv("COOKIE_SAMESITE", "lax")
 COOKIE_HTTPONLY = True
 COOKIE_PATH = "/"
 
+# token -> UserOut, so protected routes skip the JWT decode + Mongo read
+principal_cache = PrincipalCache()
+
 
 
 class UserOut(BaseModel):
@@ -28,20 +35,41 @@ class UserOut(BaseModel):
     email: str
 
 
+def _hash_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 
 # SIGNUP
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
 async def signup(user: UserCreate):
-    existing = await users_collection.find_one({"email": user.email})
-    if existing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+    # without a confirmed unique index the insert alone would accept
+    # duplicates; check first (racy, but what we had before the index)
+    if not database.is_unique(users_collection, "email"):
+        if await users_collection.find_one({"email": user.email}, {"_id": 1}):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-    hashed = hash_password(user.password)
-    await users_collection.insert_one({
-        "name": user.name,
-        "email": user.email,
-        "password": hashed
-    })
+    try:
+        with stage("hash_password"):
+            hashed = await ahash_password(user.password)
+    except HashPoolSaturated:
+        raise _hash_busy()
+
+    # with the unique users.email index this insert is the atomic duplicate check
+    try:
+        await users_collection.insert_one({
+            "name": user.name,
+            "email": user.email,
+            "password": hashed
+        })
+    except DuplicateKeyError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+    # any token still cached for this email predates the new record
+    principal_cache.invalidate_user(user.email)
 
     return {"message": "Signup successful"}
 
@@ -54,9 +82,20 @@ async def login(user: UserLogin, response: Response):
     if not db_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User not found")
 
-    if not verify_password(user.password, db_user["password"]):
+    try:
+        with stage("verify_password"):
+            valid, new_hash = await averify_password(user.password, db_user["password"])
+    except HashPoolSaturated:
+        raise _hash_busy()
+
+    if not valid:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect password")
 
+    # Argon2 parameters changed since this hash was made: upgrade it
+    if new_hash:
+        await users_collection.update_one({"_id": db_user["_id"]}, {"$set": {"password": new_hash}})
+        principal_cache.invalidate_user(db_user["email"])
+
     # Create JWT token 
     token_payload = {"sub": db_user["email"]}
     token = create_token(token_payload, days=ACCESS_TOKEN_EXPIRE_DAYS)
@@ -84,19 +123,19 @@ async def login(user: UserLogin, response: Response):
 
 # LOGOUT
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(
+    request: Request,
+    response: Response,
+    authorization: Optional[str] = Header(default=None)
+):
+    token = _extract_token(request, authorization)
+    if token:
+        principal_cache.invalidate_token(token)
     response.delete_cookie(key=ACCESS_TOKEN_NAME, path=COOKIE_PATH)
     return {"message": "Logout successful"}
 
 
-# ----------------------
-# Dependency: get_current_user
-# Accepts token from either Authorization header or cookie
-# ----------------------
-async def get_current_user(
-    request: Request,
-    authorization: Optional[str] = Header(default=None)  # reads "Authorization" header
-) -> UserOut:
+def _extract_token(request: Request, authorization: Optional[str]) -> Optional[str]:
     token = None
 
     # 1) try Authorization header first (Bearer <token>)
@@ -111,9 +150,27 @@ async def get_current_user(
     if not token:
         token = request.cookies.get(ACCESS_TOKEN_NAME)
 
+    return token
+
+
+# ----------------------
+# Dependency: get_current_user
+# Accepts token from either Authorization header or cookie
+# ----------------------
+async def get_current_user(
+    request: Request,
+    authorization: Optional[str] = Header(default=None)  # reads "Authorization" header
+) -> UserOut:
+    token = _extract_token(request, authorization)
+
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
+    cached = principal_cache.get(token)
+    if cached is not None:
+        count("auth_cache_hit")
+        return cached
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: Optional[str] = payload.get("sub")
@@ -123,11 +180,14 @@ async def get_current_user(
         logger.info("JWT decode error: %s", e)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
 
-    db_user = await users_collection.find_one({"email": email}, {"password": 0})
+    with stage("auth_user_lookup"):
+        db_user = await users_collection.find_one({"email": email}, {"password": 0})
     if not db_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-    return UserOut(name=db_user.get("name"), email=db_user.get("email"))
+    user = UserOut(name=db_user.get("name"), email=db_user.get("email"))
+    principal_cache.put(token, email, user, jwt_exp=payload.get("exp"))
+    return user
 
 
 
@@ -135,3 +195,9 @@ async def get_current_user(
 @router.get("/me", response_model=UserOut)
 async def me(user: UserOut = Depends(get_current_user)):
     return user
+
+
+
+@router.get("/cache/stats")
+async def auth_cache_stats():
+    return principal_cache.stats()
@@ -1,13 +1,122 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from backend.utils.rag import generate_answer
+import json
+import os
+from typing import List, Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from backend.utils.rag import (
+    agenerate_answer,
+    aanswer_batch,
+    astream_answer,
+    AnswerInterrupted,
+    answer_cache,
+    areload_vectorstore,
+    vectorstore_info,
+)
+from backend.utils.fast_path import fast_path
+from backend.utils.gemini_guard import gemini_guard
+from backend.utils.sessions import chat_sessions
+from backend.utils.admin import require_admin
 
 router = APIRouter(tags=["Chat"])
 
+CHAT_BATCH_MAX = int(os.getenv("CHAT_BATCH_MAX", "500"))
+STREAM_INTERRUPTED_MESSAGE = "The answer was interrupted. Please try again."
+
 class ChatIn(BaseModel):
     q: str
+    # omit to start a conversation; send back the returned id for follow-ups
+    session_id: Optional[str] = Field(None, max_length=64)
+
+
+class ChatBatchIn(BaseModel):
+    questions: List[str] = Field(..., min_length=1, max_length=CHAT_BATCH_MAX)
+    retrieval_only: bool = False
+    top_k: int = Field(4, ge=1, le=20)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 
 @router.post("/ask")
 async def ask_chat(payload: ChatIn):
-    answer = generate_answer(payload.q)
-    return {"answer": answer}
+    session_id, state = await chat_sessions.open(payload.session_id)
+    question = chat_sessions.rewrite(payload.q, state)
+    answer = await agenerate_answer(question, history=chat_sessions.history(state))
+    await chat_sessions.record(session_id, state, payload.q, question, answer)
+    return {"answer": answer, "session_id": session_id}
+
+
+# Support tooling / FAQ regression: one embed + one search for the whole list.
+# With retrieval_only=true each result carries its hits instead of an answer.
+@router.post("/ask_batch")
+async def ask_batch(payload: ChatBatchIn):
+    results = await aanswer_batch(
+        payload.questions, top_k=payload.top_k, retrieval_only=payload.retrieval_only
+    )
+    return {"results": results}
+
+
+# Server-Sent Events: one "delta" event per cleaned chunk, then "done", or
+# "error" if the answer was cut off part way (the deltas so far are incomplete)
+@router.post("/stream")
+async def stream_chat(payload: ChatIn):
+    session_id, state = await chat_sessions.open(payload.session_id)
+    question = chat_sessions.rewrite(payload.q, state)
+
+    async def events():
+        pieces = []
+        try:
+            async for piece in astream_answer(question, history=chat_sessions.history(state)):
+                pieces.append(piece)
+                yield _sse("delta", {"text": piece})
+        except AnswerInterrupted:
+            # a truncated answer is not recorded as a turn of the conversation
+            yield _sse("error", {"message": STREAM_INTERRUPTED_MESSAGE, "session_id": session_id})
+            return
+        await chat_sessions.record(session_id, state, payload.q, question, "".join(pieces))
+        yield _sse("done", {"session_id": session_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Session-Id": session_id},
+    )
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    return answer_cache.stats()
+
+
+# share of questions answered from the fare catalog without RAG
+@router.get("/fastpath/stats")
+async def fast_path_stats():
+    return fast_path.stats()
+
+
+@router.get("/sessions/stats")
+async def session_stats():
+    return chat_sessions.stats()
+
+
+# ids are unguessable and only ever issued by the server, so holding one
+# is what authorises ending it
+@router.delete("/sessions/{session_id}")
+async def end_session(session_id: str):
+    await chat_sessions.store.delete(session_id)
+    return {"deleted": True}
+
+
+# queue depth, coalescing, retry budget and breaker state of the Gemini guard
+@router.get("/gemini/stats")
+async def gemini_stats():
+    return gemini_guard.stats()
+
+
+# Hot-swap the vectorstore; with rebuild=true re-embed changed chunks first
+@router.post("/admin/reload", dependencies=[Depends(require_admin)])
+async def reload_store(rebuild: bool = False):
+    reloaded = await areload_vectorstore(rebuild=rebuild)
+    return {"reloaded": reloaded, **vectorstore_info()}
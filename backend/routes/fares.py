@@ -0,0 +1,30 @@
+import os
+from fastapi import APIRouter, Header, Response, status
+from typing import Optional
+from backend.utils.fare_catalog import fare_catalog
+
+router = APIRouter(tags=["Routes"])
+
+# browsers may reuse the catalog this long before revalidating with If-None-Match
+ROUTES_MAX_AGE_S = int(os.getenv("ROUTES_MAX_AGE_S", "300"))
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison, as RFC 9110 requires for If-None-Match
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return etag in tags
+
+
+# Districts, drop points with fares and bus providers (same shape as bus_data.json)
+@router.get("")
+async def get_routes(if_none_match: Optional[str] = Header(None)):
+    snap = fare_catalog.snapshot()
+    headers = {
+        "ETag": snap.etag,
+        "Cache-Control": f"public, max-age={ROUTES_MAX_AGE_S}",
+    }
+    if if_none_match and _etag_matches(if_none_match, snap.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snap.body, media_type="application/json", headers=headers)
@@ -0,0 +1,37 @@
+import asyncio
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from backend import database
+from backend.utils.rag import warmup_state
+from backend.utils.metrics import render_prometheus
+
+router = APIRouter(tags=["Health"])
+
+READY_PING_TIMEOUT_S = 1.0
+
+
+# Liveness: the process is up and the event loop answers. Never touches
+# dependencies, so a slow Mongo or model load does not get the pod killed.
+@router.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+# Readiness: warm-up has finished and MongoDB answers a ping
+@router.get("/readyz")
+async def readyz():
+    try:
+        await asyncio.wait_for(database.ping(), timeout=READY_PING_TIMEOUT_S)
+        mongo = True
+    except Exception:
+        mongo = False
+
+    ready = mongo and warmup_state["done"]
+    body = {"ready": ready, "mongo": mongo, "warmup": warmup_state}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+# Prometheus text exposition: stage and per-route histograms, counters
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
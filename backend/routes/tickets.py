@@ -1,14 +1,38 @@
+import base64
+import binascii
+import json
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from bson import ObjectId
+from bson.errors import InvalidId
 from pydantic import BaseModel, constr, Field
 from pymongo.errors import PyMongoError
 
 from backend.database import db
+from backend.utils.write_behind import InsertBatcher, WriteQueueFull, GROUP_COMMIT_ENABLED
+from backend.utils.inventory import (
+    SeatInventory,
+    SoldOut,
+    UnknownTrip,
+    SEAT_INVENTORY_ENABLED,
+    route_key,
+    trip_key,
+)
+from backend.utils.admin import require_admin
+from backend.utils.fare_catalog import fare_catalog
+from backend.utils.responses import trusted
 from .auth import get_current_user, UserOut
 
 router = APIRouter(tags=["tickets"])
 
+# Opt-in (TICKET_GROUP_COMMIT=1): coalesce concurrent bookings into
+# insert_many batches. Started and drained by the app lifespan.
+ticket_batcher = InsertBatcher(db.tickets) if GROUP_COMMIT_ENABLED else None
+
+# Opt-in (SEAT_INVENTORY=1): atomic per-route / per-trip seat counts
+seat_inventory = SeatInventory(db.inventory) if SEAT_INVENTORY_ENABLED else None
+
 # Simple length-limited phone type (avoid regex here for compatibility)
 PhoneStr = constr(min_length=7, max_length=20)
 
@@ -18,6 +42,8 @@ class TicketIn(BaseModel):
     district: str
     drop_point: str
     price: int = Field(..., gt=0)
+    seats: int = Field(1, ge=1, le=10)
+    trip_id: Optional[str] = None
 
 
 class TicketOut(TicketIn):
@@ -31,18 +57,104 @@ class CreateResponse(BaseModel):
     id: str
 
 
+class TicketPage(BaseModel):
+    items: List[TicketOut]
+    next_cursor: Optional[str] = None
+
+
+class CapacityIn(BaseModel):
+    capacity: int = Field(..., ge=0)
+    trip_id: Optional[str] = None
+    district: Optional[str] = None
+    drop_point: Optional[str] = None
+
+
+# Only the stored ticket fields; owner fields come from the principal
+TICKET_PROJECTION = {"fullname": 1, "phone": 1, "district": 1, "drop_point": 1, "price": 1,
+                     "seats": 1, "trip_id": 1}
+EXPORT_BATCH_SIZE = 500
+
+
+def _encode_cursor(oid: ObjectId) -> str:
+    return base64.urlsafe_b64encode(oid.binary).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> ObjectId:
+    try:
+        return ObjectId(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, InvalidId, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _ticket_out(t: dict, user: UserOut) -> dict:
+    return {
+        "id": str(t["_id"]),
+        "fullname": t.get("fullname"),
+        "phone": t.get("phone"),
+        "district": t.get("district"),
+        "drop_point": t.get("drop_point"),
+        "price": t.get("price"),
+        "seats": t.get("seats", 1),
+        "trip_id": t.get("trip_id"),
+        "user_email": user.email,
+        "user_name": user.name,
+    }
+
+
+async def _reserve_seats(ticket: TicketIn, data: dict):
+    key = trip_key(ticket.trip_id) if ticket.trip_id else route_key(ticket.district, ticket.drop_point)
+    try:
+        managed = await seat_inventory.reserve(key, ticket.seats, must_exist=bool(ticket.trip_id))
+    except SoldOut:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Not enough seats left")
+    except UnknownTrip:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown trip")
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    # remembered on the ticket so cancellation can give the seats back
+    if managed:
+        data["inventory_key"] = key
+
+
+async def _release_seats(doc: dict):
+    key = doc.get("inventory_key")
+    if seat_inventory is not None and key:
+        await seat_inventory.release(key, doc.get("seats", 1))
+
+
 @router.post("/create", response_model=CreateResponse, status_code=status.HTTP_201_CREATED)
 async def create_ticket(ticket: TicketIn, user: UserOut = Depends(get_current_user)):
-    data = ticket.dict()
+    fare = fare_catalog.price(ticket.district, ticket.drop_point)
+    if fare is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown district or drop point")
+    if ticket.price != fare:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Fare for this route is {fare} BDT")
+
+    data = ticket.model_dump()
     data["user_email"] = user.email
     data["user_name"] = user.name
 
+    if seat_inventory is not None:
+        await _reserve_seats(ticket, data)
+
     try:
-        result = await db.tickets.insert_one(data)
+        if ticket_batcher is not None:
+            inserted_id = await ticket_batcher.insert(data)
+        else:
+            inserted_id = (await db.tickets.insert_one(data)).inserted_id
+    except WriteQueueFull:
+        await _release_seats(data)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Booking queue is full, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
     except PyMongoError as e:
+        await _release_seats(data)
         raise HTTPException(status_code=500, detail="Database error") from e
 
-    return {"message": "Ticket booked!", "id": str(result.inserted_id)}
+    return {"message": "Ticket booked!", "id": str(inserted_id)}
 
 
 @router.get("/my", response_model=List[TicketOut])
@@ -51,17 +163,56 @@ async def get_my_tickets(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
 ):
-    raw_tickets = await db.tickets.find({"user_email": user.email}).skip(skip).limit(limit).to_list(length=limit)
-    out = []
-    for t in raw_tickets:
-        tid = str(t.pop("_id", ""))
-        out.append({
-            **t,
-            "id": tid,
-            "user_email": t.get("user_email"),
-            "user_name": t.get("user_name"),
-        })
-    return out
+    raw_tickets = await (
+        db.tickets.find({"user_email": user.email}, TICKET_PROJECTION).skip(skip).limit(limit).to_list(length=limit)
+    )
+    # _ticket_out already yields the TicketOut shape; skip re-validation
+    return trusted([_ticket_out(t, user) for t in raw_tickets])
+
+
+# Keyset pagination: each page resumes after the last _id of the previous
+# one, so deep pages cost the same as the first (no skip scan).
+@router.get("/page", response_model=TicketPage)
+async def get_my_tickets_page(
+    user: UserOut = Depends(get_current_user),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+):
+    query = {"user_email": user.email}
+    if cursor:
+        query["_id"] = {"$gt": _decode_cursor(cursor)}
+
+    # one extra row tells us whether another page exists
+    raw = await (
+        db.tickets.find(query, TICKET_PROJECTION).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+    )
+    has_more = len(raw) > limit
+    raw = raw[:limit]
+
+    return trusted({
+        "items": [_ticket_out(t, user) for t in raw],
+        "next_cursor": _encode_cursor(raw[-1]["_id"]) if has_more else None,
+    })
+
+
+# NDJSON export streamed straight off the Motor cursor; memory stays flat
+@router.get("/export")
+async def export_my_tickets(user: UserOut = Depends(get_current_user)):
+    cursor = (
+        db.tickets.find({"user_email": user.email}, TICKET_PROJECTION)
+        .sort("_id", 1)
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+
+    async def lines():
+        async for t in cursor:
+            yield json.dumps(_ticket_out(t, user), ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="tickets.ndjson"'},
+    )
 
 
 @router.delete("/delete/{ticket_id}", status_code=status.HTTP_200_OK)
@@ -71,8 +222,46 @@ async def delete_ticket(ticket_id: str, user: UserOut = Depends(get_current_user
     except Exception:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ticket id")
 
-    result = await db.tickets.delete_one({"_id": oid, "user_email": user.email})
-    if result.deleted_count == 0:
+    deleted = await db.tickets.find_one_and_delete(
+        {"_id": oid, "user_email": user.email},
+        projection={"inventory_key": 1, "seats": 1},
+    )
+    if deleted is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found or not yours")
 
+    # compensating release; runs once because only one delete can win
+    await _release_seats(deleted)
+
     return {"message": "Ticket deleted"}
+
+
+def _capacity_key(body: CapacityIn) -> str:
+    if body.trip_id:
+        return trip_key(body.trip_id)
+    if body.district and body.drop_point:
+        return route_key(body.district, body.drop_point)
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Give trip_id or district + drop_point")
+
+
+@router.put("/admin/inventory", dependencies=[Depends(require_admin)])
+async def set_inventory(body: CapacityIn):
+    if seat_inventory is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Seat inventory is disabled")
+    doc = await seat_inventory.set_capacity(_capacity_key(body), body.capacity)
+    return {"key": doc["_id"], "capacity": doc["capacity"], "available": doc["available"]}
+
+
+@router.get("/availability")
+async def get_availability(
+    trip_id: Optional[str] = None,
+    district: Optional[str] = None,
+    drop_point: Optional[str] = None,
+):
+    if seat_inventory is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Seat inventory is disabled")
+    key = _capacity_key(CapacityIn(capacity=0, trip_id=trip_id, district=district, drop_point=drop_point))
+    doc = await seat_inventory.get(key)
+    if doc is None:
+        return {"key": key, "managed": False}
+    return {"key": key, "managed": True, "capacity": doc["capacity"],
+            "available": doc["available"] + doc["leased_locally"]}
@@ -0,0 +1,63 @@
+import os
+
+# backend.database refuses to import without it; nothing here connects
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+import pytest
+
+from backend.tools.fakes import FakeMotorClient, FakeGemini, fake_embed
+
+
+@pytest.fixture
+def fake_db():
+    """In-memory stand-in for the Motor database (see tools/fakes.py)."""
+    return FakeMotorClient()["shohoj_ticket"]
+
+
+@pytest.fixture
+def fake_rag(monkeypatch):
+    """
+    rag wired to the load-test stand-ins: hashed bag-of-words embeddings,
+    a store over the real chunks, an instant FakeGemini and a fresh
+    answer cache and Gemini guard. Returns the FakeGemini.
+    """
+    from backend.utils import rag, vectorstore
+    from backend.utils.answer_cache import SemanticAnswerCache
+    from backend.utils.bm25 import BM25Index
+    from backend.utils.gemini_guard import GeminiGuard
+    from backend.utils.loader import prepare_chunks
+
+    encode = lambda texts: fake_embed(texts, vectorstore.DEFAULT_DIM)
+    monkeypatch.setattr(vectorstore, "embed_texts_local_safe", encode)
+    monkeypatch.setattr(vectorstore.query_broker, "_encode", encode)
+
+    chunks = prepare_chunks()
+    store = vectorstore.SimpleVectorStore.from_embeddings(
+        encode(chunks), [{"text": t} for t in chunks],
+        version="test", lexical=BM25Index.build(chunks),
+    )
+    gemini = FakeGemini(latency_s=0.0, jitter_s=0.0)
+    monkeypatch.setattr(rag, "_vectorstore", store)
+    monkeypatch.setattr(rag, "_store_attempted", True)
+    monkeypatch.setattr(rag, "_genai_client", gemini)
+    monkeypatch.setattr(rag, "HAS_GEMINI", True)
+    monkeypatch.setattr(rag, "answer_cache", SemanticAnswerCache())
+    monkeypatch.setattr(rag, "gemini_guard", GeminiGuard())
+    return gemini
+
+
+@pytest.fixture
+def tmp_vectorstore(tmp_path, monkeypatch):
+    """vectorstore writing its versions under tmp_path, with fake embeddings."""
+    from backend.utils import vectorstore
+
+    root = tmp_path / "simple"
+    root.mkdir()
+    monkeypatch.setattr(vectorstore, "VECTOR_DIR", root)
+    monkeypatch.setattr(vectorstore, "EMBED_FILE", root / "embeddings.npy")
+    monkeypatch.setattr(vectorstore, "META_FILE", root / "metas.json")
+    monkeypatch.setattr(vectorstore, "VERSIONS_DIR", root / "versions")
+    monkeypatch.setattr(vectorstore, "CURRENT_FILE", root / "CURRENT")
+    monkeypatch.setattr(vectorstore, "embed_texts_local_safe",
+                        lambda texts: fake_embed(texts, vectorstore.DEFAULT_DIM))
+    return vectorstore
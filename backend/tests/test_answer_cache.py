@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from backend.utils import answer_cache
+from backend.utils.answer_cache import SemanticAnswerCache
+
+
+def _vec(i: int, dim: int = 8) -> np.ndarray:
+    """Orthogonal unit vectors, so distinct questions never match each other."""
+    v = np.zeros(dim, dtype=np.float32)
+    v[i] = 1.0
+    return v
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_close_questions_share_an_answer():
+    cache = SemanticAnswerCache(max_entries=4, threshold=0.9)
+    cache.put(_vec(0), "A0", version="v1")
+    nearby = _vec(0) + 0.1 * _vec(1)
+    assert cache.lookup(nearby, version="v1") == "A0"
+    assert cache.lookup(_vec(1), version="v1") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SemanticAnswerCache(max_entries=4, ttl_s=60)
+    cache.put(_vec(0), "A0", version="v1")
+    clock[0] += 59
+    assert cache.lookup(_vec(0), version="v1") == "A0"
+    clock[0] += 2
+    assert cache.lookup(_vec(0), version="v1") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_full_cache_evicts_least_recently_used():
+    cache = SemanticAnswerCache(max_entries=2)
+    cache.put(_vec(0), "A0", version="v1")
+    cache.put(_vec(1), "A1", version="v1")
+    assert cache.lookup(_vec(0), version="v1") == "A0"  # A1 is now the LRU entry
+
+    cache.put(_vec(2), "A2", version="v1")
+    assert cache.lookup(_vec(1), version="v1") is None
+    assert cache.lookup(_vec(0), version="v1") == "A0"
+    assert cache.lookup(_vec(2), version="v1") == "A2"
+    assert cache.evictions == 1
+
+
+def test_new_store_version_clears_the_cache():
+    cache = SemanticAnswerCache(max_entries=4)
+    cache.put(_vec(0), "A0", version="v1")
+    assert cache.lookup(_vec(0), version="v2") is None
+    assert cache.invalidations == 1
+
+    # the old version's entries are gone for good, not just hidden
+    assert cache.lookup(_vec(0), version="v1") is None
+
+
+def test_zero_size_disables_the_cache():
+    cache = SemanticAnswerCache(max_entries=0)
+    cache.put(_vec(0), "A0")
+    assert not cache.enabled and cache.lookup(_vec(0)) is None
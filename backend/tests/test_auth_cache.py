@@ -0,0 +1,66 @@
+import pytest
+from fastapi import Response
+
+from backend.models.users import UserLogin
+from backend.routes import auth
+from backend.utils import auth_cache
+from backend.utils.auth_cache import PrincipalCache
+
+
+#  INVALIDATION
+async def test_rehash_on_login_drops_cached_tokens(fake_db, monkeypatch):
+    users = fake_db["users"]
+    await users.insert_one({"name": "Rina", "email": "rina@example.com", "password": "old-hash"})
+    monkeypatch.setattr(auth, "users_collection", users)
+    monkeypatch.setattr(auth, "principal_cache", auth.PrincipalCache())
+
+    async def verify(password, stored):
+        return True, "new-hash"
+
+    monkeypatch.setattr(auth, "averify_password", verify)
+    principal = auth.UserOut(name="Rina", email="rina@example.com")
+    auth.principal_cache.put("old-token", "rina@example.com", principal)
+
+    await auth.login(UserLogin(email="rina@example.com", password="secret-pw"), Response())
+    assert (await users.find_one({"email": "rina@example.com"}))["password"] == "new-hash"
+    assert auth.principal_cache.get("old-token") is None
+
+
+#  EXPIRY
+@pytest.fixture
+def clocks(monkeypatch):
+    """Wall and monotonic time, advanced together."""
+    now = {"wall": 1_700_000_000.0, "mono": 500.0}
+    monkeypatch.setattr(auth_cache.time, "time", lambda: now["wall"])
+    monkeypatch.setattr(auth_cache.time, "monotonic", lambda: now["mono"])
+
+    def advance(seconds):
+        now["wall"] += seconds
+        now["mono"] += seconds
+
+    now["advance"] = advance
+    return now
+
+
+def test_entry_never_outlives_the_token_exp(clocks):
+    cache = PrincipalCache(ttl_s=60)
+    cache.put("tok", "a@example.com", "principal", jwt_exp=clocks["wall"] + 10)
+    clocks["advance"](9)
+    assert cache.get("tok") == "principal"
+    clocks["advance"](2)
+    assert cache.get("tok") is None
+
+
+def test_ttl_applies_when_exp_is_later(clocks):
+    cache = PrincipalCache(ttl_s=60)
+    cache.put("tok", "a@example.com", "principal", jwt_exp=clocks["wall"] + 3600)
+    clocks["advance"](59)
+    assert cache.get("tok") == "principal"
+    clocks["advance"](2)
+    assert cache.get("tok") is None
+
+
+def test_already_expired_token_is_never_served(clocks):
+    cache = PrincipalCache(ttl_s=60)
+    cache.put("tok", "a@example.com", "principal", jwt_exp=clocks["wall"] - 1)
+    assert cache.get("tok") is None
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from backend.tools.fakes import fake_embed
+from backend.utils import rag, vecfile
+from backend.utils.bm25 import BM25Index
+from backend.utils.loader import prepare_chunks
+from backend.utils.vectorstore import DEFAULT_DIM, SimpleVectorStore, _normalize_rows
+
+QUESTIONS = [
+    "Can I cancel my ticket and get a refund?",
+    "How much luggage can I bring on the bus?",
+    "What is Green Line's privacy policy?",
+    "Which buses go from Dhaka to Sylhet at night?",
+    "zzzz no words in common",
+]
+
+
+@pytest.fixture(scope="module")
+def chunks():
+    return prepare_chunks()
+
+
+def _store(chunks, dtype: str, lexical: bool) -> SimpleVectorStore:
+    vectors, scales = vecfile.quantize(_normalize_rows(fake_embed(chunks, DEFAULT_DIM)), dtype)
+    return SimpleVectorStore(vectors, [{"text": t} for t in chunks], scales=scales,
+                             lexical=BM25Index.build(chunks) if lexical else None)
+
+
+@pytest.mark.parametrize("dtype", vecfile.DTYPES)
+@pytest.mark.parametrize("lexical", [True, False])
+def test_batch_equals_one_query_at_a_time(chunks, dtype, lexical):
+    store = _store(chunks, dtype, lexical)
+    q_embs = fake_embed(QUESTIONS, DEFAULT_DIM)
+    batch = store.hybrid_search_batch(QUESTIONS, q_embs, k=4)
+
+    assert len(batch) == len(QUESTIONS)
+    for question, q_emb, hits in zip(QUESTIONS, q_embs, batch):
+        single = store.hybrid_search(question, q_emb, k=4)
+        assert [h["id"] for h in hits] == [h["id"] for h in single]
+        assert [h["score"] for h in hits] == pytest.approx([h["score"] for h in single], abs=1e-5)
+
+
+def test_empty_batch(chunks):
+    assert _store(chunks, "float32", True).hybrid_search_batch([], np.zeros((0, DEFAULT_DIM)), k=4) == []
+
+
+async def test_aanswer_batch_retrieval_matches_single_search(fake_rag):
+    results = await rag.aanswer_batch(QUESTIONS, top_k=3, retrieval_only=True)
+    store = rag._vectorstore
+    for question, result in zip(QUESTIONS, results):
+        expected = store.hybrid_search(question, fake_embed([question], DEFAULT_DIM)[0], k=3)
+        assert result["question"] == question
+        assert [h["id"] for h in result["hits"]] == [h["id"] for h in expected]
+    assert fake_rag.calls == 0
+
+
+async def test_aanswer_batch_answers_in_input_order(fake_rag):
+    results = await rag.aanswer_batch(QUESTIONS[:3])
+    assert [r["question"] for r in results] == QUESTIONS[:3]
+    assert all(r["answer"] for r in results)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from backend.utils import bm25
+from backend.utils.bm25 import BM25Index
+
+DOCS = [
+    "Green Line bus from Dhaka to Sylhet, fare 850 taka",
+    "Refund policy: cancelled tickets are refunded within 7 days",
+    "Luggage allowance is 20 kg per passenger",
+    "Hanif bus from Dhaka to Khulna, fare 700 taka",
+]
+
+
+#  SAVE / LOAD
+def test_saved_index_loads_as_memmaps(tmp_path):
+    built = BM25Index.build(DOCS)
+    built.save(tmp_path)
+    assert bm25.has_index(tmp_path)
+
+    loaded = BM25Index.load(tmp_path)
+    for name in bm25.BM25_ARRAYS:
+        assert isinstance(getattr(loaded, name), np.memmap)
+    assert loaded.unseen_weight == built.unseen_weight
+    for query in ("refund for cancelled tickets", "bus dhaka", "weather"):
+        assert np.array_equal(loaded.scores(query), built.scores(query))
+        assert loaded.max_score(query) == pytest.approx(built.max_score(query))
+
+
+def test_store_without_bm25_loads_dense_only(tmp_vectorstore, monkeypatch):
+    directory = tmp_vectorstore.create_vectorstore()
+    for path in directory.glob("bm25*"):
+        path.unlink()
+
+    def no_build(*args, **kwargs):
+        raise AssertionError("load must not build the BM25 index")
+
+    monkeypatch.setattr(BM25Index, "build", no_build)
+    store = tmp_vectorstore.load_vectorstore()
+    assert store.lexical is None
+    q_emb = tmp_vectorstore.embed_texts_local_safe(["refund policy"])[0]
+    assert store.hybrid_search("refund policy", q_emb, k=3) == store.search_by_vector(q_emb, k=3)
+
+
+#  SCORING
+def test_only_matching_docs_score():
+    index = BM25Index.build(DOCS)
+    scores = index.scores("refund policy")
+    assert np.flatnonzero(scores).tolist() == [1]
+    assert not index.scores("weather tomorrow").any()
+
+
+def test_rare_terms_outweigh_common_ones():
+    index = BM25Index.build(DOCS)
+    # "dhaka" is in two docs, "sylhet" in one: the Sylhet doc wins
+    ids, _ = index.top("dhaka sylhet", k=4)
+    assert ids.tolist() == [0, 3]
+
+
+def test_stopwords_and_case_are_ignored():
+    index = BM25Index.build(DOCS)
+    assert np.array_equal(index.scores("What is the REFUND policy?"), index.scores("refund policy"))
+
+
+def test_top_is_sorted_positive_and_capped():
+    index = BM25Index.build(DOCS)
+    # both Dhaka docs match every term; the shorter one scores higher
+    ids, scores = index.top("bus fare taka dhaka", k=1)
+    assert ids.tolist() == [3] and scores[0] > 0
+
+    ids, scores = index.top("bus fare taka dhaka luggage", k=10)
+    assert set(ids.tolist()) == {0, 2, 3} and list(scores) == sorted(scores, reverse=True)
+
+
+def test_max_score_bounds_every_doc_and_counts_unseen_words():
+    index = BM25Index.build(DOCS)
+    for query in ("refund policy", "dhaka bus fare", "luggage kg"):
+        assert index.scores(query).max() <= index.max_score(query) + 1e-6
+    assert index.max_score("refund weather") == pytest.approx(
+        index.max_score("refund") + index.unseen_weight)
@@ -0,0 +1,77 @@
+import numpy as np
+
+from backend.utils.context_builder import ContextBuilder, count_tokens, mmr_order, trim_sentences
+
+
+class VectorStub:
+    """Just the store.vectors() lookup ContextBuilder needs for MMR."""
+
+    def __init__(self, vectors):
+        self._vectors = np.asarray(vectors, dtype=np.float32)
+
+    def vectors(self, ids):
+        return self._vectors[np.asarray(ids)]
+
+
+def _sentences(tag: str, n: int) -> str:
+    return " ".join(f"{tag} sentence number {i} says something about bus fares." for i in range(n))
+
+
+#  TOKEN BUDGET
+def test_context_stays_within_budget():
+    hits = [{"text": _sentences(f"doc{d}", 12), "score": 1.0 - d / 10} for d in range(8)]
+    builder = ContextBuilder(budget_tokens=200, chunk_tokens=80)
+    lines, stats = builder.build(hits)
+
+    assert lines and sum(count_tokens(line) for line in lines) <= 200
+    assert all(count_tokens(line) <= 80 for line in lines)
+    assert stats["tokens_out"] <= 200 < stats["tokens_in"]
+    assert stats["kept"] == len(lines) and stats["trimmed"] > 0
+
+
+def test_small_hits_pass_through_untouched():
+    hits = [{"text": "Khulna to Daulatpur costs 400 taka.", "score": 0.9},
+            {"text": "Green Line covers Sylhet.", "score": 0.8}]
+    lines, stats = ContextBuilder(budget_tokens=600).build(hits)
+    assert lines == [h["text"] for h in hits] and stats["trimmed"] == 0
+
+
+def test_trim_keeps_whole_sentences_in_order():
+    text = "Short lead. " + "A very long middle sentence " * 20 + "ends here. Contact us at 123."
+    trimmed, used = trim_sentences(text, 12)
+    assert trimmed == "Short lead. Contact us at 123."
+    assert used == count_tokens("Short lead.") + count_tokens("Contact us at 123.")
+
+
+#  MMR
+def test_near_duplicates_are_dropped():
+    a = np.array([1.0, 0.0, 0.0])
+    b = np.array([0.0, 1.0, 0.0])
+    hits = [{"id": 0, "text": "Refunds take 7 days.", "score": 0.9},
+            {"id": 1, "text": "Refunds take seven days.", "score": 0.89},
+            {"id": 2, "text": "Luggage is 20 kg.", "score": 0.5}]
+    lines, stats = ContextBuilder().build(hits, VectorStub([a, a, b]))
+    assert lines == ["Refunds take 7 days.", "Luggage is 20 kg."]
+    assert stats["hits"] == 3 and stats["kept"] == 2
+
+
+def test_mmr_prefers_variety_over_a_close_second():
+    # hits 0 and 1 are similar (cos 0.9) but not duplicates; 2 is different
+    v0 = np.array([1.0, 0.0])
+    v1 = np.array([0.9, np.sqrt(1 - 0.81)])
+    v2 = np.array([0.0, 1.0])
+    scores = np.array([0.9, 0.85, 0.7], dtype=np.float32)
+    vectors = np.stack([v0, v1, v2]).astype(np.float32)
+    assert mmr_order(scores, vectors, mmr_lambda=0.5) == [0, 2, 1]
+    assert mmr_order(scores, vectors, mmr_lambda=1.0) == [0, 1, 2]
+
+
+def test_without_a_store_hits_keep_retrieval_order():
+    hits = [{"text": f"hit {i}", "score": s} for i, s in enumerate([0.2, 0.9, 0.5])]
+    lines, _ = ContextBuilder().build(hits)
+    assert lines == ["hit 0", "hit 1", "hit 2"]
+
+
+def test_empty_hits():
+    assert mmr_order(np.zeros(0), np.zeros((0, 3))) == []
+    assert ContextBuilder().build([])[0] == []
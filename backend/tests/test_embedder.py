@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from backend.tools.fakes import fake_embed
+from backend.utils.embedder import EmbeddingBroker
+
+
+class RecordingEncoder:
+    """fake_embed that records every batch it is handed."""
+
+    def __init__(self, delay_s: float = 0.0):
+        self.batches = []
+        self.delay_s = delay_s
+        self._lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+        return fake_embed(texts, 16, self.delay_s)
+
+
+async def test_concurrent_queries_are_encoded_together():
+    encode = RecordingEncoder()
+    broker = EmbeddingBroker(encode, max_batch=32, window_ms=50, cache_size=0)
+    texts = [f"question {i}" for i in range(10)]
+
+    vecs = await asyncio.gather(*(broker.aembed(t) for t in texts))
+    assert sum(len(b) for b in encode.batches) == 10
+    assert len(encode.batches) < 10
+    for t, v in zip(texts, vecs):
+        assert np.array_equal(v, fake_embed([t], 16)[0])
+
+
+async def test_batches_stop_at_max_batch():
+    encode = RecordingEncoder()
+    broker = EmbeddingBroker(encode, max_batch=4, window_ms=50, cache_size=0)
+    await asyncio.gather(*(broker.aembed(f"q{i}") for i in range(10)))
+    assert max(len(b) for b in encode.batches) <= 4
+
+
+async def test_duplicates_in_one_batch_are_encoded_once():
+    encode = RecordingEncoder()
+    broker = EmbeddingBroker(encode, window_ms=50, cache_size=0)
+    a, b = await asyncio.gather(broker.aembed("same"), broker.aembed("same"))
+    assert np.array_equal(a, b)
+    assert [t for batch in encode.batches for t in batch] == ["same"]
+
+
+def test_repeats_are_served_from_the_lru():
+    encode = RecordingEncoder()
+    broker = EmbeddingBroker(encode, window_ms=0, cache_size=2)
+    first = broker.embed("fare to sylhet")
+    again = broker.embed("fare to sylhet")
+    assert again is first and len(encode.batches) == 1
+    assert broker.cache_hits == 1
+    with pytest.raises(ValueError):
+        again[0] = 1.0  # shared with the cache, so read-only
+
+
+def test_lru_drops_the_least_recently_used():
+    encode = RecordingEncoder()
+    broker = EmbeddingBroker(encode, window_ms=0, cache_size=2)
+    broker.embed_many(["a", "b"])
+    broker.embed("a")
+    broker.embed("c")  # evicts b, the LRU entry
+    encode.batches.clear()
+
+    broker.embed_many(["a", "b", "c"])
+    assert encode.batches == [["b"]]
+
+
+async def test_encoder_errors_reach_every_waiter():
+    def failing(texts):
+        raise RuntimeError("model unavailable")
+
+    broker = EmbeddingBroker(failing, window_ms=20, cache_size=0)
+    results = await asyncio.gather(broker.aembed("x"), broker.aembed("y"), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
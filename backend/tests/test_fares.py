@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from backend.routes import fares, tickets
+from backend.routes.auth import UserOut
+from backend.routes.tickets import TicketIn
+from backend.utils.fare_catalog import FareCatalog, fare_catalog
+
+USER = UserOut(name="Rahim", email="rahim@example.com")
+
+
+#  /routes CONDITIONAL GET
+async def test_routes_sends_the_catalog_with_an_etag():
+    response = await fares.get_routes(if_none_match=None)
+    snap = fare_catalog.snapshot()
+    assert response.status_code == 200
+    assert response.headers["etag"] == snap.etag
+    assert json.loads(response.body) == snap.data
+
+
+@pytest.mark.parametrize("if_none_match", [
+    "{etag}", "W/{etag}", '"stale", {etag}', "*",
+])
+async def test_matching_etag_gets_304(if_none_match):
+    etag = fare_catalog.snapshot().etag
+    response = await fares.get_routes(if_none_match=if_none_match.format(etag=etag))
+    assert response.status_code == 304
+    assert response.body == b"" and response.headers["etag"] == etag
+
+
+async def test_stale_etag_gets_the_body():
+    response = await fares.get_routes(if_none_match='"stale"')
+    assert response.status_code == 200 and response.body
+
+
+def test_etag_changes_when_the_catalog_file_does(tmp_path):
+    path = tmp_path / "bus_data.json"
+    path.write_text(json.dumps({"districts": [{"name": "Khulna", "dropping_points": [
+        {"name": "Daulatpur", "price": 400}]}]}))
+    catalog = FareCatalog(path, check_interval_s=0)
+    before = catalog.snapshot().etag
+
+    path.write_text(json.dumps({"districts": [{"name": "Khulna", "dropping_points": [
+        {"name": "Daulatpur", "price": 450}]}]}))
+    os.utime(path, (1, 1))
+    assert catalog.snapshot().etag != before
+    assert catalog.price("Khulna", "Daulatpur") == 450
+
+
+#  BOOKING FARE CHECK
+@pytest.fixture
+def ticket_db(fake_db, monkeypatch):
+    monkeypatch.setattr(tickets, "db", fake_db)
+    return fake_db
+
+
+def _booking(price=None, **overrides) -> TicketIn:
+    (district, point), fare = next(iter(fare_catalog.snapshot().fares.items()))
+    fields = {"fullname": "Rahim Uddin", "phone": "01700000000", "district": district,
+              "drop_point": point, "price": fare if price is None else price}
+    fields.update(overrides)
+    return TicketIn(**fields)
+
+
+async def test_catalog_fare_is_booked(ticket_db):
+    booking = _booking()
+    result = await tickets.create_ticket(booking, user=USER)
+    [stored] = await ticket_db.tickets.find({}).to_list(None)
+    assert str(stored["_id"]) == result["id"]
+    assert stored["price"] == booking.price and stored["user_email"] == USER.email
+
+
+async def test_mismatched_price_is_rejected(ticket_db):
+    booking = _booking()
+    with pytest.raises(HTTPException) as err:
+        await tickets.create_ticket(_booking(price=booking.price + 1), user=USER)
+    assert err.value.status_code == 400 and str(booking.price) in err.value.detail
+    assert await ticket_db.tickets.find({}).to_list(None) == []
+
+
+async def test_unknown_route_is_rejected(ticket_db):
+    with pytest.raises(HTTPException) as err:
+        await tickets.create_ticket(_booking(drop_point="Nowhere"), user=USER)
+    assert err.value.status_code == 400
+    assert await ticket_db.tickets.find({}).to_list(None) == []
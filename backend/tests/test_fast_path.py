@@ -0,0 +1,56 @@
+import pytest
+
+from backend.utils.fast_path import FastPathMatcher
+
+
+@pytest.fixture
+def matcher():
+    return FastPathMatcher()
+
+
+def test_fare_to_a_drop_point(matcher):
+    assert (matcher.match("How much is a bus ticket from Khulna to Daulatpur?")
+            == "In Khulna, the bus ticket to Daulatpur costs 400 BDT.")
+
+
+def test_drop_point_alone_implies_its_district(matcher):
+    assert matcher.match("Kachari fare please") == "In Rangpur, the bus ticket to Kachari costs 480 BDT."
+
+
+def test_coverage_of_a_district(matcher):
+    assert (matcher.match("Which bus companies cover Sylhet?")
+            == "Bus companies operating in Sylhet: Desh Travel, Ena, Shyamoli.")
+
+
+def test_provider_not_in_district_lists_the_ones_that_are(matcher):
+    answer = matcher.match("Does Green Line operate in Sylhet?")
+    assert answer.startswith("No, Green Line does not operate in Sylhet.")
+    assert "Shyamoli" in answer
+
+
+@pytest.mark.parametrize("question", [
+    # no intent keyword
+    "What is Green Line's privacy policy?",
+    # policy questions that happen to contain a fare word
+    "What is the cancellation charge in Dhaka?",
+    "Can I get a refund on the price of my Dhaka ticket?",
+    # ambiguous: two districts
+    "fare from Dhaka to Sylhet",
+    # fare word but nothing from the catalog
+    "how much does it cost",
+])
+def test_falls_through_to_rag(matcher, question):
+    assert matcher.match(question) is None
+
+
+def test_entities_are_found_longest_first(matcher):
+    ents = matcher.entities("Does Green Line go to Sylhet?")
+    assert ents["provider"] == ["Green Line"]
+    assert ents["district"] == ["Sylhet"]
+
+
+def test_answer_counts_hits_and_misses(matcher):
+    matcher.answer("Which bus companies cover Sylhet?")
+    matcher.answer("hello there")
+    stats = matcher.stats()
+    assert (stats["answered"], stats["fell_through"]) == (1, 1)
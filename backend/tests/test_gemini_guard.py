@@ -0,0 +1,221 @@
+import asyncio
+import gc
+import time
+
+import pytest
+
+from backend.utils import gemini_guard
+from backend.utils.gemini_guard import CircuitBreaker, GeminiGuard, GeminiUnavailable, RetryBudget, flight_key
+
+
+#  CIRCUIT BREAKER
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failures=3, cooldown_s=60)
+    breaker.record(False)
+    breaker.record(False)
+    breaker.record(True)  # a success resets the run
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == "closed"
+    breaker.record(False)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert (breaker.opened, breaker.rejected) == (1, 1)
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failures=1, cooldown_s=0.02)
+    breaker.record(False)
+    time.sleep(0.03)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # probe already in flight
+    breaker.record(True)
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failures=5, cooldown_s=0.02)
+    for _ in range(5):
+        breaker.record(False)
+    time.sleep(0.03)
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == "open"
+
+
+#  RETRY BUDGET
+def test_retry_budget_is_earned_by_traffic():
+    budget = RetryBudget(ratio=0.5, min_per_s=0.0, max_tokens=1.0)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.deposit()
+    assert not budget.try_spend()  # half a token is not enough
+    budget.deposit()
+    assert budget.try_spend()
+    assert budget.denied == 2
+
+
+def test_retry_budget_is_capped():
+    budget = RetryBudget(ratio=1.0, min_per_s=0.0, max_tokens=2.0)
+    for _ in range(10):
+        budget.deposit()
+    assert budget.tokens == 2.0
+
+
+def test_no_retries_while_breaker_is_open():
+    guard = GeminiGuard()
+    guard.retries = RetryBudget(ratio=1.0, min_per_s=0.0, max_tokens=10.0)
+    guard.breaker = CircuitBreaker(failures=1, cooldown_s=60)
+    guard.breaker.record(False)
+    assert not guard.allow_retry()
+
+
+#  SINGLE-FLIGHT
+async def test_identical_calls_share_one_upstream_request():
+    guard = GeminiGuard(max_concurrent=4)
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    key = flight_key("same prompt", 500, 0.45)
+    results = await asyncio.gather(*(guard.call(key, upstream, timeout=1) for _ in range(5)))
+    assert results == ["answer"] * 5
+    assert calls == 1 and guard.coalesced == 4
+    assert not guard._flights  # cleaned up once done
+
+
+def test_flight_key_ignores_case_and_whitespace():
+    assert flight_key("How much  to\nSylhet?", 1) == flight_key("how much to sylhet?", 1)
+    assert flight_key("a", 1) != flight_key("a", 2)
+
+
+async def test_call_does_not_earn_retry_tokens():
+    guard = GeminiGuard()
+    guard.retries = RetryBudget(ratio=1.0, min_per_s=0.0, max_tokens=5.0)
+    while guard.retries.try_spend():
+        pass
+
+    async def upstream():
+        return "answer"
+
+    for i in range(3):
+        await guard.call(f"k{i}", upstream, timeout=1)
+    assert not guard.retries.try_spend()
+
+
+async def test_disconnecting_caller_does_not_cancel_the_shared_call():
+    guard = GeminiGuard()
+    finished = asyncio.Event()
+
+    async def upstream():
+        await asyncio.sleep(0.02)
+        finished.set()
+        return "answer"
+
+    first = asyncio.create_task(guard.call("k", upstream, timeout=1))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(guard.call("k", upstream, timeout=1))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "answer"
+    assert finished.is_set()
+
+
+#  SLOTS AND BREAKER FEEDBACK
+async def test_empty_replies_and_errors_count_as_failures():
+    guard = GeminiGuard()
+    guard.breaker = CircuitBreaker(failures=2, cooldown_s=60)
+
+    async def empty():
+        return ""
+
+    async def broken():
+        raise RuntimeError("500 from upstream")
+
+    assert await guard.call("a", empty, timeout=1) == ""
+    with pytest.raises(RuntimeError):
+        await guard.call("b", broken, timeout=1)
+    assert guard.breaker.state == "open"
+    with pytest.raises(GeminiUnavailable):
+        await guard.call("c", empty, timeout=1)
+
+
+async def test_cancelled_call_is_neutral_for_the_breaker():
+    guard = GeminiGuard()
+    guard.breaker = CircuitBreaker(failures=1, cooldown_s=60)
+
+    async def body():
+        async with guard.slot(1):
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(body())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert guard.breaker.state == "closed"
+    assert guard.in_flight == 0
+
+
+async def test_queue_timeout_rejects_without_blaming_gemini():
+    guard = GeminiGuard(max_concurrent=1, queue_timeout_s=0.01)
+    guard.breaker = CircuitBreaker(failures=1, cooldown_s=60)
+
+    async with guard.slot(1):
+        with pytest.raises(GeminiUnavailable):
+            async with guard.slot(1):
+                pass
+    assert guard.queue_timeouts == 1
+    assert guard.breaker.state == "closed"
+    assert (guard.in_flight, guard.waiting) == (0, 0)
+
+
+async def test_caller_deadline_is_not_an_upstream_failure():
+    guard = GeminiGuard()
+    guard.breaker = CircuitBreaker(failures=1, cooldown_s=60)
+
+    async def slow():
+        await asyncio.sleep(1)
+        return "answer"
+
+    with pytest.raises(asyncio.TimeoutError):
+        await guard.call("k", slow, timeout=0.01)
+    await asyncio.sleep(0.02)
+    assert guard.breaker.state == "closed"
+
+
+async def test_upstream_timeout_counts_against_the_breaker(monkeypatch):
+    monkeypatch.setattr(gemini_guard, "GEMINI_CALL_TIMEOUT_S", 0.01)
+    guard = GeminiGuard()
+    guard.breaker = CircuitBreaker(failures=1, cooldown_s=60)
+
+    async def slow():
+        await asyncio.sleep(1)
+        return "answer"
+
+    with pytest.raises(asyncio.TimeoutError):
+        await guard.call("k", slow, timeout=5)
+    assert guard.breaker.state == "open"
+
+
+async def test_abandoned_flight_errors_are_retrieved():
+    guard = GeminiGuard()
+    unretrieved = []
+    loop = asyncio.get_running_loop()
+    loop.set_exception_handler(lambda _loop, context: unretrieved.append(context))
+
+    async def broken():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("500 from upstream")
+
+    with pytest.raises(asyncio.TimeoutError):
+        await guard.call("k", broken, timeout=0.01)
+    await asyncio.sleep(0.05)
+    gc.collect()
+    loop.set_exception_handler(None)
+    assert unretrieved == []
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from backend.utils.bm25 import BM25Index
+from backend.utils.vectorstore import SimpleVectorStore
+
+# doc i's dense vector is the unit vector e_i; only doc 7 mentions refunds
+TEXTS = [f"bus schedule number {i}" for i in range(7)] + ["refund policy for cancelled tickets"]
+QUERY = "refund policy"
+
+
+def _unit(i: int, dim: int = 8) -> np.ndarray:
+    v = np.zeros(dim, dtype=np.float32)
+    v[i] = 1.0
+    return v
+
+
+@pytest.fixture
+def store():
+    return SimpleVectorStore.from_embeddings(
+        np.eye(8, dtype=np.float32), [{"text": t} for t in TEXTS],
+        lexical=BM25Index.build(TEXTS))
+
+
+@pytest.fixture
+def q_emb():
+    # dense order 0 > 1 > 2 > 3 > 4 > ...; doc 7 is dense-orthogonal
+    return np.array([1.0, 0.8, 0.6, 0.4, 0.2, 0.0, 0.0, 0.0], dtype=np.float32)
+
+
+def test_lexical_only_hit_joins_with_its_exact_dense_score(store, q_emb):
+    hits = store.hybrid_search(QUERY, q_emb, k=1, lexical_weight=2.0)
+    assert hits[0]["id"] == 7
+    assert hits[0]["dense"] == pytest.approx(0.0)
+    # matches every query term at its best weight
+    assert hits[0]["lexical"] == pytest.approx(1.0)
+    assert hits[0]["score"] == pytest.approx(2.0)
+
+
+def test_dense_hits_keep_their_cosine(store, q_emb):
+    hits = store.hybrid_search(QUERY, q_emb, k=3, lexical_weight=0.3)
+    cosines = q_emb / np.linalg.norm(q_emb)
+    for hit in hits:
+        if hit["id"] != 7:
+            assert hit["lexical"] == 0.0
+            assert hit["score"] == pytest.approx(float(cosines[hit["id"]]))
+
+
+def test_partial_match_gets_a_share_of_the_weight(store, q_emb):
+    full = store.hybrid_search(QUERY, q_emb, k=8)
+    partial = store.hybrid_search("refund weather", q_emb, k=8)
+    lexical = lambda hits: next(h["lexical"] for h in hits if h["id"] == 7)
+    assert 0.0 < lexical(partial) < lexical(full) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("lexical", [None, "off"])
+def test_without_lexical_it_is_dense_search(store, q_emb, lexical):
+    if lexical is None:
+        store.lexical = None
+        hits = store.hybrid_search(QUERY, q_emb, k=3)
+    else:
+        hits = store.hybrid_search(QUERY, q_emb, k=3, lexical_weight=0.0)
+    assert hits == store.search_by_vector(q_emb, k=3)
+    assert [h["id"] for h in hits] == [0, 1, 2]
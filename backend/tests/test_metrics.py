@@ -0,0 +1,48 @@
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+
+from backend.utils import metrics
+from backend.utils.metrics import MetricsMiddleware
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """An app shaped like main.py: routers under include prefixes, metrics outermost."""
+    monkeypatch.setattr(metrics, "HTTP_REQUESTS", metrics.Counter(
+        "http_requests_total", "Requests per route and status", ("method", "route", "status")))
+    fares, tickets = APIRouter(), APIRouter()
+
+    # declared like backend/routes/fares.py: the include prefix is the whole path
+    @fares.get("")
+    async def get_routes():
+        return []
+
+    @tickets.get("/{ticket_id}")
+    async def get_ticket(ticket_id: str):
+        return {"id": ticket_id}
+
+    app = FastAPI()
+    app.include_router(fares, prefix="/routes")
+    app.include_router(tickets, prefix="/tickets")
+    app.add_middleware(MetricsMiddleware)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def _routes_seen(client, *paths):
+    async with client:
+        for path in paths:
+            await client.get(path)
+    return {route for _, route, _ in metrics.HTTP_REQUESTS._values}
+
+
+async def test_empty_route_template_is_labelled_with_its_prefix(client):
+    assert await _routes_seen(client, "/routes") == {"/routes"}
+
+
+async def test_path_parameters_stay_templated(client):
+    assert await _routes_seen(client, "/tickets/a1", "/tickets/b2") == {"/tickets/{ticket_id}"}
+
+
+async def test_unmatched_paths_share_one_label(client):
+    assert await _routes_seen(client, "/nope", "/also/nope") == {"unmatched"}
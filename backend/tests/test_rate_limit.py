@@ -0,0 +1,115 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.utils import rate_limit
+from backend.utils.jwt import create_token
+from backend.utils.rate_limit import MemoryBucketStore, RateLimitMiddleware, RateLimiter, parse_rules
+
+RULES = "POST /chat/ask=0.5:2"
+
+
+def _client(limiter: RateLimiter, app: FastAPI = None) -> httpx.AsyncClient:
+    if app is None:
+        app = FastAPI()
+
+        @app.post("/chat/ask")
+        async def ask():
+            return {"answer": "ok"}
+
+        @app.get("/tickets/my")
+        async def my_tickets():
+            return []
+
+        @app.get("/healthz")
+        async def healthz():
+            return {"status": "ok"}
+
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def _bearer(email: str) -> dict:
+    return {"Authorization": f"Bearer {create_token({'sub': email}, days=1)}"}
+
+
+#  RATE LIMITS
+def test_parse_rules():
+    assert parse_rules(" post /chat/ask=0.5:10, GET /x=2 ,") == {
+        ("POST", "/chat/ask"): (0.5, 10.0), ("GET", "/x"): (2.0, 1.0)}
+
+
+async def test_empty_bucket_gets_429_with_retry_after():
+    limiter = RateLimiter(MemoryBucketStore(), rules=parse_rules(RULES))
+    async with _client(limiter) as client:
+        statuses = [(await client.post("/chat/ask")).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+
+        r = await client.post("/chat/ask")
+        assert r.json() == {"detail": "Too many requests"}
+        # one token at 0.5/s is about 2 s away
+        assert 1 <= int(r.headers["retry-after"]) <= 2
+        # routes without a rule are never limited
+        for _ in range(5):
+            assert (await client.get("/tickets/my")).status_code == 200
+    assert limiter.limited == 2
+
+
+async def test_each_user_has_their_own_bucket():
+    limiter = RateLimiter(MemoryBucketStore(), rules=parse_rules(RULES))
+    async with _client(limiter) as client:
+        rina, karim = _bearer("rina@example.com"), _bearer("karim@example.com")
+        assert [(await client.post("/chat/ask", headers=rina)).status_code for _ in range(3)] == [200, 200, 429]
+        # same IP, but its bucket is RATE_LIMIT_IP_FACTOR times larger for signed-in users
+        assert (await client.post("/chat/ask", headers=karim)).status_code == 200
+
+
+def test_buckets_refill_at_the_rule_rate(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    store = MemoryBucketStore()
+    assert store.take_now("k", rate=0.5, burst=1) == (True, 0.0)
+    allowed, retry_after = store.take_now("k", rate=0.5, burst=1)
+    assert not allowed and retry_after == pytest.approx(2.0)
+    now[0] += 2.0
+    assert store.take_now("k", rate=0.5, burst=1)[0]
+
+
+#  LOAD SHEDDING
+async def test_requests_over_max_in_flight_are_shed():
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    limiter = RateLimiter(MemoryBucketStore(), rules={}, max_in_flight=1)
+    async with _client(limiter, app) as client:
+        held = asyncio.create_task(client.get("/slow"))
+        while limiter.in_flight == 0:
+            await asyncio.sleep(0.001)
+
+        r = await client.get("/slow")
+        assert r.status_code == 503 and r.headers["retry-after"] == "1"
+        # probes are exempt so an overloaded pod is not restarted
+        assert (await client.get("/healthz")).status_code == 200
+
+        release.set()
+        assert (await held).status_code == 200
+    assert limiter.in_flight == 0 and limiter.shed == 1
+
+
+async def test_loop_lag_sheds_only_limited_routes():
+    limiter = RateLimiter(MemoryBucketStore(), rules=parse_rules(RULES), max_loop_lag_ms=250)
+    limiter.loop_lag_s = 0.5
+    async with _client(limiter) as client:
+        assert (await client.post("/chat/ask")).status_code == 503
+        assert (await client.get("/tickets/my")).status_code == 200
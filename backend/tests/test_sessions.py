@@ -0,0 +1,132 @@
+import time
+
+import pytest
+
+from backend.utils import rag, sessions
+from backend.utils.context_builder import count_tokens
+from backend.utils.fast_path import fast_path
+from backend.utils.sessions import ChatSessions, MemorySessionStore, SessionStore
+
+
+@pytest.fixture
+def chat():
+    return ChatSessions(MemorySessionStore())
+
+
+async def _converse(chat, questions):
+    """Run questions through one session; returns the standalone rewrites."""
+    session_id, state = await chat.open(None)
+    rewrites = []
+    for question in questions:
+        standalone = chat.rewrite(question, state)
+        await chat.record(session_id, state, question, standalone, "Sure. More detail here.")
+        rewrites.append(standalone)
+    return rewrites
+
+
+#  OPENING SESSIONS
+async def test_open_issues_ids_and_resumes_known_ones(chat):
+    session_id, state = await chat.open(None)
+    await chat.record(session_id, state, "hi", "hi", "Hello.")
+    resumed_id, resumed = await chat.open(session_id)
+    assert resumed_id == session_id and resumed["turns"] == [["hi", "Hello."]]
+
+
+@pytest.mark.parametrize("client_id", ["1", "my-session", "x" * 64])
+async def test_unknown_ids_are_never_adopted(chat, client_id):
+    session_id, state = await chat.open(client_id)
+    assert session_id != client_id and len(session_id) >= 20
+    assert state == sessions.new_session()
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+#  REWRITING
+async def test_follow_ups_inherit_intent_and_place(chat):
+    rewrites = await _converse(chat, [
+        "How much is a ticket from Khulna to Daulatpur?",
+        "what about Sylhet",
+        "which companies go there",
+    ])
+    assert rewrites[1] == "fare Sylhet"
+    assert rewrites[2] == "which companies go there in Sylhet"
+
+
+async def test_question_with_its_own_topic_is_left_alone(chat):
+    rewrites = await _converse(chat, ["Which bus companies cover Sylhet?",
+                                      "the privacy policy of Green Line"])
+    assert rewrites[1] == "the privacy policy of Green Line"
+
+
+async def test_non_catalog_turn_clears_stale_focus(chat):
+    rewrites = await _converse(chat, [
+        "Which bus companies cover Sylhet?",
+        "who covers it",
+        "can I get a refund?",
+        "Tell me about Green Line privacy policy",
+        "and Hanif?",
+    ])
+    assert rewrites[-1] == "Hanif (Tell me about Green Line privacy policy)"
+    assert fast_path.match(rewrites[-1]) is None
+
+
+async def test_first_question_is_never_rewritten(chat):
+    assert await _converse(chat, ["what about it"]) == ["what about it"]
+
+
+#  HISTORY
+async def test_history_keeps_recent_turns_and_a_bounded_summary(chat, monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_TURNS", 2)
+    monkeypatch.setattr(sessions, "SUMMARY_TOKENS", 40)
+    session_id, state = await chat.open(None)
+    for i in range(12):
+        await chat.record(session_id, state, f"question number {i}?", f"q{i}",
+                          f"Answer {i} first sentence. Second sentence is dropped.")
+
+    assert [q for q, _ in state["turns"]] == ["question number 10?", "question number 11?"]
+    assert state["summary"][-1].startswith("User asked: question number 9")
+    assert "Second sentence" not in " ".join(state["summary"])
+    assert count_tokens(" ".join(state["summary"])) <= 40
+
+    lines = chat.history(state)
+    assert lines[0].startswith("Earlier: ")
+    assert lines[-2:] == ["User: question number 11?", "Assistant: Answer 11 first sentence. Second sentence is dropped."]
+
+
+#  MEMORY STORE
+async def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(max_sessions=2, idle_s=60)
+    await store.save("a", {"n": 1})
+    await store.save("b", {"n": 2})
+    await store.load("a")
+    await store.save("c", {"n": 3})
+    assert await store.load("b") is None
+    assert await store.load("a") == {"n": 1}
+    assert store.evicted_lru == 1
+
+
+async def test_memory_store_evicts_idle_sessions():
+    store = MemorySessionStore(max_sessions=10, idle_s=0.01)
+    await store.save("a", {"n": 1})
+    time.sleep(0.02)
+    assert await store.load("a") is None
+    assert store.evicted_idle == 1
+
+
+#  ANSWER CACHE ISOLATION
+async def test_answers_with_history_bypass_the_answer_cache(fake_rag):
+    question = "tell me about the luggage rules"
+    history = ["User: my earlier question", "Assistant: my earlier answer"]
+
+    await rag.agenerate_answer(question, history=history)
+    assert rag.answer_cache.stats()["entries"] == 0
+
+    await rag.agenerate_answer(question)
+    assert rag.answer_cache.stats()["entries"] == 1
+    calls = fake_rag.calls
+    # a later turn of some conversation must not be served the shared answer
+    await rag.agenerate_answer(question, history=history)
+    assert fake_rag.calls == calls + 1
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from backend.routes import tickets
+from backend.routes.auth import UserOut
+
+
+USER = UserOut(name="Rahim", email="rahim@example.com")
+
+
+def _ticket(email: str, n: int) -> dict:
+    return {"_id": ObjectId(), "fullname": f"Passenger {n}", "phone": "01700000000",
+            "district": "Khulna", "drop_point": "Daulatpur", "price": 400, "seats": 1,
+            "trip_id": None, "user_email": email, "user_name": "x"}
+
+
+@pytest.fixture
+def ticket_db(fake_db, monkeypatch):
+    monkeypatch.setattr(tickets, "db", fake_db)
+    return fake_db
+
+
+async def _page(cursor=None, limit=3) -> dict:
+    response = await tickets.get_my_tickets_page(user=USER, cursor=cursor, limit=limit)
+    return json.loads(response.body)
+
+
+async def test_keyset_pages_cover_every_ticket_once_in_id_order(ticket_db):
+    mine = [_ticket(USER.email, n) for n in range(7)]
+    for doc in mine + [_ticket("other@example.com", n) for n in range(2)]:
+        await ticket_db.tickets.insert_one(doc)
+
+    seen, cursor, sizes = [], None, []
+    while True:
+        page = await _page(cursor)
+        sizes.append(len(page["items"]))
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sizes == [3, 3, 1]
+    assert seen == sorted(str(doc["_id"]) for doc in mine)
+
+
+async def test_exact_multiple_has_no_trailing_cursor(ticket_db):
+    for n in range(3):
+        await ticket_db.tickets.insert_one(_ticket(USER.email, n))
+    page = await _page(limit=3)
+    assert len(page["items"]) == 3 and page["next_cursor"] is None
+
+
+async def test_items_carry_the_principal_not_stored_owner_fields(ticket_db):
+    await ticket_db.tickets.insert_one(_ticket(USER.email, 0))
+    item = (await _page())["items"][0]
+    assert item["user_name"] == USER.name
+    assert set(item) == set(tickets.TicketOut.model_fields)
+
+
+def test_cursor_round_trip():
+    oid = ObjectId()
+    assert tickets._decode_cursor(tickets._encode_cursor(oid)) == oid
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "AAAA", ""])
+def test_bad_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        tickets._decode_cursor(cursor)
+    assert e.value.status_code == 400
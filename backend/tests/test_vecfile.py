@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from backend.utils import vecfile
+
+# worst-case per-component error of each storage dtype on unit vectors
+TOLERANCE = {"float32": 0.0, "float16": 1e-3, "int8": 1 / 127}
+
+
+def _normed(rows: int = 20, dim: int = 16, seed: int = 0) -> np.ndarray:
+    x = np.random.default_rng(seed).standard_normal((rows, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("dtype", vecfile.DTYPES)
+def test_round_trip_per_dtype(tmp_path, dtype):
+    normed = _normed()
+    metas = [{"text": f"chunk {i} – ঢাকা", "hash": str(i)} for i in range(len(normed))]
+    vecfile.write_store(tmp_path, normed, metas, dtype=dtype)
+
+    manifest, vectors, scales, loaded = vecfile.open_store(tmp_path)
+    assert manifest == {"format": vecfile.FORMAT_VERSION, "dtype": dtype, "rows": 20, "dim": 16}
+    assert isinstance(vectors, np.memmap) and vectors.dtype == np.dtype(dtype)
+    assert (scales is not None) == (dtype == "int8")
+    assert np.allclose(vecfile.dequantize(vectors, scales), normed, atol=TOLERANCE[dtype], rtol=0)
+    assert list(loaded) == metas
+    assert loaded[-1] == metas[-1] and loaded[2:4] == metas[2:4]
+
+
+def test_rewriting_as_float_drops_stale_scales(tmp_path):
+    normed = _normed()
+    vecfile.write_store(tmp_path, normed, [{"text": "x"}] * 20, dtype="int8")
+    vecfile.write_store(tmp_path, normed, [{"text": "x"}] * 20, dtype="float16")
+    assert not (tmp_path / vecfile.SCALES_NAME).exists()
+    assert vecfile.open_store(tmp_path)[2] is None
+
+
+def test_empty_metas_open(tmp_path):
+    vecfile.write_store(tmp_path, np.zeros((0, 4), dtype=np.float32), [])
+    _, vectors, _, metas = vecfile.open_store(tmp_path)
+    assert vectors.shape == (0, 4) and len(metas) == 0
+
+
+def test_unknown_format_is_refused(tmp_path):
+    vecfile.write_store(tmp_path, _normed(), [{"text": "x"}] * 20)
+    (tmp_path / vecfile.MANIFEST_NAME).write_text('{"format": 1, "dtype": "float32"}')
+    with pytest.raises(ValueError):
+        vecfile.open_store(tmp_path)
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.tools.fakes import fake_embed
+
+CHUNKS = [
+    "Green Line runs Dhaka to Sylhet for 850 taka",
+    "Hanif runs Dhaka to Khulna for 700 taka",
+    "Refunds are paid within 7 days of cancellation",
+]
+
+
+@pytest.fixture
+def store(tmp_vectorstore, monkeypatch):
+    """tmp_vectorstore (as .vs) over a mutable copy of CHUNKS, recording every text it embeds."""
+    chunks = list(CHUNKS)
+    embedded = []
+
+    def encode(texts):
+        embedded.extend(texts)
+        return fake_embed(texts, tmp_vectorstore.DEFAULT_DIM)
+
+    monkeypatch.setattr(tmp_vectorstore, "prepare_chunks", lambda: list(chunks))
+    monkeypatch.setattr(tmp_vectorstore, "embed_texts_local_safe", encode)
+    return SimpleNamespace(vs=tmp_vectorstore, chunks=chunks, embedded=embedded)
+
+
+def test_rebuild_embeds_only_new_or_changed_chunks(store):
+    store.vs.create_vectorstore()
+    assert store.embedded == CHUNKS
+
+    store.embedded.clear()
+    store.chunks[1] = "Hanif runs Dhaka to Khulna for 750 taka"
+    store.chunks.append("Luggage up to 20 kg is free")
+    store.vs.create_vectorstore()
+    assert store.embedded == [store.chunks[1], store.chunks[3]]
+
+    live = store.vs.load_vectorstore()
+    assert [m["text"] for m in live.metas] == store.chunks
+    # reused rows are the same vectors a full embed would produce
+    expected = store.vs._normalize_rows(fake_embed(store.chunks, store.vs.DEFAULT_DIM))
+    assert np.allclose(live.normed, expected, atol=1e-6)
+
+
+def test_unchanged_corpus_embeds_nothing(store):
+    store.vs.create_vectorstore()
+    store.embedded.clear()
+    store.vs.create_vectorstore()
+    assert store.embedded == []
+
+
+def test_full_rebuild_embeds_everything(store):
+    store.vs.create_vectorstore()
+    store.embedded.clear()
+    store.vs.create_vectorstore(full=True)
+    assert store.embedded == CHUNKS
+
+
+def test_current_swaps_to_each_new_version(store):
+    first = store.vs.create_vectorstore()
+    assert store.vs.CURRENT_FILE.read_text() == first.name == "v000001"
+    version = store.vs.current_store_version()
+
+    store.chunks.append("Luggage up to 20 kg is free")
+    second = store.vs.create_vectorstore()
+    assert store.vs.active_store_dir() == second and second.name == "v000002"
+    assert store.vs.current_store_version() != version
+    assert len(store.vs.load_vectorstore()) == len(CHUNKS) + 1
+    assert not list(store.vs.VECTOR_DIR.glob(".*.tmp")) and not list(store.vs.VERSIONS_DIR.glob(".*.tmp"))
+
+
+def test_old_versions_are_pruned(store):
+    for _ in range(store.vs.KEEP_VERSIONS + 2):
+        store.vs.create_vectorstore()
+    kept = sorted(p.name for p in store.vs.VERSIONS_DIR.iterdir())
+    assert kept == [f"v{n:06d}" for n in range(3, store.vs.KEEP_VERSIONS + 3)]
+
+
+def test_rebuild_keeps_the_live_dtype(store):
+    store.vs.create_vectorstore(dtype="int8")
+    store.vs.create_vectorstore()
+    assert store.vs.load_vectorstore().scales is not None
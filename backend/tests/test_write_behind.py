@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from backend.tools.fakes import FakeCollection
+from backend.utils.write_behind import InsertBatcher, WriteQueueFull
+
+
+class DownCollection(FakeCollection):
+    async def insert_many(self, docs, ordered=True):
+        raise PyMongoError("primary unreachable")
+
+
+class GatedCollection(FakeCollection):
+    """insert_many waits until the test opens the gate."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.gate = asyncio.Event()
+
+    async def insert_many(self, docs, ordered=True):
+        await self.gate.wait()
+        return await super().insert_many(docs, ordered=ordered)
+
+
+async def test_concurrent_inserts_share_one_batch(fake_db):
+    batcher = InsertBatcher(fake_db.tickets, max_delay_ms=20)
+    await batcher.start()
+    try:
+        ids = await asyncio.gather(*(batcher.insert({"n": i}) for i in range(10)))
+    finally:
+        await batcher.stop()
+
+    assert len(set(ids)) == 10
+    assert batcher.batches == 1 and batcher.inserted == 10
+    assert len(await fake_db.tickets.find().to_list()) == 10
+
+
+async def test_duplicate_fails_only_its_own_caller(fake_db):
+    taken = ObjectId()
+    await fake_db.tickets.insert_one({"_id": taken})
+    batcher = InsertBatcher(fake_db.tickets, max_delay_ms=20)
+    await batcher.start()
+    try:
+        results = await asyncio.gather(
+            batcher.insert({"n": 1}), batcher.insert({"_id": taken}), batcher.insert({"n": 2}),
+            return_exceptions=True,
+        )
+    finally:
+        await batcher.stop()
+
+    assert isinstance(results[1], PyMongoError)
+    assert all(isinstance(r, ObjectId) for r in (results[0], results[2]))
+    assert batcher.inserted == 2
+
+
+async def test_failed_flush_fails_every_caller_and_keeps_running():
+    batcher = InsertBatcher(DownCollection("tickets"), max_delay_ms=5)
+    await batcher.start()
+    try:
+        results = await asyncio.gather(*(batcher.insert({"n": i}) for i in range(3)),
+                                       return_exceptions=True)
+        assert all(isinstance(r, PyMongoError) for r in results)
+        # the flusher survived the failure
+        assert batcher.running
+        with pytest.raises(PyMongoError):
+            await batcher.insert({"n": 4})
+    finally:
+        await batcher.stop()
+
+
+async def test_full_queue_rejects_instead_of_waiting():
+    collection = GatedCollection("tickets")
+    batcher = InsertBatcher(collection, max_delay_ms=0, max_queue=1, enqueue_timeout_s=0.01)
+    await batcher.start()
+    first = asyncio.create_task(batcher.insert({"n": 1}))
+    await asyncio.sleep(0.01)  # the flusher takes it and blocks on the gate
+    second = asyncio.create_task(batcher.insert({"n": 2}))
+    await asyncio.sleep(0)  # fills the one queue slot
+
+    with pytest.raises(WriteQueueFull):
+        await batcher.insert({"n": 3})
+    assert batcher.rejected == 1
+
+    collection.gate.set()
+    await asyncio.gather(first, second)
+    await batcher.stop()
+
+
+async def test_insert_requires_start(fake_db):
+    with pytest.raises(RuntimeError):
+        await InsertBatcher(fake_db.tickets).insert({"n": 1})
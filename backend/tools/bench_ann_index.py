@@ -0,0 +1,67 @@
+"""
+Recall@k and per-query latency: brute force vs faiss IVF-Flat / HNSW.
+
+Uses synthetic clustered vectors so it runs without the embedding model.
+
+    python -m backend.tools.bench_ann_index --rows 200000 --queries 500
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend.utils.vectorstore import SimpleVectorStore, build_index, _normalize_rows
+
+
+def synthetic(rows: int, queries: int, dim: int, clusters: int, spread: float, seed: int = 0):
+    """Clustered corpus plus queries drawn around the same cluster centers."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+
+    def sample(n):
+        assign = rng.integers(0, clusters, size=n)
+        return (centers[assign] + spread * rng.normal(size=(n, dim))).astype(np.float32)
+
+    return sample(rows), sample(queries)
+
+
+def top_ids(store, queries, k):
+    ids, times = [], []
+    text_to_id = {m["text"]: i for i, m in enumerate(store.metas)}
+    for q in queries:
+        start = time.perf_counter()
+        hits = store.search_by_vector(q, k=k)
+        times.append((time.perf_counter() - start) * 1000)
+        ids.append({text_to_id[h["text"]] for h in hits})
+    return ids, np.array(times)
+
+
+def main(args):
+    embs, queries = synthetic(args.rows, args.queries, args.dim, args.clusters, args.spread)
+    metas = [{"text": str(i)} for i in range(args.rows)]
+
+    exact = SimpleVectorStore.from_embeddings(embs, metas)
+    truth, brute_ms = top_ids(exact, queries, args.k)
+    print(f"{'backend':<10} {'build s':>8} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p99 ms':>8}")
+    print(f"{'flat':<10} {0:>8.2f} {1.0:>10.3f} {np.percentile(brute_ms, 50):>8.3f} {np.percentile(brute_ms, 99):>8.3f}")
+
+    for index_type in ("ivf", "hnsw"):
+        start = time.perf_counter()
+        index, _ = build_index(_normalize_rows(embs), index_type)
+        build_s = time.perf_counter() - start
+
+        store = SimpleVectorStore.from_embeddings(embs, metas, index=index, index_type=index_type)
+        found, ms = top_ids(store, queries, args.k)
+        recall = np.mean([len(f & t) / args.k for f, t in zip(found, truth)])
+        print(f"{index_type:<10} {build_s:>8.2f} {recall:>10.3f} {np.percentile(ms, 50):>8.3f} {np.percentile(ms, 99):>8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--spread", type=float, default=0.5, help="within-cluster noise; higher is harder")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("-k", type=int, default=4)
+    main(parser.parse_args())
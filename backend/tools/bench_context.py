@@ -0,0 +1,98 @@
+"""
+Prompt size before/after the context builder, and optionally Gemini latency.
+
+"before" is the old prompt: every hit above the threshold joined in full.
+"after" goes through context_builder (MMR dedup + token budget + sentence
+trimming). Tokens are counted with tiktoken. `kept` is the share of
+questions whose expected chunk text still reaches the prompt.
+
+With --gemini N (needs GEMINI_API_KEY) the first N questions are sent to
+Gemini with both prompts and the call latency is compared.
+
+    python -m backend.tools.bench_context --k 8 --threshold 0.32 --gemini 10
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.utils.context_builder import context_builder, count_tokens
+from backend.utils.vectorstore import load_vectorstore
+from backend.utils import rag
+
+
+EVAL_FILE = Path(__file__).parent.parent / "data" / "retrieval_eval.json"
+
+
+def build_prompts(store, cases, k, threshold):
+    rows = []
+    for case in cases:
+        q_emb = store._embed_query(case["question"])
+        relevant = rag._relevant_hits(store.hybrid_search(case["question"], q_emb, k=k), threshold)
+
+        start = time.perf_counter()
+        lines, _ = context_builder.build(relevant, store)
+        build_us = (time.perf_counter() - start) * 1e6
+
+        rows.append({
+            "case": case,
+            "before": rag._build_prompt(case["question"], [h["text"] for h in relevant]),
+            "after": rag._build_prompt(case["question"], lines),
+            "build_us": build_us,
+        })
+    return rows
+
+
+def summarize(rows, side):
+    tokens = np.array([count_tokens(r[side]) for r in rows])
+    kept = sum(r["case"]["expected"] in r[side] for r in rows)
+    return tokens, kept / len(rows)
+
+
+def time_gemini(prompts):
+    client = rag.gemini_client()
+    times = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        client.models.generate_content(
+            model=rag.GEMINI_MODEL, contents=prompt, config=rag._generation_config(500, 0.45)
+        )
+        times.append(time.perf_counter() - start)
+    return np.array(times)
+
+
+def main(args):
+    with open(args.eval_file, "r", encoding="utf-8") as f:
+        cases = json.load(f)["questions"]
+
+    store = load_vectorstore()
+    print(f"store {store.version}: {len(store)} chunks, {len(cases)} questions, "
+          f"k={args.k}, budget {context_builder.budget_tokens} tokens")
+    rows = build_prompts(store, cases, args.k, args.threshold)
+
+    print(f"{'prompt':<8} {'tokens':>8} {'p50':>6} {'max':>6} {'kept':>6}")
+    for side in ("before", "after"):
+        tokens, kept = summarize(rows, side)
+        print(f"{side:<8} {tokens.sum():>8} {np.percentile(tokens, 50):>6.0f} {tokens.max():>6} {kept:>6.2f}")
+    build = np.array([r["build_us"] for r in rows])
+    print(f"context build: p50 {np.percentile(build, 50):.0f} us, p99 {np.percentile(build, 99):.0f} us")
+
+    if args.gemini:
+        if not rag.HAS_GEMINI:
+            raise SystemExit("--gemini needs GEMINI_API_KEY")
+        sample = rows[:args.gemini]
+        for side in ("before", "after"):
+            t = time_gemini([r[side] for r in sample])
+            print(f"gemini {side:<6} p50 {np.percentile(t, 50) * 1000:.0f} ms, "
+                  f"mean {t.mean() * 1000:.0f} ms over {len(t)} calls")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eval-file", type=Path, default=EVAL_FILE)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--threshold", type=float, default=0.32)
+    parser.add_argument("--gemini", type=int, default=0, help="questions to send to Gemini per prompt variant")
+    main(parser.parse_args())
@@ -0,0 +1,55 @@
+"""
+Queries/second for single-query embedding: direct encode vs EmbeddingBroker.
+
+Each client thread encodes its own stream of distinct questions, so the
+broker's exact-match LRU never hits and only batching is measured.
+
+    python -m backend.tools.bench_embedding_broker --queries 256
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.utils.embedder import EmbeddingBroker
+from backend.utils.vectorstore import embed_texts_local_safe
+
+TEMPLATES = [
+    "How much is a bus ticket from Dhaka to {}?",
+    "Which bus companies cover {}?",
+    "Is there an evening bus to {} today?",
+]
+
+
+def make_queries(client: int, n: int):
+    return [TEMPLATES[i % len(TEMPLATES)].format(f"stop {client}-{i}") for i in range(n)]
+
+
+def run(embed_one, clients: int, per_client: int) -> float:
+    def worker(c):
+        for q in make_queries(c, per_client):
+            embed_one(q)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(worker, range(clients)))
+    return clients * per_client / (time.perf_counter() - start)
+
+
+def main(args):
+    embed_texts_local_safe(["warm up"])
+
+    print(f"{'clients':>8} {'direct q/s':>12} {'broker q/s':>12} {'avg batch':>10}")
+    for clients in args.clients:
+        per_client = max(1, args.queries // clients)
+        broker = EmbeddingBroker(embed_texts_local_safe, cache_size=0)
+
+        direct = run(lambda q: embed_texts_local_safe([q])[0], clients, per_client)
+        batched = run(broker.embed, clients, per_client)
+        print(f"{clients:>8} {direct:>12.1f} {batched:>12.1f} {broker.stats()['avg_batch']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=256, help="total queries per run")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    main(parser.parse_args())
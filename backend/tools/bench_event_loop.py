@@ -0,0 +1,140 @@
+"""
+Measure /tickets/my latency with and without chat traffic in flight.
+
+Run against a live server started with the rate limiter off (every bench
+client shares one IP) and the answer cache off (the questions repeat, and a
+cached answer never reaches Gemini):
+
+    RATE_LIMIT_RULES= ANSWER_CACHE_SIZE=0 uvicorn backend.main:app
+    python -m backend.tools.bench_event_loop --chat-clients 8 --seconds 15
+
+or with --in-process, which runs the app in this process against the
+loadtest stand-ins with both turned off. If /chat/ask blocks the event
+loop, the "with chat" p99 jumps to the Gemini latency; with the async RAG
+path it should stay close to the idle baseline.
+Non-200 chat replies are counted: a run full of 429s or 503s measured the
+limiter, not RAG.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+# only read by --in-process; a live server needs these in its own environment
+os.environ.setdefault("MONGO_URL", "mongodb://bench.invalid:27017")
+os.environ.setdefault("VECTORSTORE_WATCH_S", "0")
+os.environ.setdefault("WARMUP_ON_START", "0")
+os.environ.setdefault("RATE_LIMIT_RULES", "")
+os.environ.setdefault("ANSWER_CACHE_SIZE", "0")
+
+BASE_URL = "http://127.0.0.1:8000"
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+# policy questions: the fare-catalog fast path leaves these to RAG
+QUESTIONS = [
+    "Can I cancel my ticket and get a refund?",
+    "How much luggage can I bring on the bus?",
+    "What is Green Line's privacy policy?",
+]
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def get_token(client: httpx.AsyncClient) -> str:
+    await client.post("/auth/signup", json={"name": "Bench", "email": EMAIL, "password": PASSWORD})
+    r = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+    r.raise_for_status()
+    return r.json()["token"]
+
+
+async def probe_tickets(client, token, stop_at, samples):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        r = await client.get("/tickets/my", headers=headers)
+        r.raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.02)
+
+
+async def chat_load(client, stop_at, worker_id, statuses):
+    i = worker_id
+    while time.perf_counter() < stop_at:
+        try:
+            r = await client.post("/chat/ask", json={"q": QUESTIONS[i % len(QUESTIONS)]}, timeout=60)
+            statuses[r.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        i += 1
+
+
+async def run_phase(client, token, seconds, chat_clients):
+    samples = []
+    statuses = Counter()
+    stop_at = time.perf_counter() + seconds
+    tasks = [probe_tickets(client, token, stop_at, samples)]
+    tasks += [chat_load(client, stop_at, n, statuses) for n in range(chat_clients)]
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return samples, statuses
+
+
+def report(label, samples):
+    print(
+        f"{label:<12} n={len(samples):<5} "
+        f"p50={percentile(samples, 50):8.1f}ms "
+        f"p99={percentile(samples, 99):8.1f}ms "
+        f"max={max(samples) if samples else float('nan'):8.1f}ms "
+        f"mean={statistics.fmean(samples) if samples else float('nan'):8.1f}ms"
+    )
+
+
+async def bench(client, args):
+    token = await get_token(client)
+    idle, _ = await run_phase(client, token, args.seconds, 0)
+    busy, statuses = await run_phase(client, token, args.seconds, args.chat_clients)
+
+    print(f"/tickets/my latency ({args.seconds}s per phase, {args.chat_clients} chat clients)")
+    report("idle", idle)
+    report("with chat", busy)
+
+    ok = statuses.pop(200, 0)
+    failed = sum(statuses.values())
+    detail = ", ".join(f"{code}={n}" for code, n in sorted(statuses.items(), key=str))
+    print(f"chat replies: {ok} ok, {failed} non-200" + (f" ({detail})" if detail else ""))
+
+
+async def main(args):
+    if not args.in_process:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            await bench(client, args)
+        return
+
+    from backend.tools.loadtest import install_fakes
+    args.mongo_ms, args.embed_ms, args.gemini_jitter_ms, args.gemini_empty_rate, args.seed = 0.5, 2, 200, 0.0, 1
+    install_fakes(args)
+    from backend.main import app, lifespan
+
+    transport = httpx.ASGITransport(app=app)
+    async with lifespan(app), httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                                timeout=60) as client:
+        await bench(client, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--chat-clients", type=int, default=8)
+    parser.add_argument("--in-process", action="store_true", help="run the app here against the loadtest fakes")
+    parser.add_argument("--gemini-ms", type=float, default=800, help="fake Gemini latency (--in-process)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,65 @@
+"""
+Cold import cost of the app, from `python -X importtime`.
+
+Imports the target module in a fresh interpreter a few times and reports the
+wall time plus the slowest modules by cumulative import time. The heavy
+dependencies (sentence_transformers/torch, faiss, google.genai) should not
+appear: they load lazily or in the warm-up task.
+
+    python -m backend.tools.bench_import_time --module backend.main --runs 5
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+_LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+WATCHED = ("sentence_transformers", "torch", "faiss", "google.genai")
+
+
+def run_once(module: str):
+    env = {**os.environ, "MONGO_URL": os.getenv("MONGO_URL", "mongodb://localhost:27017")}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr[-2000:])
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            # first occurrence is the real import; keep the largest just in case
+            name, cum_us = m.group(4), int(m.group(2))
+            cumulative[name] = max(cumulative.get(name, 0), cum_us)
+    return wall, cumulative
+
+
+def main(args):
+    walls, last = [], {}
+    for _ in range(args.runs):
+        wall, last = run_once(args.module)
+        walls.append(wall)
+
+    walls.sort()
+    print(f"import {args.module}: wall min {walls[0] * 1000:.0f} ms, "
+          f"median {walls[len(walls) // 2] * 1000:.0f} ms over {args.runs} runs")
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    for name, us in sorted(last.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<40} {us / 1000:>14.1f}")
+
+    loaded = [w for w in WATCHED if any(n == w or n.startswith(w + ".") for n in last)]
+    print("heavy modules imported eagerly:", ", ".join(loaded) if loaded else "none")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    main(parser.parse_args())
@@ -0,0 +1,58 @@
+"""
+Login hashing throughput and event-loop stall: inline verify vs hash pool.
+
+"inline" is the old behaviour (verify_password called on the event loop);
+"pool" is averify_password. A 5 ms ticker runs alongside and reports the
+worst delay it saw, i.e. how long every other route would have frozen.
+
+    python -m backend.tools.bench_login --logins 64 --concurrency 16
+"""
+import argparse
+import asyncio
+import time
+
+from backend.utils.hash import averify_password, hash_pool_stats, hash_password, verify_password
+
+
+async def ticker(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append(time.perf_counter() - start - 0.005)
+
+
+async def run(mode: str, hashed: str, logins: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            if mode == "inline":
+                assert verify_password("bench-password", hashed)
+            else:
+                ok, _ = await averify_password("bench-password", hashed)
+                assert ok
+
+    stop, lags = asyncio.Event(), []
+    tick = asyncio.create_task(ticker(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return logins / elapsed, max(lags, default=0.0) * 1000
+
+
+async def main(args):
+    hashed = hash_password("bench-password")
+    print(f"pool: {hash_pool_stats()}")
+    print(f"{'mode':<8} {'logins/s':>10} {'max loop stall ms':>18}")
+    for mode in ("inline", "pool"):
+        rate, stall = await run(mode, hashed, args.logins, args.concurrency)
+        print(f"{mode:<8} {rate:>10.1f} {stall:>18.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Latency the rate limiter adds per request.
+
+Calls a bare ASGI app directly (no server, no network) with and without
+RateLimitMiddleware in front, so the difference is the limiter alone:
+rule lookup, JWT subject (cached after the first request), bucket updates.
+
+  unlimited  route without a rule (in-flight accounting only)
+  anonymous  limited route, IP bucket only
+  user       limited route with a Bearer token, user + IP buckets
+  rejected   limited route with an empty bucket (429 path)
+
+    python -m backend.tools.bench_rate_limit --requests 50000
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from backend.utils.jwt import create_token
+from backend.utils.rate_limit import MemoryBucketStore, RateLimiter, RateLimitMiddleware
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def make_scope(path: str, headers=()):
+    return {
+        "type": "http", "method": "POST", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "headers": list(headers), "client": ("203.0.113.7", 50000),
+        "server": ("bench", 80), "scheme": "http", "http_version": "1.1",
+    }
+
+
+async def measure(app, scope, n: int) -> np.ndarray:
+    times = np.empty(n)
+    for i in range(n):
+        start = time.perf_counter()
+        await app(scope, receive, send)
+        times[i] = time.perf_counter() - start
+    return times * 1e6
+
+
+async def run(args):
+    token = create_token({"sub": "bench@example.com"})
+    open_rules = {("POST", "/limited"): (1e9, 1e9)}
+    closed_rules = {("POST", "/limited"): (1e-9, 1.0)}
+    cases = {
+        "unlimited": (open_rules, make_scope("/free")),
+        "anonymous": (open_rules, make_scope("/limited")),
+        "user": (open_rules, make_scope("/limited", [(b"authorization", f"Bearer {token}".encode())])),
+        "rejected": (closed_rules, make_scope("/limited")),
+    }
+
+    baseline = await measure(bare_app, make_scope("/free"), args.requests)
+    base_p50 = np.percentile(baseline, 50)
+    print(f"{'case':<10} {'p50 us':>8} {'p99 us':>8} {'added p50 us':>13}")
+    print(f"{'baseline':<10} {base_p50:>8.2f} {np.percentile(baseline, 99):>8.2f} {'':>13}")
+    for name, (rules, scope) in cases.items():
+        limiter = RateLimiter(MemoryBucketStore(), rules=rules, max_in_flight=10 ** 6)
+        app = RateLimitMiddleware(bare_app, limiter)
+        t = await measure(app, scope, args.requests)
+        p50 = np.percentile(t, 50)
+        print(f"{name:<10} {p50:>8.2f} {np.percentile(t, 99):>8.2f} {p50 - base_p50:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000, help="calls per case")
+    asyncio.run(run(parser.parse_args()))
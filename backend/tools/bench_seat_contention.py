@@ -0,0 +1,74 @@
+"""
+Seat contention: many concurrent bookers racing for one trip.
+
+Needs a reachable MongoDB (MONGO_URL). Every mode provisions the same
+capacity in a scratch collection, fires more booking attempts than there
+are seats, and checks that exactly `capacity` succeed (no oversell) and
+that the stored counter ends at zero.
+
+"direct" is one conditional update per booking; "ledger" leases seats in
+blocks and hands them out in memory.
+
+    python -m backend.tools.bench_seat_contention --capacity 2000 --bookers 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.utils.inventory import SeatInventory, SoldOut, trip_key
+
+
+async def run(inventory: SeatInventory, capacity: int, bookers: int, concurrency: int):
+    key = trip_key("bench")
+    await inventory.collection.delete_many({})
+    await inventory.set_capacity(key, capacity)
+
+    sem = asyncio.Semaphore(concurrency)
+    sold = 0
+
+    async def one():
+        nonlocal sold
+        async with sem:
+            try:
+                await inventory.reserve(key, 1, must_exist=True)
+                sold += 1
+            except SoldOut:
+                pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(bookers)))
+    elapsed = time.perf_counter() - start
+
+    await inventory.reconcile(idle_only=False)
+    doc = await inventory.get(key)
+    return bookers / elapsed, sold, doc["available"]
+
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_url)
+    collection = client["shohoj_ticket"]["bench_inventory"]
+
+    modes = [("direct", 0), ("ledger", args.block)]
+    try:
+        print(f"capacity {args.capacity}, {args.bookers} bookers, {args.concurrency} concurrent")
+        print(f"{'mode':<8} {'attempts/s':>11} {'sold':>6} {'left':>6} {'oversold':>9}")
+        for name, block in modes:
+            inventory = SeatInventory(collection, ledger_block=block)
+            rate, sold, left = await run(inventory, args.capacity, args.bookers, args.concurrency)
+            oversold = "YES" if sold > args.capacity or left < 0 else "no"
+            print(f"{name:<8} {rate:>11.0f} {sold:>6} {left:>6} {oversold:>9}")
+    finally:
+        await collection.drop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.getenv("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--capacity", type=int, default=2000)
+    parser.add_argument("--bookers", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--block", type=int, default=16, help="seats per ledger lease")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+"""
+Cost of serializing a page of tickets, per response path.
+
+Builds N synthetic ticket documents (same shape as _ticket_out) and times
+turning them into a response body:
+
+  validated  response_model path: TicketOut validation + pydantic dump_json
+  encoder    jsonable_encoder + json.dumps (FastAPI's generic JSONResponse)
+  trusted    FastJSONResponse.render of the dicts (what /tickets/my returns)
+  gzip       trusted body compressed at GZIP_LEVEL (what GZipMiddleware adds)
+
+    python -m backend.tools.bench_serialization --tickets 200 --rounds 2000
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from typing import List
+
+import numpy as np
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from backend.routes.tickets import TicketOut, _ticket_out
+from backend.routes.auth import UserOut
+from backend.utils.responses import FastJSONResponse, GZIP_LEVEL, HAS_ORJSON
+
+
+def make_page(n: int, seed: int) -> List[dict]:
+    rng = random.Random(seed)
+    user = UserOut(name="Bench User", email="bench@example.com")
+    districts = ["Dhaka", "Chattogram", "Sylhet", "Khulna", "Rajshahi", "Barishal"]
+    docs = [{
+        "_id": ObjectId(),
+        "fullname": f"Passenger {i}",
+        "phone": f"01{rng.randrange(10 ** 9):09d}",
+        "district": rng.choice(districts),
+        "drop_point": f"Point {rng.randrange(40)}",
+        "price": rng.randrange(300, 1500, 50),
+        "seats": rng.randint(1, 4),
+        "trip_id": f"trip-{rng.randrange(1000)}",
+    } for i in range(n)]
+    return [_ticket_out(d, user) for d in docs]
+
+
+def measure(fn, rounds: int) -> np.ndarray:
+    times = np.empty(rounds)
+    for i in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times[i] = time.perf_counter() - start
+    return times * 1e6
+
+
+def main(args):
+    page = make_page(args.tickets, args.seed)
+    adapter = TypeAdapter(List[TicketOut])
+    response = FastJSONResponse(None)
+    body = response.render(page)
+
+    cases = {
+        "validated": lambda: adapter.dump_json(adapter.validate_python(page)),
+        "encoder": lambda: json.dumps(jsonable_encoder(page)).encode("utf-8"),
+        "trusted": lambda: response.render(page),
+        "gzip": lambda: gzip.compress(body, compresslevel=GZIP_LEVEL),
+    }
+    sizes = {
+        "validated": len(cases["validated"]()),
+        "encoder": len(cases["encoder"]()),
+        "trusted": len(body),
+        "gzip": len(cases["gzip"]()),
+    }
+
+    print(f"{args.tickets} tickets, {args.rounds} rounds, orjson={'yes' if HAS_ORJSON else 'no'}")
+    print(f"{'path':<10} {'p50 us':>8} {'p99 us':>8} {'bytes':>8}")
+    for name, fn in cases.items():
+        t = measure(fn, args.rounds)
+        print(f"{name:<10} {np.percentile(t, 50):>8.1f} {np.percentile(t, 99):>8.1f} {sizes[name]:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=200, help="tickets per page")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
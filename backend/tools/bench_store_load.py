@@ -0,0 +1,53 @@
+"""
+Load time and search latency of the mmap store at growing corpus sizes.
+
+Writes synthetic stores to a temp dir, so the real vectorstore is untouched.
+
+    python -m backend.tools.bench_store_load --rows 10000 100000 500000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.utils import vecfile
+from backend.utils.vectorstore import SimpleVectorStore, _normalize_rows
+
+
+def main(args):
+    rng = np.random.default_rng(0)
+    q = rng.normal(size=args.dim).astype(np.float32)
+
+    print(f"{'rows':>9} {'dtype':>8} {'disk MB':>8} {'load ms':>8} {'search ms':>10}")
+    for rows in args.rows:
+        normed = _normalize_rows(rng.normal(size=(rows, args.dim)).astype(np.float32))
+        metas = [{"text": f"chunk {i}"} for i in range(rows)]
+
+        for dtype in args.dtypes:
+            with tempfile.TemporaryDirectory() as tmp:
+                directory = Path(tmp)
+                vecfile.write_store(directory, normed, metas, dtype=dtype)
+                disk_mb = sum(p.stat().st_size for p in directory.iterdir()) / 1e6
+
+                start = time.perf_counter()
+                _, vectors, scales, mmetas = vecfile.open_store(directory)
+                store = SimpleVectorStore(vectors, mmetas, scales=scales)
+                load_ms = (time.perf_counter() - start) * 1000
+
+                store.search_by_vector(q)
+                start = time.perf_counter()
+                store.search_by_vector(q)
+                search_ms = (time.perf_counter() - start) * 1000
+                del store, vectors, scales, mmetas
+
+            print(f"{rows:>9} {dtype:>8} {disk_mb:>8.1f} {load_ms:>8.2f} {search_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--dtypes", nargs="+", default=list(vecfile.DTYPES))
+    main(parser.parse_args())
@@ -0,0 +1,81 @@
+"""
+Ticket ingest: one insert_one per booking vs the group-commit InsertBatcher.
+
+Needs a reachable MongoDB (MONGO_URL). Writes go to a scratch collection
+that is dropped afterwards; both modes use the same journaled majority
+write concern so the comparison is like for like.
+
+    python -m backend.tools.bench_ticket_ingest --bookings 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import WriteConcern
+
+from backend.utils.write_behind import InsertBatcher
+
+
+def ticket(i: int) -> dict:
+    return {
+        "fullname": f"Bench User {i}",
+        "phone": "01700000000",
+        "district": "Dhaka",
+        "drop_point": "Gabtoli",
+        "price": 500,
+        "user_email": f"bench{i % 100}@example.com",
+        "user_name": "Bench",
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def drive(insert, bookings: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with sem:
+            start = time.perf_counter()
+            await insert(ticket(i))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(bookings)))
+    return bookings / (time.perf_counter() - start), latencies
+
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_url)
+    collection = client["shohoj_ticket"]["bench_tickets"]
+    durable = collection.with_options(write_concern=WriteConcern(w="majority", j=True))
+    await collection.drop()
+
+    try:
+        single_rate, single_lat = await drive(durable.insert_one, args.bookings, args.concurrency)
+
+        batcher = InsertBatcher(collection)
+        await batcher.start()
+        batch_rate, batch_lat = await drive(batcher.insert, args.bookings, args.concurrency)
+        await batcher.stop()
+    finally:
+        await collection.drop()
+
+    print(f"{args.bookings} bookings, {args.concurrency} concurrent")
+    print(f"{'mode':<12} {'inserts/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    print(f"{'insert_one':<12} {single_rate:>10.0f} {percentile(single_lat, 50):>8.1f} {percentile(single_lat, 99):>8.1f}")
+    print(f"{'group':<12} {batch_rate:>10.0f} {percentile(batch_lat, 50):>8.1f} {percentile(batch_lat, 99):>8.1f}")
+    print(f"batcher: {batcher.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.getenv("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--bookings", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,83 @@
+"""
+Retrieval quality and latency: dense-only vs hybrid (dense + BM25).
+
+Runs the labeled questions in data/retrieval_eval.json against the live
+vectorstore. Each question is embedded once and the same vector feeds both
+modes, so the latency columns are search cost only.
+
+  hit@k   a chunk containing `expected` is among the top k
+  usable  that chunk also clears the similarity threshold, i.e. it would
+          actually reach the Gemini prompt in generate_answer
+
+    python -m backend.tools.eval_retrieval --k 4 --threshold 0.32
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.utils.vectorstore import load_vectorstore
+
+
+EVAL_FILE = Path(__file__).parent.parent / "data" / "retrieval_eval.json"
+
+
+def evaluate(search, cases, embeddings, k, threshold, repeat):
+    hits = usable = 0
+    times = []
+    misses = []
+    for case, q_emb in zip(cases, embeddings):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = search(case["question"], q_emb, k)
+            times.append((time.perf_counter() - start) * 1e6)
+
+        found = [h for h in results if case["expected"] in h["text"]]
+        if found:
+            hits += 1
+            usable += found[0]["score"] >= threshold
+        else:
+            misses.append(case["question"])
+    t = np.array(times)
+    return {
+        "hit": hits / len(cases),
+        "usable": usable / len(cases),
+        "p50_us": float(np.percentile(t, 50)),
+        "p99_us": float(np.percentile(t, 99)),
+        "misses": misses,
+    }
+
+
+def main(args):
+    with open(args.eval_file, "r", encoding="utf-8") as f:
+        cases = json.load(f)["questions"]
+
+    store = load_vectorstore()
+    print(f"store {store.version}: {len(store)} chunks, "
+          f"bm25 {'yes' if store.lexical is not None else 'no'}, {len(cases)} questions")
+    embeddings = [store._embed_query(c["question"]) for c in cases]
+
+    modes = {
+        "dense": lambda q, e, k: store.search_by_vector(e, k=k),
+        "hybrid": lambda q, e, k: store.hybrid_search(q, e, k=k),
+    }
+    print(f"{'mode':<8} {'hit@' + str(args.k):>7} {'usable':>7} {'p50 us':>8} {'p99 us':>8}")
+    results = {}
+    for name, search in modes.items():
+        r = results[name] = evaluate(search, cases, embeddings, args.k, args.threshold, args.repeat)
+        print(f"{name:<8} {r['hit']:>7.2f} {r['usable']:>7.2f} {r['p50_us']:>8.1f} {r['p99_us']:>8.1f}")
+
+    for name, r in results.items():
+        for q in r["misses"]:
+            print(f"  {name} miss: {q}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eval-file", type=Path, default=EVAL_FILE)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--threshold", type=float, default=0.32)
+    parser.add_argument("--repeat", type=int, default=20, help="timed searches per question")
+    main(parser.parse_args())
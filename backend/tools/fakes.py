@@ -0,0 +1,320 @@
+"""
+In-process stand-ins for MongoDB (Motor) and Gemini, used by the offline
+load test. They implement only the calls the app makes, with the same
+return shapes and error types, plus an optional artificial latency.
+"""
+import asyncio
+import random
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import numpy as np
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+#  MONGO
+def _match_value(value, cond) -> bool:
+    if isinstance(cond, dict) and any(k.startswith("$") for k in cond):
+        for op, arg in cond.items():
+            if op == "$gt" and not (value is not None and value > arg):
+                return False
+            if op == "$gte" and not (value is not None and value >= arg):
+                return False
+            if op == "$lt" and not (value is not None and value < arg):
+                return False
+            if op == "$lte" and not (value is not None and value <= arg):
+                return False
+            if op == "$ne" and value == arg:
+                return False
+            if op == "$in" and value not in arg:
+                return False
+        return True
+    return value == cond
+
+
+def _matches(doc: dict, query: Optional[dict]) -> bool:
+    return all(_match_value(doc.get(k), v) for k, v in (query or {}).items())
+
+
+def _project(doc: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return dict(doc)
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return out
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+
+def _apply_update(doc: dict, update: dict):
+    if isinstance(update, list):
+        raise NotImplementedError("pipeline updates are not supported by the fake")
+    for k, v in update.get("$set", {}).items():
+        doc[k] = v
+    for k, v in update.get("$inc", {}).items():
+        doc[k] = doc.get(k, 0) + v
+    for k in update.get("$unset", {}):
+        doc.pop(k, None)
+
+
+class FakeCursor:
+    def __init__(self, collection: "FakeCollection", query, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction=1):
+        self._sort = (key, direction)
+        return self
+
+    def skip(self, n):
+        self._skip = n
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def _run(self) -> List[dict]:
+        docs = [d for d in self._collection._docs.values() if _matches(d, self._query)]
+        if self._sort:
+            key, direction = self._sort
+            docs.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [_project(d, self._projection) for d in docs]
+
+    async def to_list(self, length=None):
+        await self._collection._io()
+        docs = self._run()
+        return docs[:length] if length else docs
+
+    def __aiter__(self):
+        async def gen():
+            for doc in await self.to_list():
+                yield doc
+        return gen()
+
+
+class FakeCollection:
+    def __init__(self, name: str, latency_s: float = 0.0):
+        self.name = name
+        self.latency_s = latency_s
+        self._docs: Dict[object, dict] = {}
+        self._unique: List[tuple] = []
+        self._indexes: Dict[str, dict] = {"_id_": {"key": [("_id", 1)]}}
+
+    async def _io(self):
+        # every call yields to the loop, like a real round-trip would
+        await asyncio.sleep(self.latency_s)
+
+    def with_options(self, **kwargs):
+        return self
+
+    def _check_unique(self, doc: dict):
+        for fields in self._unique:
+            key = tuple(doc.get(f) for f in fields)
+            if any(tuple(d.get(f) for f in fields) == key for d in self._docs.values()):
+                raise DuplicateKeyError(f"E11000 duplicate key on {self.name} {fields}")
+
+    def _insert(self, doc: dict):
+        doc.setdefault("_id", ObjectId())
+        if doc["_id"] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate _id on {self.name}")
+        self._check_unique(doc)
+        self._docs[doc["_id"]] = dict(doc)
+        return doc["_id"]
+
+    async def create_index(self, keys, unique=False, name=None, **kwargs):
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        self._indexes[name] = {"key": list(keys), **({"unique": True} if unique else {})}
+        if unique:
+            self._unique.append(tuple(field for field, _ in keys))
+        return name
+
+    async def index_information(self):
+        await self._io()
+        return {name: dict(info) for name, info in self._indexes.items()}
+
+    async def insert_one(self, doc: dict):
+        await self._io()
+        return SimpleNamespace(inserted_id=self._insert(doc))
+
+    async def insert_many(self, docs: List[dict], ordered: bool = True):
+        await self._io()
+        errors = []
+        for i, doc in enumerate(docs):
+            try:
+                self._insert(doc)
+            except DuplicateKeyError as e:
+                errors.append({"index": i, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": []})
+        return SimpleNamespace(inserted_ids=[d["_id"] for d in docs])
+
+    def _first(self, query) -> Optional[dict]:
+        if query and "_id" in query and not isinstance(query["_id"], dict):
+            doc = self._docs.get(query["_id"])
+            return doc if doc is not None and _matches(doc, query) else None
+        return next((d for d in self._docs.values() if _matches(d, query)), None)
+
+    async def find_one(self, query=None, projection=None, **kwargs):
+        await self._io()
+        doc = self._first(query)
+        return _project(doc, projection) if doc is not None else None
+
+    def find(self, query=None, projection=None, **kwargs) -> FakeCursor:
+        return FakeCursor(self, query, projection)
+
+    async def update_one(self, query, update, upsert=False):
+        await self._io()
+        doc = self._first(query)
+        if doc is None and upsert:
+            doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            self._insert(doc)
+            doc = self._docs[doc["_id"]]
+        if doc is not None:
+            _apply_update(doc, update)
+        return SimpleNamespace(matched_count=int(doc is not None), modified_count=int(doc is not None))
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False,
+                                  return_document=False, **kwargs):
+        await self._io()
+        doc = self._first(query)
+        if doc is None:
+            return None
+        before = dict(doc)
+        _apply_update(doc, update)
+        return _project(doc if return_document else before, projection)
+
+    async def find_one_and_delete(self, query, projection=None, **kwargs):
+        await self._io()
+        doc = self._first(query)
+        if doc is None:
+            return None
+        del self._docs[doc["_id"]]
+        return _project(doc, projection)
+
+    async def delete_one(self, query):
+        await self._io()
+        doc = self._first(query)
+        if doc is not None:
+            del self._docs[doc["_id"]]
+        return SimpleNamespace(deleted_count=int(doc is not None))
+
+    async def delete_many(self, query):
+        await self._io()
+        ids = [k for k, d in self._docs.items() if _matches(d, query)]
+        for k in ids:
+            del self._docs[k]
+        return SimpleNamespace(deleted_count=len(ids))
+
+    async def drop(self):
+        self._docs.clear()
+
+
+class FakeDatabase:
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(name, self.latency_s)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+class FakeMotorClient:
+    def __init__(self, latency_s: float = 0.0):
+        self._db = FakeDatabase(latency_s)
+        self.admin = SimpleNamespace(command=self._command)
+
+    async def _command(self, name, *args, **kwargs):
+        await asyncio.sleep(0)
+        return {"ok": 1.0}
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        return self._db
+
+
+#  GEMINI
+class _Models:
+    def __init__(self, gemini: "FakeGemini", is_async: bool):
+        self._gemini = gemini
+        self._async = is_async
+
+    def generate_content(self, model, contents, config=None):
+        if self._async:
+            return self._gemini._agenerate(contents)
+        time.sleep(self._gemini._latency())
+        return self._gemini._response(contents)
+
+    async def generate_content_stream(self, model, contents, config=None):
+        return self._gemini._astream(contents)
+
+
+class FakeGemini:
+    """Mimics google.genai.Client: .models (sync) and .aio.models (async)."""
+
+    def __init__(self, latency_s: float = 0.8, jitter_s: float = 0.2,
+                 empty_rate: float = 0.0, seed: int = 0, chunks: int = 5):
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.empty_rate = empty_rate
+        self.chunks = chunks
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.models = _Models(self, is_async=False)
+        self.aio = SimpleNamespace(models=_Models(self, is_async=True))
+
+    def _latency(self) -> float:
+        return max(0.0, self.latency_s + self._rng.uniform(-self.jitter_s, self.jitter_s))
+
+    def _response(self, prompt: str):
+        self.calls += 1
+        if self._rng.random() < self.empty_rate:
+            return SimpleNamespace(text="")
+        return SimpleNamespace(text=f"Here is a helpful answer based on {len(prompt)} characters of context.")
+
+    async def _agenerate(self, prompt: str):
+        await asyncio.sleep(self._latency())
+        return self._response(prompt)
+
+    async def _astream(self, prompt: str):
+        text = self._response(prompt).text
+        per_chunk = self._latency() / max(1, self.chunks)
+        step = max(1, len(text) // max(1, self.chunks))
+        for i in range(0, len(text), step):
+            await asyncio.sleep(per_chunk)
+            yield SimpleNamespace(text=text[i:i + step])
+
+
+#  EMBEDDINGS
+def fake_embed(texts: List[str], dim: int = 384, delay_s: float = 0.0) -> np.ndarray:
+    """Deterministic hashed bag-of-words vectors; stands in for MiniLM."""
+    if delay_s:
+        time.sleep(delay_s)
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            out[row, zlib.crc32(word.encode("utf-8")) % dim] += 1.0
+    return out
@@ -0,0 +1,260 @@
+"""
+Offline load test: the real FastAPI app, in-process, against stand-ins.
+
+MongoDB is replaced by the in-memory Motor fake, Gemini by a fake client
+with configurable latency, and MiniLM by hashed bag-of-words embeddings.
+Argon2, routing, validation, auth, RAG retrieval and serialization all run
+for real. Virtual users drive a weighted mix of signup / login / create /
+list / chat through httpx's ASGI transport; per-endpoint req/s and latency
+percentiles go to stdout and to a JSON file that can be diffed between
+commits.
+
+    python -m backend.tools.loadtest --requests 2000 --concurrency 32 --out loadtest.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# the app reads these at import time
+os.environ.setdefault("MONGO_URL", "mongodb://loadtest.invalid:27017")
+os.environ.setdefault("VECTORSTORE_WATCH_S", "0")
+os.environ.setdefault("WARMUP_ON_START", "0")
+# every virtual user shares one client IP; pass RATE_LIMIT_RULES to test limits
+os.environ.setdefault("RATE_LIMIT_RULES", "")
+
+
+DEFAULT_MIX = "signup=1,login=2,create=4,list=8,chat=3"
+PASSWORD = "loadtest-password"
+CHAT_QUESTIONS = [
+    "price Khulna to Daulatpur",
+    "who covers Sylhet",
+    "What is Green Line's privacy policy?",
+    "How much is a ticket to Bimanbandar?",
+    "Can I cancel my ticket and get a refund?",
+    "Which bus companies operate in Bogra",
+    "Is it safe to travel at night?",
+    "How do I contact Hanif about my personal data?",
+]
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def install_fakes(args):
+    """Swap Mongo, Gemini and the embedding model for the stand-ins."""
+    from backend import database
+    from backend.routes import auth, tickets
+    from backend.utils import rag, vectorstore
+    from backend.utils.bm25 import BM25Index
+    from backend.utils.loader import prepare_chunks
+    from backend.tools.fakes import FakeMotorClient, FakeGemini, fake_embed
+
+    client = FakeMotorClient(latency_s=args.mongo_ms / 1000)
+    db = client["shohoj_ticket"]
+    database.client = client
+    database.db = db
+    database.users_collection = db["users"]
+    database.tickets_collection = db["tickets"]
+    database.INDEX_PLAN = [
+        (db["users"], spec, options) for _, spec, options in database.INDEX_PLAN[:1]
+    ] + [(db["tickets"], spec, options) for _, spec, options in database.INDEX_PLAN[1:]]
+    auth.users_collection = db["users"]
+    tickets.db = db
+    if tickets.ticket_batcher is not None:
+        tickets.ticket_batcher.collection = db["tickets"]
+    if tickets.seat_inventory is not None:
+        tickets.seat_inventory.collection = db["inventory"]
+
+    embed_delay = args.embed_ms / 1000
+    encode = lambda texts: fake_embed(texts, vectorstore.DEFAULT_DIM, embed_delay)
+    vectorstore.embed_texts_local_safe = encode
+    vectorstore.query_broker._encode = encode
+
+    chunks = prepare_chunks()
+    rag._vectorstore = vectorstore.SimpleVectorStore.from_embeddings(
+        fake_embed(chunks, vectorstore.DEFAULT_DIM), [{"text": t} for t in chunks],
+        version="loadtest", lexical=BM25Index.build(chunks),
+    )
+    rag._store_attempted = True
+
+    gemini = FakeGemini(latency_s=args.gemini_ms / 1000, jitter_s=args.gemini_jitter_ms / 1000,
+                        empty_rate=args.gemini_empty_rate, seed=args.seed)
+    rag._genai_client = gemini
+    rag.HAS_GEMINI = True
+    return gemini
+
+
+class VirtualUser:
+    def __init__(self, uid: int):
+        self.email = f"vu{uid}@loadtest.example.com"
+        self.headers = {}
+
+
+async def run(args):
+    gemini = install_fakes(args)
+    import httpx
+    from backend.main import app, lifespan
+    from backend.utils.fare_catalog import fare_catalog
+
+    rng = random.Random(args.seed)
+    fares = list(fare_catalog.snapshot().fares.items())
+    mix = parse_mix(args.mix)
+    ops, weights = list(mix), list(mix.values())
+    results = defaultdict(lambda: {"latencies": [], "errors": 0, "statuses": defaultdict(int)})
+    signups = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with lifespan(app), httpx.AsyncClient(transport=transport, base_url="http://loadtest",
+                                                timeout=60) as http:
+
+        async def call(name, method, url, **kwargs):
+            start = time.perf_counter()
+            resp = await http.request(method, url, **kwargs)
+            elapsed = (time.perf_counter() - start) * 1000
+            r = results[name]
+            r["latencies"].append(elapsed)
+            r["statuses"][str(resp.status_code)] += 1
+            if resp.status_code >= 400:
+                r["errors"] += 1
+            return resp
+
+        async def login(user: VirtualUser, name="login"):
+            resp = await call(name, "POST", "/auth/login", json={"email": user.email, "password": PASSWORD})
+            if resp.status_code == 200:
+                user.headers = {"Authorization": f"Bearer {resp.json()['token']}"}
+
+        async def op_signup(user):
+            nonlocal signups
+            signups += 1
+            await call("signup", "POST", "/auth/signup",
+                       json={"name": "Load Test", "email": f"new{signups}-{user.email}", "password": PASSWORD})
+
+        async def op_create(user):
+            (district, point), price = rng.choice(fares)
+            await call("create", "POST", "/tickets/create", headers=user.headers, json={
+                "fullname": "Load Test", "phone": "01700000000",
+                "district": district, "drop_point": point, "price": price,
+            })
+
+        async def op_list(user):
+            await call("list", "GET", "/tickets/my", headers=user.headers, params={"limit": 50})
+
+        async def op_chat(user):
+            await call("chat", "POST", "/chat/ask", json={"q": rng.choice(CHAT_QUESTIONS)})
+
+        handlers = {"signup": op_signup, "login": login, "create": op_create,
+                    "list": op_list, "chat": op_chat}
+        unknown = set(ops) - set(handlers)
+        if unknown:
+            raise SystemExit(f"unknown ops in --mix: {', '.join(sorted(unknown))}")
+
+        # setup (not measured): one account and session per virtual user
+        users = [VirtualUser(i) for i in range(args.concurrency)]
+        for user in users:
+            await http.post("/auth/signup", json={"name": "Load Test", "email": user.email, "password": PASSWORD})
+            await login(user, name="_setup")
+        results.pop("_setup", None)
+
+        plan = rng.choices(ops, weights=weights, k=args.requests)
+        queue = asyncio.Queue()
+        for op in plan:
+            queue.put_nowait(op)
+
+        async def worker(user):
+            while True:
+                try:
+                    op = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await handlers[op](user)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(u) for u in users))
+        wall = time.perf_counter() - start
+
+    endpoints = {}
+    for name in sorted(results):
+        lat = results[name]["latencies"]
+        endpoints[name] = {
+            "requests": len(lat),
+            "errors": results[name]["errors"],
+            "statuses": dict(results[name]["statuses"]),
+            "rps": len(lat) / wall,
+            "p50_ms": percentile(lat, 50),
+            "p90_ms": percentile(lat, 90),
+            "p99_ms": percentile(lat, 99),
+            "max_ms": max(lat),
+        }
+    all_lat = [x for r in results.values() for x in r["latencies"]]
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "config": {k: v for k, v in vars(args).items() if k != "out"},
+        },
+        "overall": {
+            "requests": len(all_lat),
+            "wall_s": wall,
+            "rps": len(all_lat) / wall,
+            "p50_ms": percentile(all_lat, 50),
+            "p99_ms": percentile(all_lat, 99),
+            "gemini_calls": gemini.calls,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def main(args):
+    report = asyncio.run(run(args))
+    print(f"{report['overall']['requests']} requests in {report['overall']['wall_s']:.1f}s "
+          f"({report['overall']['rps']:.0f} req/s), {args.concurrency} virtual users")
+    print(f"{'endpoint':<8} {'n':>6} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for name, r in report["endpoints"].items():
+        print(f"{name:<8} {r['requests']:>6} {r['errors']:>5} {r['rps']:>8.1f} "
+              f"{r['p50_ms']:>8.1f} {r['p90_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="op=weight,... over signup/login/create/list/chat")
+    parser.add_argument("--mongo-ms", type=float, default=0.5, help="fake Mongo latency per call")
+    parser.add_argument("--gemini-ms", type=float, default=800, help="fake Gemini latency per call")
+    parser.add_argument("--gemini-jitter-ms", type=float, default=200)
+    parser.add_argument("--gemini-empty-rate", type=float, default=0.0, help="share of empty Gemini replies (retries)")
+    parser.add_argument("--embed-ms", type=float, default=2, help="fake embedding time per batch")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="loadtest.json")
+    main(parser.parse_args())
@@ -0,0 +1,16 @@
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Dependency for operator endpoints; disabled unless ADMIN_TOKEN is set."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin endpoints are disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
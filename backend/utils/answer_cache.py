@@ -0,0 +1,140 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+DEFAULT_TTL_S = float(os.getenv("ANSWER_CACHE_TTL_S", "3600"))
+# Kept high on purpose: "Dhaka to Gabtoli" and "Dhaka to Mohakhali" are
+# already close in MiniLM space and must not share an answer.
+DEFAULT_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache keyed on query embeddings.
+
+    A lookup returns the stored answer of the most similar cached question
+    when its cosine similarity clears `threshold`. Vectors live in one
+    preallocated (max_entries, dim) matrix so memory is fixed; entries are
+    evicted LRU-first when full and dropped once older than `ttl_s`.
+    Every entry belongs to a vectorstore version and the whole cache is
+    cleared when a different version shows up.
+    """
+
+    def __init__(self,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_s: float = DEFAULT_TTL_S,
+                 threshold: float = DEFAULT_THRESHOLD):
+        self.max_entries = max(0, max_entries)
+        self.ttl_s = ttl_s
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self._vecs: Optional[np.ndarray] = None
+        # slot -> (question, answer, expires_at); order is LRU -> MRU
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._free = list(range(self.max_entries))
+        self._version = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _sync_version(self, version: str):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._free = list(range(self.max_entries))
+            self._version = version
+
+    def _drop(self, slot: int):
+        del self._entries[slot]
+        self._free.append(slot)
+
+    @staticmethod
+    def _normalize(q_emb: np.ndarray) -> np.ndarray:
+        q = np.asarray(q_emb, dtype=np.float32)
+        return q / (np.linalg.norm(q) + 1e-12)
+
+    def lookup(self, q_emb: np.ndarray, version: str = "") -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self._sync_version(version)
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            q = self._normalize(q_emb)
+            slots = np.fromiter(self._entries.keys(), dtype=np.int64, count=len(self._entries))
+            sims = self._vecs[slots] @ q
+            now = time.monotonic()
+
+            for i in np.argsort(-sims):
+                if sims[i] < self.threshold:
+                    break
+                slot = int(slots[i])
+                _, answer, expires_at = self._entries[slot]
+                if expires_at <= now:
+                    self._drop(slot)
+                    continue
+                self._entries.move_to_end(slot)
+                self.hits += 1
+                return answer
+
+            self.misses += 1
+            return None
+
+    def put(self, q_emb: np.ndarray, answer: str, version: str = "", question: str = ""):
+        if not self.enabled or not answer:
+            return
+
+        with self._lock:
+            self._sync_version(version)
+            q = self._normalize(q_emb)
+
+            if self._vecs is None or self._vecs.shape[1] != q.shape[0]:
+                self._vecs = np.zeros((self.max_entries, q.shape[0]), dtype=np.float32)
+                self._entries.clear()
+                self._free = list(range(self.max_entries))
+
+            if not self._free:
+                slot, _ = self._entries.popitem(last=False)
+                self._free.append(slot)
+                self.evictions += 1
+
+            slot = self._free.pop()
+            self._vecs[slot] = q
+            self._entries[slot] = (question, answer, time.monotonic() + self.ttl_s)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._free = list(range(self.max_entries))
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "threshold": self.threshold,
+                "ttl_s": self.ttl_s,
+            }
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL_S = float(os.getenv("AUTH_CACHE_TTL_S", "60"))
+
+
+class PrincipalCache:
+    """
+    Per-process LRU of token -> authenticated principal.
+
+    An entry lives for at most `ttl_s` and never past the token's own JWT
+    `exp`. The cache is per worker, so invalidation only reaches the worker
+    that handled it; the TTL bounds how stale other workers can be.
+    """
+
+    def __init__(self, max_entries: int = AUTH_CACHE_SIZE, ttl_s: float = AUTH_CACHE_TTL_S):
+        self.max_entries = max(0, max_entries)
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        # token -> (principal, email, expires_at monotonic)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._by_email: dict = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, _, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def put(self, token: str, email: str, principal, jwt_exp: Optional[float] = None):
+        if not self.max_entries:
+            return
+        expires_at = time.monotonic() + self.ttl_s
+        if jwt_exp is not None:
+            expires_at = min(expires_at, time.monotonic() + (jwt_exp - time.time()))
+
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (principal, email, expires_at)
+            self._by_email.setdefault(email, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_token(self, token: str):
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+                self.invalidations += 1
+
+    def invalidate_user(self, email: str):
+        """Drop every cached token of a user, e.g. after their record changes."""
+        with self._lock:
+            for token in list(self._by_email.get(email, ())):
+                self._remove(token)
+                self.invalidations += 1
+
+    def _remove(self, token: str):
+        _, email, _ = self._entries.pop(token)
+        tokens = self._by_email.get(email)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_email[email]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "invalidations": self.invalidations,
+                "ttl_s": self.ttl_s,
+            }
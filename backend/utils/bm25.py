@@ -0,0 +1,142 @@
+import json
+import math
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# one .npy per array so load() can mmap them; term_max is derived at build time
+BM25_ARRAYS = ("indptr", "doc_ids", "weights", "term_max")
+BM25_VOCAB_NAME = "bm25_vocab.json"
+BM25_META_NAME = "bm25_meta.json"
+
+
+def _array_path(directory: Path, name: str) -> Path:
+    return directory / f"bm25_{name}.npy"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an the to in of on at for from by and or is are was be it its this that what which who "
+    "how do does can i me my we our you your there their with as".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the store's chunk texts, precomputed into CSR form.
+
+    For every term the postings hold (doc id, full BM25 weight), with idf
+    and length normalisation already applied at build time. A query is
+    then a handful of slice-and-add operations over those arrays.
+    """
+
+    def __init__(self, vocab: Dict[str, int], indptr: np.ndarray,
+                 doc_ids: np.ndarray, weights: np.ndarray, n_docs: int,
+                 term_max: Optional[np.ndarray] = None, unseen_weight: Optional[float] = None):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.n_docs = n_docs
+        # best weight each term reaches in any doc (every term has postings)
+        if term_max is None:
+            term_max = (np.maximum.reduceat(weights, indptr[:-1]) if len(vocab)
+                        else np.zeros(0, dtype=np.float32))
+        self.term_max = term_max
+        # what a query word the corpus has never seen counts for: a typical term
+        if unseen_weight is None:
+            unseen_weight = float(np.median(term_max)) if len(vocab) else 0.0
+        self.unseen_weight = unseen_weight
+
+    @classmethod
+    def build(cls, texts: Sequence[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        docs = [tokenize(t) for t in texts]
+        n = len(docs)
+        avgdl = (sum(len(d) for d in docs) / n) if n else 0.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, tokens in enumerate(docs):
+            counts: Dict[str, int] = {}
+            for t in tokens:
+                counts[t] = counts.get(t, 0) + 1
+            for t, tf in counts.items():
+                postings.setdefault(t, []).append((doc_id, tf))
+
+        vocab = {t: i for i, t in enumerate(sorted(postings))}
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        doc_ids, weights = [], []
+        for t, term_id in vocab.items():
+            plist = postings[t]
+            idf = math.log(1.0 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for doc_id, tf in plist:
+                norm = k1 * (1.0 - b + b * len(docs[doc_id]) / (avgdl or 1.0))
+                doc_ids.append(doc_id)
+                weights.append(idf * tf * (k1 + 1.0) / (tf + norm))
+            indptr[term_id + 1] = len(doc_ids)
+
+        return cls(vocab, indptr,
+                   np.asarray(doc_ids, dtype=np.int32),
+                   np.asarray(weights, dtype=np.float32), n)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for `query` (zeros when nothing matches)."""
+        out = np.zeros(self.n_docs, dtype=np.float32)
+        for t in set(tokenize(query)):
+            term_id = self.vocab.get(t)
+            if term_id is None:
+                continue
+            lo, hi = self.indptr[term_id], self.indptr[term_id + 1]
+            # a term appears at most once per doc, so plain fancy-index add is safe
+            out[self.doc_ids[lo:hi]] += self.weights[lo:hi]
+        return out
+
+    def max_score(self, query: str) -> float:
+        """
+        Score a doc would get by matching every query term at its best
+        weight. Words missing from the corpus count as a typical term, so
+        "weather in dhaka" is only a partial match for a Dhaka chunk.
+        """
+        total = 0.0
+        for t in set(tokenize(query)):
+            term_id = self.vocab.get(t)
+            total += float(self.term_max[term_id]) if term_id is not None else self.unseen_weight
+        return total
+
+    def top(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and scores of the k best lexical matches with a positive score."""
+        sims = self.scores(query)
+        hit = np.flatnonzero(sims)
+        if hit.size > k:
+            hit = hit[np.argpartition(-sims[hit], k)[:k]]
+        hit = hit[np.argsort(-sims[hit])]
+        return hit, sims[hit]
+
+    def save(self, directory: Path):
+        for name in BM25_ARRAYS:
+            np.save(_array_path(directory, name), getattr(self, name))
+        with open(directory / BM25_VOCAB_NAME, "w", encoding="utf-8") as f:
+            json.dump(self.vocab, f, ensure_ascii=False)
+        with open(directory / BM25_META_NAME, "w", encoding="utf-8") as f:
+            json.dump({"n_docs": self.n_docs, "unseen_weight": self.unseen_weight}, f)
+
+    @classmethod
+    def load(cls, directory: Path) -> "BM25Index":
+        """Open a saved index; the arrays come back as read-only memmaps."""
+        arrays = {name: np.load(_array_path(directory, name), mmap_mode="r") for name in BM25_ARRAYS}
+        with open(directory / BM25_VOCAB_NAME, "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        with open(directory / BM25_META_NAME, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(vocab, n_docs=meta["n_docs"], unseen_weight=meta["unseen_weight"], **arrays)
+
+
+def has_index(directory: Path) -> bool:
+    files = [_array_path(directory, name) for name in BM25_ARRAYS]
+    files += [directory / BM25_VOCAB_NAME, directory / BM25_META_NAME]
+    return all(f.exists() for f in files)
@@ -0,0 +1,160 @@
+import os
+import re
+import threading
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from backend.utils.metrics import count
+
+
+# prompt context budget, counted with tiktoken (a close proxy for Gemini's tokenizer)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKENS", "600"))
+# no single chunk (a whole privacy policy) may take more than this
+CHUNK_TOKEN_CAP = int(os.getenv("RAG_CONTEXT_CHUNK_TOKENS", "160"))
+# maximal marginal relevance: 1.0 ranks by relevance only, lower favours variety
+MMR_LAMBDA = float(os.getenv("RAG_MMR_LAMBDA", "0.7"))
+# hits this similar to one already kept are dropped as near-duplicates
+DEDUP_SIMILARITY = float(os.getenv("RAG_DEDUP_SIMILARITY", "0.97"))
+TIKTOKEN_ENCODING = os.getenv("TIKTOKEN_ENCODING", "cl100k_base")
+# one stderr line per prompt with its size before/after
+CONTEXT_LOG = os.getenv("RAG_CONTEXT_LOG", "false").lower() in ("true", "1", "yes")
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+_encoding = None
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """tiktoken encoding, loaded once; None (estimate instead) if it cannot load."""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    import tiktoken
+                    # first use fetches the BPE file unless it is in TIKTOKEN_CACHE_DIR
+                    _encoding = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+                except Exception as e:
+                    _encoding_failed = True
+                    print(f"[context] tiktoken unavailable ({e.__class__.__name__}); estimating 4 chars/token")
+    return _encoding
+
+
+def load_tokenizer() -> bool:
+    """Load the encoding now (warm-up); False means token counts are estimates."""
+    return _get_encoding() is not None
+
+
+def count_tokens(text: str) -> int:
+    enc = _get_encoding()
+    if enc is None:
+        return max(1, (len(text) + 3) // 4)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def mmr_order(scores: np.ndarray, vectors: np.ndarray,
+              mmr_lambda: float = MMR_LAMBDA,
+              dedup_similarity: float = DEDUP_SIMILARITY) -> List[int]:
+    """
+    Indices of the hits in MMR order, near-duplicates removed.
+    `vectors` are the hits' stored unit embeddings, so no re-encoding.
+    """
+    n = len(scores)
+    if n == 0:
+        return []
+    sims = vectors @ vectors.T
+    closest = np.full(n, -np.inf, dtype=np.float32)
+    alive = np.ones(n, dtype=bool)
+    order = []
+
+    while alive.any():
+        penalty = np.where(np.isfinite(closest), closest, 0.0)
+        mmr = mmr_lambda * scores - (1.0 - mmr_lambda) * penalty
+        mmr[~alive] = -np.inf
+        pick = int(np.argmax(mmr))
+        order.append(pick)
+        alive[pick] = False
+
+        closest = np.maximum(closest, sims[pick])
+        alive &= closest < dedup_similarity
+    return order
+
+
+def trim_sentences(text: str, max_tokens: int) -> Tuple[str, int]:
+    """
+    Keep whole sentences, in order, while they fit. A sentence that does not
+    fit is skipped but later (shorter) ones may still go in, so a policy
+    keeps its lead and its contact line when the middle is long.
+    """
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text, tokens
+
+    kept, used = [], 0
+    for sentence in _SENTENCE_RE.split(text):
+        cost = count_tokens(sentence)
+        if used + cost <= max_tokens:
+            kept.append(sentence)
+            used += cost
+    return " ".join(kept), used
+
+
+class ContextBuilder:
+    """Turns retrieved hits into prompt context lines: MMR dedup, then a token budget."""
+
+    def __init__(self, budget_tokens: int = CONTEXT_TOKEN_BUDGET,
+                 chunk_tokens: int = CHUNK_TOKEN_CAP,
+                 mmr_lambda: float = MMR_LAMBDA,
+                 dedup_similarity: float = DEDUP_SIMILARITY):
+        self.budget_tokens = budget_tokens
+        self.chunk_tokens = chunk_tokens
+        self.mmr_lambda = mmr_lambda
+        self.dedup_similarity = dedup_similarity
+
+    def build(self, hits: Sequence[dict], store=None) -> Tuple[List[str], dict]:
+        """
+        Context lines in MMR order plus size stats. Without a store (or hit
+        ids) MMR is skipped and hits keep their retrieval order.
+        """
+        hits = list(hits)
+        order = list(range(len(hits)))
+        if store is not None and len(hits) > 1 and all("id" in h for h in hits):
+            vectors = store.vectors([h["id"] for h in hits])
+            scores = np.asarray([h["score"] for h in hits], dtype=np.float32)
+            order = mmr_order(scores, vectors, self.mmr_lambda, self.dedup_similarity)
+
+        sizes = [count_tokens(h["text"]) for h in hits]
+        lines, used, trimmed = [], 0, 0
+        for i in order:
+            room = min(self.chunk_tokens, self.budget_tokens - used)
+            if room <= 0:
+                break
+            if sizes[i] <= room:
+                text, cost = hits[i]["text"], sizes[i]
+            else:
+                text, cost = trim_sentences(hits[i]["text"], room)
+                if not text:
+                    continue
+                trimmed += 1
+            lines.append(text)
+            used += cost
+
+        stats = {
+            "hits": len(hits),
+            "kept": len(lines),
+            "trimmed": trimmed,
+            "tokens_in": sum(sizes),
+            "tokens_out": used,
+        }
+        count("context_tokens_in", stats["tokens_in"])
+        count("context_tokens_out", stats["tokens_out"])
+        if CONTEXT_LOG:
+            print(f"[context] {stats['hits']} hits -> {stats['kept']} kept "
+                  f"({stats['trimmed']} trimmed), {stats['tokens_in']} -> {stats['tokens_out']} tokens")
+        return lines, stats
+
+
+context_builder = ContextBuilder()
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, List
+
+import numpy as np
+
+
+DEFAULT_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "32"))
+DEFAULT_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "2"))
+DEFAULT_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))
+
+
+class EmbeddingBroker:
+    """
+    Micro-batching front for a batch encoder.
+
+    Callers submit single strings and get a Future back. One worker thread
+    drains the queue: it waits at most `window_ms` after the first pending
+    query (or until `max_batch` are queued) and encodes them all in one
+    call. Exact repeats are answered from an LRU without touching the model.
+    Returned vectors are read-only because they are shared with the cache.
+    """
+
+    def __init__(self,
+                 encode: Callable[[List[str]], np.ndarray],
+                 max_batch: int = DEFAULT_MAX_BATCH,
+                 window_ms: float = DEFAULT_WINDOW_MS,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self._encode = encode
+        self.max_batch = max(1, max_batch)
+        self.window_s = max(0.0, window_ms) / 1000.0
+        self.cache_size = max(0, cache_size)
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._worker = None
+
+        self.batches = 0
+        self.encoded = 0
+        self.cache_hits = 0
+
+    #  PUBLIC API
+    def submit(self, text: str) -> Future:
+        fut: Future = Future()
+        cached = self._cache_get(text)
+        if cached is not None:
+            fut.set_result(cached)
+            return fut
+
+        self._ensure_worker()
+        self._queue.put((text, fut))
+        return fut
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.submit(text).result()
+
+    async def aembed(self, text: str) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode a caller-supplied batch directly, in one call on this thread;
+        it is already a batch, so it skips the queue. Shares the LRU.
+        """
+        rows = {}
+        for t in dict.fromkeys(texts):
+            cached = self._cache_get(t)
+            if cached is not None:
+                rows[t] = cached
+
+        missing = [t for t in dict.fromkeys(texts) if t not in rows]
+        if missing:
+            embs = np.asarray(self._encode(missing), dtype=np.float32)
+            embs.setflags(write=False)
+            for i, t in enumerate(missing):
+                rows[t] = embs[i]
+                self._cache_put(t, embs[i])
+            self.batches += 1
+            self.encoded += len(missing)
+
+        return np.stack([rows[t] for t in texts]) if texts else np.zeros((0, 0), dtype=np.float32)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "encoded": self.encoded,
+            "avg_batch": (self.encoded / self.batches) if self.batches else 0.0,
+            "cache_hits": self.cache_hits,
+            "cache_entries": len(self._cache),
+            "queued": self._queue.qsize(),
+        }
+
+    #  EXACT-MATCH LRU
+    def _cache_get(self, text: str):
+        if not self.cache_size:
+            return None
+        with self._cache_lock:
+            vec = self._cache.get(text)
+            if vec is not None:
+                self._cache.move_to_end(text)
+                self.cache_hits += 1
+            return vec
+
+    def _cache_put(self, text: str, vec: np.ndarray):
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[text] = vec
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    #  WORKER
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embed-broker", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_s
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # window closed; still take whatever is already queued
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [(t, f) for t, f in self._collect() if f.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            texts = list(dict.fromkeys(t for t, _ in batch))
+            try:
+                embs = np.asarray(self._encode(texts), dtype=np.float32)
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+
+            embs.setflags(write=False)
+            rows = {t: embs[i] for i, t in enumerate(texts)}
+            for t, vec in rows.items():
+                self._cache_put(t, vec)
+            for t, fut in batch:
+                fut.set_result(rows[t])
+
+            self.batches += 1
+            self.encoded += len(texts)
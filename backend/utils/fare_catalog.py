@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+
+FARE_FILE = Path(__file__).parent.parent / "data" / "bus_data.json"
+# how often (seconds) the file's mtime is checked for a reload
+FARE_CATALOG_CHECK_S = float(os.getenv("FARE_CATALOG_CHECK_S", "2"))
+
+
+class CatalogSnapshot:
+    """
+    One immutable parse of bus_data.json plus the lookup tables built from it.
+
+    fares           (district, drop_point) -> price
+    by_district     district -> {drop_point: price}
+    by_point        drop_point -> {district: price}
+    by_provider     provider -> frozenset of covered districts
+    providers_for   district -> sorted provider names
+    """
+
+    def __init__(self, raw: bytes, mtime: float):
+        self.data = json.loads(raw)
+        self.mtime = mtime
+        # strong validator for /routes; same bytes -> same ETag in every worker
+        self.etag = '"' + hashlib.sha1(raw).hexdigest() + '"'
+        self.body = json.dumps(self.data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+        self.fares: Dict[Tuple[str, str], int] = {}
+        self.by_district: Dict[str, Dict[str, int]] = {}
+        self.by_point: Dict[str, Dict[str, int]] = {}
+        for district in self.data.get("districts", []):
+            name = district["name"]
+            points = self.by_district.setdefault(name, {})
+            for point in district.get("dropping_points", []):
+                points[point["name"]] = point["price"]
+                self.fares[(name, point["name"])] = point["price"]
+                self.by_point.setdefault(point["name"], {})[name] = point["price"]
+
+        self.by_provider: Dict[str, FrozenSet[str]] = {}
+        providers_for: Dict[str, List[str]] = {}
+        for provider in self.data.get("bus_providers", []):
+            coverage = provider.get("coverage_districts", [])
+            self.by_provider[provider["name"]] = frozenset(coverage)
+            for district in coverage:
+                providers_for.setdefault(district, []).append(provider["name"])
+        self.providers_for = {d: sorted(names) for d, names in providers_for.items()}
+
+
+class FareCatalog:
+    """
+    Fare catalog loaded once and reloaded when the file changes.
+
+    The mtime is checked at most every `check_interval_s`, so lookups stay
+    O(1) dict reads. A reload builds a new snapshot and swaps it in whole;
+    if the new file does not parse, the previous snapshot keeps serving.
+    """
+
+    def __init__(self, path: Path = FARE_FILE, check_interval_s: float = FARE_CATALOG_CHECK_S):
+        self.path = Path(path)
+        self.check_interval_s = check_interval_s
+        self._lock = threading.Lock()
+        self._snapshot = self._read()
+        self._checked_at = time.monotonic()
+        self.reloads = 0
+
+    def _read(self) -> CatalogSnapshot:
+        mtime = self.path.stat().st_mtime
+        return CatalogSnapshot(self.path.read_bytes(), mtime)
+
+    def snapshot(self) -> CatalogSnapshot:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval_s:
+            return self._snapshot
+
+        with self._lock:
+            if now - self._checked_at < self.check_interval_s:
+                return self._snapshot
+            self._checked_at = now
+            try:
+                if self.path.stat().st_mtime != self._snapshot.mtime:
+                    self._snapshot = self._read()
+                    self.reloads += 1
+                    print("[fare_catalog] reloaded", self.path.name, file=sys.stderr)
+            except (OSError, ValueError, KeyError) as e:
+                print("[fare_catalog] reload failed, keeping previous catalog:", e, file=sys.stderr)
+            return self._snapshot
+
+    #  LOOKUPS
+    def price(self, district: str, drop_point: str) -> Optional[int]:
+        return self.snapshot().fares.get((district, drop_point))
+
+    def drop_points(self, district: str) -> Dict[str, int]:
+        return self.snapshot().by_district.get(district, {})
+
+    def districts_for_point(self, drop_point: str) -> Dict[str, int]:
+        return self.snapshot().by_point.get(drop_point, {})
+
+    def providers_for(self, district: str) -> List[str]:
+        return self.snapshot().providers_for.get(district, [])
+
+    def provider_covers(self, provider: str, district: str) -> bool:
+        return district in self.snapshot().by_provider.get(provider, frozenset())
+
+
+fare_catalog = FareCatalog()
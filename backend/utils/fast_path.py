@@ -0,0 +1,204 @@
+import difflib
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from backend.utils.fare_catalog import FareCatalog, CatalogSnapshot, fare_catalog
+
+
+FAST_PATH_ENABLED = os.getenv("CHAT_FAST_PATH", "true").lower() in ("true", "1", "yes")
+# minimum difflib ratio for a fuzzy name match to count as confident
+FAST_PATH_MIN_RATIO = float(os.getenv("CHAT_FAST_PATH_MIN_RATIO", "0.85"))
+# longer questions are usually not simple lookups; leave them to RAG
+FAST_PATH_MAX_WORDS = int(os.getenv("CHAT_FAST_PATH_MAX_WORDS", "16"))
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+FARE_WORDS = {"price", "prices", "fare", "fares", "cost", "costs", "much", "taka", "bdt", "rate", "charge"}
+COVERAGE_WORDS = {"cover", "covers", "coverage", "operate", "operates", "operator", "operators",
+                  "provider", "providers", "company", "companies", "serve", "serves", "service", "services"}
+POINT_WORDS = {"drop", "dropping", "point", "points", "stop", "stops", "stoppage"}
+INTENT_WORDS = FARE_WORDS | COVERAGE_WORDS | POINT_WORDS
+# policy topics that mention a fare word ("cancellation charge in Dhaka",
+# "refund on the price of my ticket") but are not catalog lookups
+BLOCK_WORDS = {"refund", "refunds", "refundable", "cancel", "cancels", "cancelled", "canceled",
+               "cancellation", "cancelling", "discount", "discounts", "promo",
+               "coupon", "voucher", "penalty", "fee", "fees", "policy", "policies", "privacy",
+               "reschedule", "rescheduling", "luggage", "baggage", "child", "children", "student"}
+
+
+class _NameIndex:
+    """Lower-cased district, drop-point and provider names of one catalog snapshot."""
+
+    def __init__(self, snap: CatalogSnapshot):
+        self.snap = snap
+        # "shah makhdum" -> ("point", "Shah Makhdum")
+        self.names: Dict[str, Tuple[str, str]] = {}
+        for name in snap.by_point:
+            self.names[name.lower()] = ("point", name)
+        for name in snap.by_provider:
+            self.names[name.lower()] = ("provider", name)
+        for name in snap.by_district:
+            self.names[name.lower()] = ("district", name)
+        self.keys = list(self.names)
+        self.max_words = max((len(k.split()) for k in self.keys), default=1)
+        self._fuzzy: Dict[str, Optional[str]] = {}
+
+    def resolve(self, phrase: str) -> Optional[Tuple[str, str]]:
+        hit = self.names.get(phrase)
+        if hit is not None:
+            return hit
+        if len(phrase) < 4:
+            return None
+
+        if phrase not in self._fuzzy:
+            if len(self._fuzzy) > 4096:
+                self._fuzzy.clear()
+            close = difflib.get_close_matches(phrase, self.keys, n=1, cutoff=FAST_PATH_MIN_RATIO)
+            self._fuzzy[phrase] = close[0] if close else None
+        key = self._fuzzy[phrase]
+        return self.names[key] if key else None
+
+
+def _join(items: List[str]) -> str:
+    if len(items) <= 1:
+        return "".join(items)
+    return ", ".join(items[:-1]) + " and " + items[-1]
+
+
+class FastPathMatcher:
+    """
+    Answers structured fare / coverage questions straight from the fare
+    catalog, before any embedding, vector search or Gemini call.
+
+    answer() returns None unless both an intent keyword and unambiguous
+    entities are found, and no policy word (BLOCK_WORDS) is; those
+    questions fall through to RAG.
+    """
+
+    def __init__(self, catalog: FareCatalog = fare_catalog):
+        self.catalog = catalog
+        self._index: Optional[_NameIndex] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _current_index(self) -> _NameIndex:
+        snap = self.catalog.snapshot()
+        index = self._index
+        if index is None or index.snap is not snap:
+            index = self._index = _NameIndex(snap)
+        return index
+
+    def _entities(self, words: List[str], index: _NameIndex) -> Dict[str, List[str]]:
+        """Longest-first n-gram scan; every word belongs to at most one entity."""
+        found: Dict[str, List[str]] = {"district": [], "point": [], "provider": []}
+        used = [False] * len(words)
+        for size in range(min(index.max_words, len(words)), 0, -1):
+            for i in range(len(words) - size + 1):
+                if any(used[i:i + size]):
+                    continue
+                gram = words[i:i + size]
+                if size == 1 and gram[0] in INTENT_WORDS:
+                    continue
+                hit = index.resolve(" ".join(gram))
+                if hit is None:
+                    continue
+                kind, name = hit
+                if name not in found[kind]:
+                    found[kind].append(name)
+                for j in range(i, i + size):
+                    used[j] = True
+        return found
+
+    def entities(self, question: str) -> Dict[str, List[str]]:
+        """Catalog districts / points / providers named in free text."""
+        words = _WORD_RE.findall(question.lower())
+        return self._entities(words, self._current_index())
+
+    def match(self, question: str) -> Optional[str]:
+        words = _WORD_RE.findall(question.lower())
+        if not words or len(words) > FAST_PATH_MAX_WORDS:
+            return None
+
+        present = set(words)
+        if present & BLOCK_WORDS:
+            return None
+        fare = bool(present & FARE_WORDS)
+        coverage = bool(present & COVERAGE_WORDS)
+        points_q = bool(present & POINT_WORDS)
+        if not (fare or coverage or points_q):
+            return None
+
+        index = self._current_index()
+        snap = index.snap
+        ents = self._entities(words, index)
+        districts, points, providers = ents["district"], ents["point"], ents["provider"]
+        if len(districts) > 1 or len(points) > 1 or len(providers) > 1:
+            return None
+        district = districts[0] if districts else None
+        point = points[0] if points else None
+        provider = providers[0] if providers else None
+
+        if fare and point:
+            owners = snap.by_point[point]
+            if district is None and len(owners) == 1:
+                district = next(iter(owners))
+            if district not in owners:
+                return None
+            return f"In {district}, the bus ticket to {point} costs {owners[district]} BDT."
+
+        if (fare or points_q) and district and not provider:
+            fares = snap.by_district.get(district, {})
+            if not fares:
+                return None
+            if fare:
+                listed = _join([f"{price} BDT to {name}" for name, price in fares.items()])
+                return f"In {district}, tickets cost {listed}."
+            listed = _join([f"{name} ({price} BDT)" for name, price in fares.items()])
+            return f"The dropping points in {district} are {listed}."
+
+        if coverage and provider and district:
+            if district in snap.by_provider[provider]:
+                return f"Yes, {provider} operates in {district}."
+            others = snap.providers_for.get(district, [])
+            tail = f" Companies that do: {_join(others)}." if others else ""
+            return f"No, {provider} does not operate in {district}.{tail}"
+
+        if coverage and provider:
+            covered = sorted(snap.by_provider[provider])
+            return f"The bus company {provider} operates in the following districts: {', '.join(covered)}."
+
+        if coverage and district:
+            names = snap.providers_for.get(district, [])
+            if not names:
+                return f"No bus company in our list currently operates in {district}."
+            return f"Bus companies operating in {district}: {', '.join(names)}."
+
+        return None
+
+    def answer(self, question: str) -> Optional[str]:
+        """match() plus the hit/miss counters behind the fast-path ratio."""
+        if not FAST_PATH_ENABLED:
+            return None
+        result = self.match(question)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": FAST_PATH_ENABLED,
+                "answered": self.hits,
+                "fell_through": self.misses,
+                "ratio": (self.hits / total) if total else 0.0,
+            }
+
+
+fast_path = FastPathMatcher()
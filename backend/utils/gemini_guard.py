@@ -0,0 +1,301 @@
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+from backend.utils.metrics import REGISTRY, Gauge, count
+
+
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+# longest a call waits for a free slot before giving up (still capped by its deadline)
+GEMINI_QUEUE_TIMEOUT_S = float(os.getenv("GEMINI_QUEUE_TIMEOUT_S", "5"))
+# longest one upstream call (or the gap between two stream chunks) may take;
+# running past it counts against the breaker, running out of the caller's
+# own deadline first does not
+GEMINI_CALL_TIMEOUT_S = float(os.getenv("GEMINI_CALL_TIMEOUT_S", "20"))
+# every question sent to Gemini earns this many retry tokens (once, however
+# many attempts it takes); a retry spends one
+GEMINI_RETRY_RATIO = float(os.getenv("GEMINI_RETRY_RATIO", "0.2"))
+# floor so a quiet server can still retry now and then
+GEMINI_RETRY_MIN_PER_S = float(os.getenv("GEMINI_RETRY_MIN_PER_S", "0.5"))
+GEMINI_RETRY_MAX_TOKENS = float(os.getenv("GEMINI_RETRY_MAX_TOKENS", "20"))
+# consecutive failures that open the breaker, and how long it stays open
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_BREAKER_COOLDOWN_S = float(os.getenv("GEMINI_BREAKER_COOLDOWN_S", "30"))
+
+_WS_RE = re.compile(r"\s+")
+
+
+class GeminiUnavailable(Exception):
+    """Breaker open or no slot in time; answer with the fallback right away."""
+
+
+def flight_key(prompt: str, *params) -> str:
+    """Identity of an upstream call: whitespace/case-normalized prompt plus settings."""
+    normalized = _WS_RE.sub(" ", prompt).strip().lower()
+    return hashlib.sha1(repr((normalized, params)).encode("utf-8")).hexdigest()
+
+
+class RetryBudget:
+    """
+    Retries as a share of traffic instead of a fixed count per request.
+    When Gemini degrades, the budget drains and requests stop multiplying
+    load; they fail to the fallback instead.
+    """
+
+    def __init__(self, ratio: float = GEMINI_RETRY_RATIO,
+                 min_per_s: float = GEMINI_RETRY_MIN_PER_S,
+                 max_tokens: float = GEMINI_RETRY_MAX_TOKENS):
+        self.ratio = ratio
+        self.min_per_s = min_per_s
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+        self.denied = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._refilled) * self.min_per_s)
+        self._refilled = now
+
+    def deposit(self):
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.denied += 1
+            return False
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half_open after cooldown (one probe)."""
+
+    def __init__(self, failures: int = GEMINI_BREAKER_FAILURES,
+                 cooldown_s: float = GEMINI_BREAKER_COOLDOWN_S):
+        self.failures = max(1, failures)
+        self.cooldown_s = cooldown_s
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.cooldown_s:
+                self._state = "half_open"
+            return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        with self._lock:
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def release_probe(self):
+        with self._lock:
+            self._probing = False
+
+    def record(self, ok: bool):
+        with self._lock:
+            self._probing = False
+            if ok:
+                self._state = "closed"
+                self._consecutive = 0
+                return
+            self._consecutive += 1
+            if self._state == "half_open" or self._consecutive >= self.failures:
+                if self._state != "open":
+                    self.opened += 1
+                    print(f"[gemini_guard] breaker open for {self.cooldown_s:.0f}s "
+                          f"after {self._consecutive} failures")
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+
+class GeminiGuard:
+    """
+    Front door for every Gemini call:
+      - single-flight: identical in-flight calls share one upstream request
+      - a global cap on concurrent upstream calls (waiting callers are the queue)
+      - a shared retry budget
+      - a circuit breaker that fails fast while Gemini is down
+    """
+
+    def __init__(self, max_concurrent: int = GEMINI_MAX_CONCURRENCY,
+                 queue_timeout_s: float = GEMINI_QUEUE_TIMEOUT_S):
+        self.max_concurrent = max(1, max_concurrent)
+        self.queue_timeout_s = queue_timeout_s
+        self.breaker = CircuitBreaker()
+        self.retries = RetryBudget()
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._flights: Dict[str, asyncio.Task] = {}
+        self.in_flight = 0
+        self.waiting = 0
+        self.coalesced = 0
+        self.queue_timeouts = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrent)
+        return self._sem
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None):
+        """
+        Breaker check plus one concurrency slot. The body's outcome feeds the
+        breaker: an exception counts as a failure, and so does a body that
+        sets `outcome.empty = True` (a useless reply). Cancellation does not,
+        nor does a caller deadline hit inside `outcome.wait()`.
+        """
+        if not self.breaker.allow():
+            count("gemini_breaker_rejected")
+            raise GeminiUnavailable("circuit open")
+
+        wait = self.queue_timeout_s if timeout is None else min(self.queue_timeout_s, timeout)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore().acquire(), timeout=max(0.0, wait))
+        except asyncio.TimeoutError:
+            self.queue_timeouts += 1
+            count("gemini_queue_timeout")
+            # never reached upstream: says nothing about Gemini's health
+            self.breaker.release_probe()
+            raise GeminiUnavailable("no Gemini slot in time")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        outcome = _Outcome()
+        try:
+            yield outcome
+        except (asyncio.CancelledError, GeneratorExit):
+            # the caller went away; says nothing about Gemini's health
+            self.breaker.release_probe()
+            raise
+        except BaseException:
+            if outcome.neutral:
+                self.breaker.release_probe()
+            else:
+                self.breaker.record(False)
+            raise
+        else:
+            self.breaker.record(not outcome.empty)
+        finally:
+            self.in_flight -= 1
+            self._semaphore().release()
+
+    async def call(self, key: str, upstream: Callable[[], Awaitable[Optional[str]]],
+                   timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Run `upstream()` once per key at a time; concurrent callers with the
+        same key await the same task. The task is not tied to any one caller,
+        so a disconnecting client does not cancel it for the others.
+        """
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.create_task(self._guarded(upstream, timeout))
+            self._flights[key] = task
+            task.add_done_callback(lambda t, k=key: self._land(k, t))
+        else:
+            self.coalesced += 1
+            count("gemini_coalesced")
+        return await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+
+    def _land(self, key: str, task: asyncio.Task):
+        self._flights.pop(key, None)
+        # every waiter may have timed out already; reading the exception
+        # here keeps asyncio from logging "never retrieved" for it
+        if not task.cancelled():
+            task.exception()
+
+    async def _guarded(self, upstream, timeout):
+        async with self.slot(timeout) as outcome:
+            result = await outcome.wait(upstream(), timeout)
+            outcome.empty = not result
+            return result
+
+    def allow_retry(self) -> bool:
+        """Spend a retry token; False means give up and serve the fallback."""
+        if self.breaker.state == "open":
+            return False
+        if self.retries.try_spend():
+            return True
+        count("gemini_retry_denied")
+        return False
+
+    def register_metrics(self):
+        breaker_states = {"closed": 0, "half_open": 1, "open": 2}
+        REGISTRY.extend([
+            Gauge("gemini_in_flight", "Gemini calls holding a slot", lambda: self.in_flight),
+            Gauge("gemini_waiting", "Gemini calls queued for a slot", lambda: self.waiting),
+            Gauge("gemini_breaker_state", "0 closed, 1 half-open, 2 open",
+                  lambda: breaker_states[self.breaker.state]),
+            Gauge("gemini_retry_tokens", "Retry budget left", lambda: self.retries.tokens),
+        ])
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "coalesced": self.coalesced,
+            "queue_timeouts": self.queue_timeouts,
+            "breaker": self.breaker.state,
+            "breaker_opened": self.breaker.opened,
+            "breaker_rejected": self.breaker.rejected,
+            "retry_tokens": round(self.retries.tokens, 2),
+            "retries_denied": self.retries.denied,
+        }
+
+
+class _Outcome:
+    __slots__ = ("empty", "neutral")
+
+    def __init__(self):
+        self.empty = False
+        # the body gave up for its own reasons; says nothing about Gemini
+        self.neutral = False
+
+    async def wait(self, aw: Awaitable, budget: Optional[float]):
+        """
+        wait_for on an upstream awaitable, bounded by GEMINI_CALL_TIMEOUT_S
+        and the caller's remaining `budget`. Only a timeout at
+        GEMINI_CALL_TIMEOUT_S is blamed on Gemini.
+        """
+        if budget is None or budget >= GEMINI_CALL_TIMEOUT_S:
+            return await asyncio.wait_for(aw, timeout=GEMINI_CALL_TIMEOUT_S)
+        try:
+            return await asyncio.wait_for(aw, timeout=max(0.0, budget))
+        except asyncio.TimeoutError:
+            self.neutral = True
+            raise
+
+
+gemini_guard = GeminiGuard()
+gemini_guard.register_metrics()
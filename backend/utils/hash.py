@@ -1,20 +1,87 @@
 from passlib.context import CryptContext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
+import os
 import sys
 
 print("[utils.hash] loading Argon2 password utils", file=sys.stderr)
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Argon2 cost parameters; changing them makes login rehash old passwords
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
 
-def hash_password(password: str) -> str:
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+# argon2-cffi releases the GIL while hashing, so threads scale across cores;
+# HASH_POOL_KIND=process is there for builds where that does not hold.
+HASH_POOL_KIND = os.getenv("HASH_POOL_KIND", "thread")
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+# hashes queued or running before new ones are refused (-> 503)
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(HASH_WORKERS * 4)))
+
+_pool = None
+_pending = 0
+
+
+class HashPoolSaturated(Exception):
+    """Raised when too many hashes are already queued; callers answer 503."""
+
+
+def _coerce(password) -> str:
     if password is None:
         password = ""
     if not isinstance(password, str):
         password = str(password)
-    return pwd_context.hash(password)
+    return password
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(_coerce(password))
 
 def verify_password(password: str, hashed: str) -> bool:
-    if password is None:
-        password = ""
-    if not isinstance(password, str):
-        password = str(password)
-    return pwd_context.verify(password, hashed)
+    return pwd_context.verify(_coerce(password), hashed)
+
+def verify_and_update_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Verify; when the stored hash uses outdated parameters also return a new hash."""
+    return pwd_context.verify_and_update(_coerce(password), hashed)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        if HASH_POOL_KIND == "process":
+            _pool = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+        else:
+            _pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="argon2")
+    return _pool
+
+
+async def _run_bounded(fn, *args):
+    global _pending
+    if _pending >= HASH_MAX_PENDING:
+        raise HashPoolSaturated()
+
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), fn, *args)
+    finally:
+        _pending -= 1
+
+
+async def ahash_password(password: str) -> str:
+    return await _run_bounded(hash_password, password)
+
+async def averify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Pool-backed verify_and_update_password; raises HashPoolSaturated when full."""
+    return await _run_bounded(verify_and_update_password, password, hashed)
+
+def hash_pool_stats() -> dict:
+    return {"workers": HASH_WORKERS, "pending": _pending, "max_pending": HASH_MAX_PENDING,
+            "kind": HASH_POOL_KIND}
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+from pymongo import ReturnDocument
+
+
+SEAT_INVENTORY_ENABLED = os.getenv("SEAT_INVENTORY", "false").lower() in ("true", "1", "yes")
+# seats leased per claim by the in-memory ledger; 0 keeps every booking in Mongo
+SEAT_LEDGER_BLOCK = int(os.getenv("SEAT_LEDGER_BLOCK", "0"))
+# leases untouched this long are handed back to Mongo by reconcile()
+SEAT_LEDGER_IDLE_S = float(os.getenv("SEAT_LEDGER_IDLE_S", "30"))
+
+
+class SoldOut(Exception):
+    """Not enough seats left on the route or trip."""
+
+
+class UnknownTrip(Exception):
+    """A trip id was given but no capacity document exists for it."""
+
+
+def route_key(district: str, drop_point: str) -> str:
+    return f"route:{district}:{drop_point}"
+
+
+def trip_key(trip_id: str) -> str:
+    return f"trip:{trip_id}"
+
+
+class SeatInventory:
+    """
+    Seat counts in an `inventory` collection: {_id: key, capacity, available}.
+
+    A booking is one conditional update,
+    {_id: key, available: {$gte: n}} -> {$inc: {available: -n}},
+    so there is no read-then-write window and concurrent bookers cannot
+    oversell. Releasing seats is the compensating {$inc: +n}.
+
+    Route keys without a document are unmanaged: bookings pass unchecked.
+    Trip keys must exist.
+
+    With `ledger_block` > 0 hot keys are served from an in-memory lease:
+    seats are claimed from Mongo `ledger_block` at a time with the same
+    conditional update and handed out locally, and reconcile() returns idle
+    leases. Leases can only under-sell (a crash strands leased seats until
+    capacity is reset), never over-sell.
+    """
+
+    def __init__(self, collection,
+                 ledger_block: int = SEAT_LEDGER_BLOCK,
+                 ledger_idle_s: float = SEAT_LEDGER_IDLE_S):
+        self.collection = collection
+        self.ledger_block = max(0, ledger_block)
+        self.ledger_idle_s = ledger_idle_s
+        # key -> locally held seats, key -> last touch (monotonic)
+        self._leases: Dict[str, int] = {}
+        self._touched: Dict[str, float] = {}
+
+    #  CAPACITY
+    async def set_capacity(self, key: str, capacity: int) -> dict:
+        """Create or resize a capacity document, keeping booked seats counted."""
+        return await self.collection.find_one_and_update(
+            {"_id": key},
+            [{"$set": {
+                "available": {"$add": [
+                    {"$ifNull": ["$available", 0]},
+                    {"$subtract": [capacity, {"$ifNull": ["$capacity", 0]}]},
+                ]},
+                "capacity": capacity,
+            }}],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def get(self, key: str) -> Optional[dict]:
+        doc = await self.collection.find_one({"_id": key})
+        if doc is not None:
+            doc["leased_locally"] = self._leases.get(key, 0)
+        return doc
+
+    #  RESERVE / RELEASE
+    async def _take(self, key: str, seats: int) -> bool:
+        doc = await self.collection.find_one_and_update(
+            {"_id": key, "available": {"$gte": seats}},
+            {"$inc": {"available": -seats}},
+            projection={"_id": 1},
+        )
+        return doc is not None
+
+    async def reserve(self, key: str, seats: int = 1, must_exist: bool = False) -> bool:
+        """
+        Take `seats` from `key`. Returns True when the key is managed (the
+        caller must release on cancel) and False for an unmanaged route.
+        """
+        if self.ledger_block:
+            self._touched[key] = time.monotonic()
+            if self._leases.get(key, 0) >= seats:
+                self._leases[key] -= seats
+                return True
+
+            block = max(self.ledger_block, seats)
+            if await self._take(key, block):
+                self._leases[key] = self._leases.get(key, 0) + block - seats
+                return True
+
+        if await self._take(key, seats):
+            return True
+
+        # failure path only: tell "sold out" apart from "not managed"
+        if await self.collection.find_one({"_id": key}, {"_id": 1}) is not None:
+            raise SoldOut()
+        if must_exist:
+            raise UnknownTrip()
+        return False
+
+    async def release(self, key: str, seats: int = 1):
+        if self.ledger_block and key in self._leases:
+            self._leases[key] += seats
+            self._touched[key] = time.monotonic()
+            return
+        await self.collection.update_one({"_id": key}, {"$inc": {"available": seats}})
+
+    #  LEDGER RECONCILIATION
+    async def reconcile(self, idle_only: bool = True) -> int:
+        """Return leased seats to Mongo; returns how many seats went back."""
+        now = time.monotonic()
+        returned = 0
+        for key in list(self._leases):
+            if idle_only and now - self._touched.get(key, 0) < self.ledger_idle_s:
+                continue
+            seats = self._leases.pop(key)
+            self._touched.pop(key, None)
+            if seats:
+                await self.collection.update_one({"_id": key}, {"$inc": {"available": seats}})
+                returned += seats
+        return returned
+
+    async def run_reconciler(self):
+        """Background task: hand idle leases back to Mongo periodically."""
+        while True:
+            await asyncio.sleep(max(1.0, self.ledger_idle_s / 2))
+            try:
+                await self.reconcile()
+            except Exception as e:
+                print("[inventory] reconcile failed:", e, file=sys.stderr)
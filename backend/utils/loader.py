@@ -1,11 +1,10 @@
 import json
 from pathlib import Path
+from backend.utils.fare_catalog import fare_catalog
 
 def load_bus_data():
-    path = Path(__file__).parent.parent / "data" / "bus_data.json"
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data
+    # parsed once by the fare catalog; re-read only when the file changes
+    return fare_catalog.snapshot().data
 
 def load_privacy_policies():
     path = Path(__file__).parent.parent / "data" / "privacy_policy.json"
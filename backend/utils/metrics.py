@@ -0,0 +1,241 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+METRICS_ENABLED = os.getenv("METRICS", "true").lower() in ("true", "1", "yes")
+# adds a Server-Timing header (per-stage durations) to every response
+SERVER_TIMING_ENABLED = os.getenv("METRICS_SERVER_TIMING", "false").lower() in ("true", "1", "yes")
+
+# seconds; spans Argon2 / Mongo round-trips up to slow Gemini calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (stage, seconds) pairs of the request being served; None outside a request
+_request_timings: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Prometheus-style histogram; buckets are stored per-bucket and summed on render."""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        for labels, (counts, total, count) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le_label)} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Gauge:
+    """Sampled at scrape time from a callback, so the owner keeps no extra state."""
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help_text
+        self.read = read
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge",
+                f"{self.name} {float(self.read()):g}"]
+
+
+#  REGISTRY
+STAGE_SECONDS = Histogram("app_stage_duration_seconds", "Time spent per internal stage", ("stage",))
+STAGE_ERRORS = Counter("app_stage_errors_total", "Stages that raised", ("stage",))
+HTTP_SECONDS = Histogram("http_request_duration_seconds", "Request latency per route", ("method", "route"))
+HTTP_REQUESTS = Counter("http_requests_total", "Requests per route and status", ("method", "route", "status"))
+EVENTS = Counter("app_events_total", "Notable events (retries, fallbacks, cache hits)", ("event",))
+
+REGISTRY = [STAGE_SECONDS, STAGE_ERRORS, HTTP_SECONDS, HTTP_REQUESTS, EVENTS]
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def count(event: str, amount: float = 1.0):
+    if METRICS_ENABLED:
+        EVENTS.inc((event,), amount)
+
+
+def observe(stage_name: str, seconds: float):
+    """Record a duration measured by hand (e.g. time to first streamed chunk)."""
+    if METRICS_ENABLED:
+        STAGE_SECONDS.observe(seconds, (stage_name,))
+
+
+#  STAGE TIMER
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, (self.name,))
+        if exc_type is not None and exc_type is not GeneratorExit:
+            STAGE_ERRORS.inc((self.name,))
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.name, elapsed))
+        return False
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopStage()
+
+
+def stage(name: str):
+    """`with stage("embed"): ...` - records into the stage histogram and Server-Timing."""
+    return _Stage(name) if METRICS_ENABLED else _NOOP
+
+
+#  ASGI MIDDLEWARE
+def _server_timing(timings: list, total: float) -> str:
+    merged: Dict[str, float] = {}
+    for name, seconds in timings:
+        merged[name] = merged.get(name, 0.0) + seconds
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in merged.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def _route_label(scope) -> str:
+    # the route template, never the raw path, so ids do not explode cardinality
+    route = scope.get("route")
+    if route is None:
+        endpoint = scope.get("endpoint")
+        return getattr(endpoint, "__name__", "unmatched")
+
+    template = getattr(route, "path", "")
+    path = scope.get("path", "")
+    regex = getattr(route, "path_regex", None)
+    if regex is not None and not regex.match(path):
+        # newer FastAPI keeps an included router's own templates; put the
+        # include prefix back from the concrete path. A route declared as
+        # @router.get("") has an empty template: the prefix is the whole path.
+        for i in range(1, len(path) + 1):
+            if (i == len(path) or path[i] == "/") and regex.match(path[i:]):
+                return path[:i] + template
+    return template or path or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware buffering): per-route latency
+    histogram, request counter, and an optional Server-Timing header built
+    from the stages that ran before the response started.
+    """
+
+    def __init__(self, app, server_timing: bool = SERVER_TIMING_ENABLED):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: list = []
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    header = _server_timing(timings, time.perf_counter() - start)
+                    message = {**message, "headers": [*message.get("headers", []),
+                                                      (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_timings.reset(token)
+            route = _route_label(scope)
+            HTTP_SECONDS.observe(time.perf_counter() - start, (scope["method"], route))
+            HTTP_REQUESTS.inc((scope["method"], route, str(status)))
@@ -1,33 +1,219 @@
 import os
 import time
 import re
-from google.genai import Client, types
-from backend.utils.vectorstore import load_vectorstore
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from backend.utils.vectorstore import (
+    load_vectorstore,
+    create_vectorstore,
+    current_store_version,
+    embed_texts_local_safe,
+)
+from backend.utils.answer_cache import SemanticAnswerCache
+from backend.utils.fast_path import fast_path
+from backend.utils.context_builder import context_builder, load_tokenizer
+from backend.utils.metrics import stage, count, observe
+from backend.utils.gemini_guard import gemini_guard, flight_key, GeminiUnavailable
 
 
 #  GEMINI CLIENT SETUP
+# google.genai takes ~0.4 s to import, so the client is built on first use
+# (or by warm_up) instead of at import time.
 GEMINI_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-genai_client = Client(api_key=GEMINI_KEY) if GEMINI_KEY else None
-HAS_GEMINI = genai_client is not None
+GEMINI_MODEL = "gemini-2.5-flash"
+HAS_GEMINI = bool(GEMINI_KEY)
+_genai_client = None
+_genai_lock = threading.Lock()
+
+
+def gemini_client():
+    global _genai_client
+    if _genai_client is None:
+        with _genai_lock:
+            if _genai_client is None:
+                from google.genai import Client
+                _genai_client = Client(api_key=GEMINI_KEY)
+    return _genai_client
+
+class AnswerInterrupted(Exception):
+    """The Gemini stream failed after part of the answer was already sent."""
+
+
+NOT_CONFIGURED_MESSAGE = "AI model is not configured on the server."
+NO_STORE_MESSAGE = "Vectorstore is not ready. Please rebuild it first."
+FALLBACK_MESSAGE = "I'm having some trouble answering right now. Please try again shortly."
+
+
+
+#  ASYNC RUNTIME SETTINGS
+# Query embedding goes through the vectorstore's batching broker thread and
+# vector search runs on a small dedicated pool, so neither lands on the
+# event loop. The deadline bounds the whole answer (Gemini calls and retry
+# sleeps included).
+SEARCH_WORKERS = int(os.getenv("RAG_SEARCH_WORKERS", "2"))
+ANSWER_DEADLINE_S = float(os.getenv("RAG_ANSWER_DEADLINE_S", "25"))
+# a Gemini attempt is not started with less time than this left
+MIN_ATTEMPT_S = float(os.getenv("RAG_MIN_ATTEMPT_S", "1.5"))
+MAX_ATTEMPTS = 4
+# Gemini calls one /chat/ask_batch request may have open at once
+# (gemini_guard still caps the whole process)
+BATCH_LLM_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "8"))
+# threads for /chat/ask_batch encodes and searches (hundreds of rows each)
+BATCH_WORKERS = int(os.getenv("RAG_BATCH_WORKERS", "1"))
+
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="rag-search")
+# rebuilds and reloads take seconds; they get their own thread so live
+# chat searches never queue behind them
+_maintenance_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-maintenance")
+# same for batch requests: a 500-question encode must not hold up /ask
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="rag-batch")
 
 
 
 #  LOAD VECTORSTORE
-try:
-    _vectorstore = load_vectorstore()
-except FileNotFoundError:
-    _vectorstore = None
+# Loaded on first use (or by warm_up), not at import.
+_vectorstore = None
+_store_attempted = False
+_store_lock = threading.Lock()
+
+
+def get_vectorstore():
+    """The live store, loading it on first call. Blocking; None if missing."""
+    global _vectorstore, _store_attempted
+    if not _store_attempted:
+        with _store_lock:
+            if not _store_attempted:
+                try:
+                    _vectorstore = load_vectorstore()
+                except FileNotFoundError:
+                    _vectorstore = None
+                _store_attempted = True
+    return _vectorstore
+
+
+async def aget_vectorstore():
+    if _store_attempted:
+        return _vectorstore
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_search_executor, get_vectorstore)
+
+# seconds between checks for a newly published store; 0 disables watching
+VECTORSTORE_WATCH_S = float(os.getenv("VECTORSTORE_WATCH_S", "10"))
+_reload_lock = asyncio.Lock()
+
+
+
+#  HOT RELOAD
+# Handlers grab `_vectorstore` once per request, so swapping the global
+# never disturbs a request already in flight.
+def reload_vectorstore() -> bool:
+    """Load the published store and swap it in if it is newer. Blocking."""
+    global _vectorstore, _store_attempted
+    current = _vectorstore
+    if current is not None and current.version == current_store_version():
+        return False
+
+    try:
+        fresh = load_vectorstore()
+    except FileNotFoundError:
+        return False
+
+    _vectorstore = fresh
+    _store_attempted = True
+    print(f"[RAG] vectorstore reloaded -> {fresh.version} ({len(fresh)} chunks)")
+    return True
+
+
+async def areload_vectorstore(rebuild: bool = False) -> bool:
+    """Optionally rebuild (incrementally), then hot-swap, off the event loop."""
+    async with _reload_lock:
+        loop = asyncio.get_running_loop()
+        if rebuild:
+            await loop.run_in_executor(_maintenance_executor, create_vectorstore)
+        return await loop.run_in_executor(_maintenance_executor, reload_vectorstore)
+
+
+async def watch_vectorstore(interval_s: float = VECTORSTORE_WATCH_S):
+    """Background task: pick up stores published by build_vectorstore.py."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            current = _vectorstore
+            if current is None or current.version != current_store_version():
+                await areload_vectorstore()
+        except Exception as e:
+            print("[RAG] vectorstore reload failed:", e)
+
+
+def vectorstore_info() -> dict:
+    store = _vectorstore
+    if store is None:
+        return {"ready": False}
+    return {"ready": True, "version": store.version, "chunks": len(store),
+            "index": store.index_type}
+
+
+
+#  WARM-UP
+# Filled in by warm_up(); /readyz reports it.
+warmup_state = {"done": False, "vectorstore": False, "embedder": False, "gemini": False,
+                "tokenizer": False}
+
+
+def _warm_embedder() -> bool:
+    # loads the SentenceTransformer weights and runs one real encode
+    return embed_texts_local_safe(["warm up"]).shape[0] == 1
+
+
+async def warm_up():
+    """
+    Background start-up task: load the vectorstore, the embedding model, the
+    Gemini client and the tiktoken encoding in parallel off the event loop,
+    so the first user does not pay for them. Failures are logged; the lazy paths still work.
+    """
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    steps = {
+        "vectorstore": lambda: get_vectorstore() is not None,
+        "embedder": _warm_embedder,
+        "gemini": lambda: HAS_GEMINI and gemini_client() is not None,
+        "tokenizer": load_tokenizer,
+    }
+
+    async def run(name, step):
+        try:
+            warmup_state[name] = bool(await loop.run_in_executor(None, step))
+        except Exception as e:
+            print(f"[RAG] warm-up {name} failed:", e)
+
+    await asyncio.gather(*(run(name, step) for name, step in steps.items()))
+    warmup_state["seconds"] = round(time.perf_counter() - start, 3)
+    warmup_state["done"] = True
+    print(f"[RAG] warm-up finished in {warmup_state['seconds']}s: "
+          + ", ".join(f"{k}={'ok' if warmup_state[k] else 'no'}" for k in steps))
+
+
+
+#  SEMANTIC ANSWER CACHE
+# Rephrasings of the same question reuse the first Gemini answer
+answer_cache = SemanticAnswerCache()
 
 
 
 #  MARKDOWN / SYMBOL CLEANER
+_MARKDOWN_RE = re.compile(r'[*_`#>-]')
+_WHITESPACE_SPLIT_RE = re.compile(r'(\s+)')
+
+
 def clean_output(text: str) -> str:
     """Remove markdown symbols (*, -, _, #, **) and normalize spacing."""
     if not text:
         return text
 
     # remove markdown formatting
-    text = re.sub(r'[*_`#>-]', '', text)
+    text = _MARKDOWN_RE.sub('', text)
 
     # remove accidental double spaces
     text = re.sub(r'\s+', ' ', text)
@@ -35,101 +221,528 @@ def clean_output(text: str) -> str:
     return text.strip()
 
 
+class StreamCleaner:
+    """
+    Incremental clean_output for streamed text.
+    Joining every feed() result gives the same string clean_output would
+    return for the full text: whitespace runs that straddle chunk
+    boundaries collapse to one space, and leading/trailing space is dropped.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._pending_space = False
+
+    def feed(self, chunk: str) -> str:
+        if not chunk:
+            return ""
+
+        out = []
+        for part in _WHITESPACE_SPLIT_RE.split(_MARKDOWN_RE.sub('', chunk)):
+            if not part:
+                continue
+            if part.isspace():
+                # held back until we know more text follows
+                self._pending_space = self._started
+                continue
+            if self._pending_space:
+                out.append(" ")
+                self._pending_space = False
+            out.append(part)
+            self._started = True
+        return "".join(out)
+
+
 
 #  SAFE GEMINI CALL
+def _generation_config(max_output_tokens: int, temperature: float):
+    from google.genai import types
+    return types.GenerateContentConfig(
+        max_output_tokens=max_output_tokens,
+        temperature=temperature
+    )
+
+
 def _safe_gemini(prompt: str,
                  max_output_tokens: int = 500,
                  temperature: float = 0.35) -> str:
     """A safer wrapper around Gemini with full fallback."""
 
     if not HAS_GEMINI:
-        return "AI model is not configured on the server."
+        return NOT_CONFIGURED_MESSAGE
+
+    breaker = gemini_guard.breaker
+    if not breaker.allow():
+        count("gemini_breaker_rejected")
+        return None
 
     try:
-        response = genai_client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                max_output_tokens=max_output_tokens,
-                temperature=temperature
+        with stage("gemini"):
+            response = gemini_client().models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config=_generation_config(max_output_tokens, temperature)
             )
-        )
 
         if not response or not response.text:
-            return None 
+            breaker.record(False)
+            return None
 
+        breaker.record(True)
         return clean_output(response.text)
 
     except Exception as e:
+        breaker.record(False)
         print("[Gemini Error]", e)
-        return None  
+        return None
 
 
-
-#  GENERATE ANSWER (RAG + GENERIC CHAT)
-def generate_answer(question: str,
-                    top_k: int = 4,
-                    similarity_threshold: float = 0.32) -> str:
+async def _safe_gemini_async(prompt: str,
+                             max_output_tokens: int = 500,
+                             temperature: float = 0.35,
+                             timeout: float = None) -> str:
     """
-    Enhanced RAG:
-    - Extremely stable
-    - Very natural responses
-    - Never outputs markdown symbols
-    - Strong fallback conversation mode
+    Async twin of _safe_gemini using the non-blocking Gemini client.
+    Goes through gemini_guard: identical concurrent prompts share one call,
+    and the call waits for a concurrency slot unless the breaker is open.
     """
 
-    if _vectorstore is None:
-        return "Vectorstore is not ready. Please rebuild it first."
+    if not HAS_GEMINI:
+        return NOT_CONFIGURED_MESSAGE
+
+    async def upstream():
+        with stage("gemini"):
+            response = await gemini_client().aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config=_generation_config(max_output_tokens, temperature)
+            )
+
+        if not response or not response.text:
+            return None
+
+        return clean_output(response.text)
+
+    try:
+        return await gemini_guard.call(
+            flight_key(prompt, max_output_tokens, temperature), upstream, timeout
+        )
+
+    except GeminiUnavailable as e:
+        print("[Gemini Error]", e)
+        return None
+
+    except asyncio.TimeoutError:
+        print("[Gemini Error] timed out")
+        return None
+
+    except Exception as e:
+        print("[Gemini Error]", e)
+        return None
+
 
-    # Search dataset
-    hits = _vectorstore.similarity_search(question, k=top_k)
-    relevant = [h for h in hits if h["score"] >= similarity_threshold]
 
+#  PROMPT BUILDING
+def _relevant_hits(hits, similarity_threshold: float):
+    return [h for h in hits if h["score"] >= similarity_threshold]
+
+
+def _context_lines(store, relevant) -> list:
+    # MMR-deduplicated and cut to the token budget
+    with stage("context"):
+        lines, _ = context_builder.build(relevant, store)
+    return lines
+
+
+def _build_prompt(question: str, context_lines, history=None) -> str:
+    # earlier turns of a chat session (summary + recent turns), fixed size
+    conversation = ""
+    if history:
+        conversation = "Conversation so far:\n" + "\n".join(history) + "\n\n"
 
     #  CASE 1 — RAG MODE (context available)
-    if relevant:
-        context = "\n".join(f"- {h['text']}" for h in relevant)
+    if context_lines:
+        context = "\n".join(f"- {line}" for line in context_lines)
 
-        prompt = (
+        return (
             "You are an intelligent bus travel assistant. "
             "Use ONLY the given context to answer. "
             "If something is unclear, ask the user politely. "
             "Do NOT use markdown symbols like *, -, _, #. "
             "Respond naturally like a human.\n\n"
             f"Context:\n{context}\n\n"
+            f"{conversation}"
             f"User Question: {question}\n\n"
             "Give a clear and friendly answer:"
         )
 
-   
     #  CASE 2 — GENERIC CHAT MODE (no context match)
-    else:
-        prompt = (
-            "You are a friendly conversational AI. "
-            "The user asked something outside the dataset. "
-            "Give a natural, clean and helpful reply. "
-            "Avoid markdown symbols like *, -, _, #. "
-            "If the question is unclear, ask a small follow-up.\n\n"
-            f"User: {question}\n"
-            "Reply:"
+    return (
+        "You are a friendly conversational AI. "
+        "The user asked something outside the dataset. "
+        "Give a natural, clean and helpful reply. "
+        "Avoid markdown symbols like *, -, _, #. "
+        "If the question is unclear, ask a small follow-up.\n\n"
+        f"{conversation}"
+        f"User: {question}\n"
+        "Reply:"
+    )
+
+
+
+async def _aembed(store, question: str):
+    with stage("embed"):
+        return await store._aembed_query(question)
+
+
+async def _aprompt(store, question: str, q_emb, top_k: int, similarity_threshold: float,
+                   history=None) -> str:
+    loop = asyncio.get_running_loop()
+    with stage("search"):
+        hits = await loop.run_in_executor(
+            _search_executor, store.hybrid_search, question, q_emb, top_k
         )
+    return _build_prompt(question, _context_lines(store, _relevant_hits(hits, similarity_threshold)), history)
+
+
+
+#  GENERATE ANSWER (RAG + GENERIC CHAT)
+def generate_answer(question: str,
+                    top_k: int = 4,
+                    similarity_threshold: float = 0.32) -> str:
+    """
+    Enhanced RAG:
+    - Extremely stable
+    - Very natural responses
+    - Never outputs markdown symbols
+    - Strong fallback conversation mode
+
+    Blocking; async callers should use agenerate_answer instead.
+    """
+
+    # fare / coverage lookups are answered from the catalog directly
+    direct = fast_path.answer(question)
+    if direct:
+        count("chat_fast_path")
+        return direct
+
+    store = get_vectorstore()
+    if store is None:
+        return NO_STORE_MESSAGE
+
+    with stage("embed"):
+        q_emb = store._embed_query(question)
+    cached = answer_cache.lookup(q_emb, store.version)
+    if cached:
+        count("answer_cache_hit")
+        return cached
+
+    # Search dataset
+    with stage("search"):
+        hits = store.hybrid_search(question, q_emb, k=top_k)
+    relevant = _relevant_hits(hits, similarity_threshold)
+    prompt = _build_prompt(question, _context_lines(store, relevant))
+
 
-  
     #  GEMINI CALL WITH RETRIES
     last_err = None
+    gemini_guard.retries.deposit()
 
-    for attempt in range(4):
+    for attempt in range(MAX_ATTEMPTS):
         answer = _safe_gemini(prompt, max_output_tokens=500, temperature=0.45)
 
-        if answer: 
+        if answer:
+            if HAS_GEMINI:
+                answer_cache.put(q_emb, answer, store.version, question)
             return answer
 
+        if attempt == MAX_ATTEMPTS - 1 or not gemini_guard.allow_retry():
+            break
+
         last_err = f"Attempt {attempt + 1} returned empty."
         wait = 2 ** (attempt + 1)
 
         print(f"[RAG] Retry in {wait}s — {last_err}")
-        time.sleep(wait)
+        count("rag_retry")
+        with stage("retry_sleep"):
+            time.sleep(wait)
 
 
     #  FINAL FAILURE FALLBACK
-    return "I'm having some trouble answering right now. Please try again shortly."
+    return FALLBACK_MESSAGE
+
+
+async def agenerate_answer(question: str,
+                           top_k: int = 4,
+                           similarity_threshold: float = 0.32,
+                           deadline_s: float = ANSWER_DEADLINE_S,
+                           history=None) -> str:
+    """
+    Non-blocking generate_answer for request handlers.
+    `question` should already be standalone (see sessions.rewrite);
+    `history` is the session's prompt lines.
+    - Embedding is batched off-loop; search runs on the bounded pool
+    - Gemini is called through the async client
+    - Backoff uses asyncio.sleep and stops at the overall deadline
+      or when the shared retry budget runs dry
+    """
+
+    direct = fast_path.answer(question)
+    if direct:
+        count("chat_fast_path")
+        return direct
+
+    store = await aget_vectorstore()
+    if store is None:
+        return NO_STORE_MESSAGE
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_s
+
+    q_emb = await _aembed(store, question)
+    # answers written for one conversation are never shared with another
+    cacheable = not history
+    cached = answer_cache.lookup(q_emb, store.version) if cacheable else None
+    if cached:
+        count("answer_cache_hit")
+        return cached
+
+    prompt = await _aprompt(store, question, q_emb, top_k, similarity_threshold, history)
+    # one question earns retry budget once, however many attempts it takes
+    gemini_guard.retries.deposit()
+    return await _aanswer_prompt(store, question, q_emb, prompt, deadline, cacheable)
+
+
+async def _aanswer_prompt(store, question: str, q_emb, prompt: str, deadline: float,
+                          cacheable: bool = True) -> str:
+    """Gemini with backoff until an answer, the deadline or the retry budget runs out."""
+    loop = asyncio.get_running_loop()
+
+    for attempt in range(MAX_ATTEMPTS):
+        remaining = deadline - loop.time()
+        if remaining < MIN_ATTEMPT_S:
+            break
+
+        answer = await _safe_gemini_async(
+            prompt, max_output_tokens=500, temperature=0.45, timeout=remaining
+        )
+
+        if answer:
+            if HAS_GEMINI and cacheable:
+                answer_cache.put(q_emb, answer, store.version, question)
+            return answer
+
+        wait = 2 ** (attempt + 1)
+        # no point sleeping if the retry after it could not be started
+        if (attempt == MAX_ATTEMPTS - 1 or deadline - loop.time() - wait < MIN_ATTEMPT_S
+                or not gemini_guard.allow_retry()):
+            break
+
+        print(f"[RAG] Retry in {wait:.1f}s — Attempt {attempt + 1} returned empty.")
+        count("rag_retry")
+        with stage("retry_sleep"):
+            await asyncio.sleep(wait)
+
+    print("[RAG] Giving up — retries or deadline exhausted.")
+    count("rag_fallback")
+    return FALLBACK_MESSAGE
+
+
+
+#  BATCH ANSWERS
+async def aanswer_batch(questions: List[str],
+                        top_k: int = 4,
+                        similarity_threshold: float = 0.32,
+                        retrieval_only: bool = False,
+                        concurrency: int = BATCH_LLM_CONCURRENCY,
+                        deadline_s: float = ANSWER_DEADLINE_S) -> List[dict]:
+    """
+    Many questions in one pass, results in input order.
+    - One encode call for every question that needs retrieval
+    - One matrix-matrix search with a per-row top-k
+    - Gemini calls run at most `concurrency` at a time; each question's
+      `deadline_s` starts when it gets its turn, not when the batch starts
+    retrieval_only skips Gemini (and the fast path) and returns the hits.
+    """
+
+    results: List[dict] = [{"question": q} for q in questions]
+    pending = []
+    for i, q in enumerate(questions):
+        direct = None if retrieval_only else fast_path.answer(q)
+        if direct:
+            count("chat_fast_path")
+            results[i]["answer"] = direct
+        else:
+            pending.append(i)
+
+    if not pending:
+        return results
+
+    store = await aget_vectorstore()
+    if store is None:
+        for i in pending:
+            if retrieval_only:
+                results[i]["hits"] = []
+            else:
+                results[i]["answer"] = NO_STORE_MESSAGE
+        return results
+
+    loop = asyncio.get_running_loop()
+    texts = [questions[i] for i in pending]
+
+    with stage("embed"):
+        q_embs = await loop.run_in_executor(_batch_executor, store._embed_queries, texts)
+
+    if not retrieval_only:
+        # cached answers need neither search nor Gemini
+        misses = []
+        for row, i in enumerate(pending):
+            cached = answer_cache.lookup(q_embs[row], store.version)
+            if cached:
+                count("answer_cache_hit")
+                results[i]["answer"] = cached
+            else:
+                misses.append(row)
+        pending = [pending[row] for row in misses]
+        texts = [texts[row] for row in misses]
+        q_embs = q_embs[misses]
+        if not pending:
+            return results
+
+    with stage("search"):
+        hits = await loop.run_in_executor(
+            _batch_executor, store.hybrid_search_batch, texts, q_embs, top_k
+        )
+
+    if retrieval_only:
+        for i, row_hits in zip(pending, hits):
+            results[i]["hits"] = row_hits
+        return results
+
+    gate = asyncio.Semaphore(max(1, concurrency))
+
+    async def answer_one(row: int, i: int):
+        relevant = _relevant_hits(hits[row], similarity_threshold)
+        prompt = _build_prompt(questions[i], _context_lines(store, relevant))
+        gemini_guard.retries.deposit()
+        async with gate:
+            results[i]["answer"] = await _aanswer_prompt(
+                store, questions[i], q_embs[row], prompt, loop.time() + deadline_s
+            )
+
+    await asyncio.gather(*(answer_one(row, i) for row, i in enumerate(pending)))
+    return results
+
+
+
+#  STREAMING ANSWER (SSE)
+async def astream_answer(question: str,
+                         top_k: int = 4,
+                         similarity_threshold: float = 0.32,
+                         deadline_s: float = ANSWER_DEADLINE_S,
+                         history=None):
+    """
+    Yield cleaned answer text as Gemini streams it.
+    Retries only happen before the first chunk is sent; once text has
+    reached the client a failure raises AnswerInterrupted, so the caller
+    can tell a cut-off answer from a complete one.
+    """
+
+    direct = fast_path.answer(question)
+    if direct:
+        count("chat_fast_path")
+        yield direct
+        return
+
+    store = await aget_vectorstore()
+    if store is None:
+        yield NO_STORE_MESSAGE
+        return
+
+    if not HAS_GEMINI:
+        yield NOT_CONFIGURED_MESSAGE
+        return
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_s
+
+    q_emb = await _aembed(store, question)
+    # answers written for one conversation are never shared with another
+    cacheable = not history
+    cached = answer_cache.lookup(q_emb, store.version) if cacheable else None
+    if cached:
+        count("answer_cache_hit")
+        yield cached
+        return
+
+    prompt = await _aprompt(store, question, q_emb, top_k, similarity_threshold, history)
+    gemini_guard.retries.deposit()
+
+    for attempt in range(MAX_ATTEMPTS):
+        remaining = deadline - loop.time()
+        if remaining < MIN_ATTEMPT_S:
+            break
+
+        cleaner = StreamCleaner()
+        emitted = []
+
+        try:
+            # streams are per-client, so no single-flight; slot and breaker only
+            async with gemini_guard.slot(remaining) as outcome:
+                stream = await outcome.wait(
+                    gemini_client().aio.models.generate_content_stream(
+                        model=GEMINI_MODEL,
+                        contents=prompt,
+                        config=_generation_config(500, 0.45)
+                    ),
+                    deadline - loop.time()
+                )
+                chunks = stream.__aiter__()
+                started = loop.time()
+
+                while True:
+                    try:
+                        chunk = await outcome.wait(chunks.__anext__(), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+
+                    piece = cleaner.feed(chunk.text or "")
+                    if piece:
+                        if not emitted:
+                            observe("gemini_first_chunk", loop.time() - started)
+                        emitted.append(piece)
+                        yield piece
+
+                outcome.empty = not emitted
+
+            if emitted:
+                # only complete answers are cached
+                if cacheable:
+                    answer_cache.put(q_emb, "".join(emitted), store.version, question)
+                return
+
+        except GeminiUnavailable as e:
+            print("[Gemini Error]", e)
+            break
+
+        except asyncio.TimeoutError:
+            print("[Gemini Error] stream timed out")
+            if emitted:
+                raise AnswerInterrupted("stream timed out")
+
+        except Exception as e:
+            print("[Gemini Error]", e)
+            if emitted:
+                raise AnswerInterrupted(str(e)) from e
+
+        wait = 2 ** (attempt + 1)
+        if (attempt == MAX_ATTEMPTS - 1 or deadline - loop.time() - wait < MIN_ATTEMPT_S
+                or not gemini_guard.allow_retry()):
+            break
+
+        print(f"[RAG] Stream retry in {wait:.1f}s — Attempt {attempt + 1} returned empty.")
+        count("rag_retry")
+        with stage("retry_sleep"):
+            await asyncio.sleep(wait)
+
+    yield FALLBACK_MESSAGE
@@ -0,0 +1,323 @@
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from jose import jwt, JWTError
+from pymongo import ReturnDocument
+from starlette.requests import cookie_parser
+
+from backend.utils.jwt import SECRET_KEY, ALGORITHM
+from backend.utils.metrics import REGISTRY, Gauge, count
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT", "true").lower() in ("true", "1", "yes")
+# "memory" (per worker) or "mongo" (buckets shared by every worker)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+# "METHOD /path=rate/s:burst,..."; rate is tokens per second, burst the bucket size
+DEFAULT_RULES = (
+    "POST /chat/ask=0.5:10,"
+    "POST /chat/stream=0.5:10,"
+    "POST /chat/ask_batch=0.02:2,"
+    "POST /auth/login=0.2:5,"
+    "POST /auth/signup=0.05:3"
+)
+RATE_LIMIT_RULES = os.getenv("RATE_LIMIT_RULES", DEFAULT_RULES)
+# an IP may carry several users (NAT, offices): its bucket is this many times larger
+RATE_LIMIT_IP_FACTOR = float(os.getenv("RATE_LIMIT_IP_FACTOR", "4"))
+# honour X-Forwarded-For only behind a trusted reverse proxy
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() in ("true", "1", "yes")
+# buckets kept in memory; least recently used are dropped (they refill anyway)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# load shedding: requests in flight across the whole app, 0 disables
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "256"))
+# limited routes are shed while the event loop lags more than this
+MAX_LOOP_LAG_MS = float(os.getenv("MAX_LOOP_LAG_MS", "250"))
+LOOP_LAG_PROBE_S = 0.1
+LOOP_LAG_DECAY = 0.7
+# never limited or shed, so probes keep working under overload
+EXEMPT_PATHS = {"/healthz", "/readyz", "/metrics"}
+# longest Retry-After ever sent
+MAX_RETRY_AFTER_S = 3600
+
+ACCESS_TOKEN_NAME = os.getenv("ACCESS_TOKEN_NAME", "access_token")
+
+
+def parse_rules(spec: str) -> Dict[Tuple[str, str], Tuple[float, float]]:
+    """'POST /chat/ask=0.5:10' -> {("POST", "/chat/ask"): (0.5, 10.0)}"""
+    rules = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        route, _, limit = part.partition("=")
+        method, _, path = route.strip().partition(" ")
+        rate, _, burst = limit.partition(":")
+        rules[(method.upper(), path.strip())] = (float(rate), float(burst or 1))
+    return rules
+
+
+#  BUCKET STORES
+class BucketStore(ABC):
+    """
+    Backend interface. take() refills `key` at `rate`/s up to `burst`, then
+    spends `cost` if it can. Returns (allowed, seconds until it would be).
+    """
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        ...
+
+
+class MemoryBucketStore(BucketStore):
+    """Per-process buckets: {key: [tokens, last refill]}, LRU-bounded."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max(1, max_keys)
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def take_now(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [burst, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return True, 0.0
+            return False, (cost - bucket[0]) / rate if rate > 0 else math.inf
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        return self.take_now(key, rate, burst, cost)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class MongoBucketStore(BucketStore):
+    """
+    Buckets shared by all workers: one document per key, refilled and spent
+    in a single pipeline update, so concurrent workers cannot double-spend.
+    Give `expires` a TTL index (expireAfterSeconds=0) to drop idle keys.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.time()
+        refilled = {"$min": [burst, {"$add": [
+            {"$ifNull": ["$tokens", burst]},
+            {"$multiply": [{"$subtract": [now, {"$ifNull": ["$ts", now]}]}, rate]},
+        ]}]}
+        full_in = burst / rate if rate > 0 else 86400
+        doc = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "ts": now}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", cost]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", cost]},
+                                         {"$subtract": ["$tokens", cost]}, "$tokens"]},
+                    "expires": datetime.now(timezone.utc) + timedelta(seconds=full_in),
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc["allowed"]:
+            return True, 0.0
+        return False, (cost - doc["tokens"]) / rate if rate > 0 else math.inf
+
+
+def _default_store() -> BucketStore:
+    if RATE_LIMIT_BACKEND == "mongo":
+        from pymongo import ASCENDING
+        from backend.database import db, INDEX_PLAN
+        collection = db["rate_limits"]
+        INDEX_PLAN.append((collection, [("expires", ASCENDING)],
+                           {"name": "expires_ttl", "expireAfterSeconds": 0}))
+        return MongoBucketStore(collection)
+    return MemoryBucketStore()
+
+
+#  LIMITER
+class RateLimiter:
+    """
+    Decides per request; RateLimitMiddleware applies it.
+
+    Load shedding, for every route except EXEMPT_PATHS:
+      - more than MAX_IN_FLIGHT requests in progress -> 503 + Retry-After
+      - limited routes only: event-loop lag above MAX_LOOP_LAG_MS -> 503
+    Rate limits, for the routes in RATE_LIMIT_RULES:
+      - one token bucket per IP (RATE_LIMIT_IP_FACTOR x the route limit
+        when the request also carries a user)
+      - one per user, keyed on the JWT `sub`, when a valid token is sent
+      - an empty bucket -> 429 + Retry-After
+    """
+
+    def __init__(self, store: Optional[BucketStore] = None, rules: Optional[dict] = None,
+                 max_in_flight: int = MAX_IN_FLIGHT, max_loop_lag_ms: float = MAX_LOOP_LAG_MS):
+        self.store = store or MemoryBucketStore()
+        self.rules = parse_rules(RATE_LIMIT_RULES) if rules is None else rules
+        self.max_in_flight = max_in_flight
+        self.max_loop_lag_s = max_loop_lag_ms / 1000
+        self.in_flight = 0
+        self.loop_lag_s = 0.0
+        # token -> (sub, exp); verified once instead of on every request
+        self._subjects: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self.limited = 0
+        self.shed = 0
+
+    async def admit(self, scope) -> Optional[Tuple[int, float, str]]:
+        """None to let the request through, else (status, retry_after, detail)."""
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return self._shed()
+
+        rule = self.rules.get((scope["method"], scope["path"]))
+        if rule is None:
+            return None
+        if self.loop_lag_s > self.max_loop_lag_s:
+            return self._shed()
+
+        allowed, retry_after = await self._check(scope, *rule)
+        if allowed:
+            return None
+        self.limited += 1
+        count("rate_limited")
+        return 429, retry_after, "Too many requests"
+
+    def _shed(self) -> Tuple[int, float, str]:
+        self.shed += 1
+        count("load_shed")
+        return 503, 1.0, "Server busy, retry shortly"
+
+    async def _check(self, scope, rate: float, burst: float) -> Tuple[bool, float]:
+        route = f"{scope['method']} {scope['path']}"
+        # raw header scan; cheaper than building a Request per call
+        headers = {k: v for k, v in scope["headers"] if k in _WANTED_HEADERS}
+        sub = self._subject(headers)
+        if sub is not None:
+            allowed, retry_after = await self.store.take(f"user:{sub}:{route}", rate, burst)
+            if not allowed:
+                return False, retry_after
+        factor = RATE_LIMIT_IP_FACTOR if sub is not None else 1.0
+        return await self.store.take(f"ip:{_client_ip(scope, headers)}:{route}", rate * factor, burst * factor)
+
+    def _subject(self, headers: dict) -> Optional[str]:
+        auth = headers.get(b"authorization", b"").decode("latin-1").strip()
+        token = auth.split(" ", 1)[1].strip() if auth.lower().startswith("bearer ") else auth
+        if not token and b"cookie" in headers:
+            token = cookie_parser(headers[b"cookie"].decode("latin-1")).get(ACCESS_TOKEN_NAME)
+        if not token:
+            return None
+
+        now = time.time()
+        cached = self._subjects.get(token)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            # invalid tokens are limited by IP only
+            payload = {}
+        sub = payload.get("sub")
+        self._subjects[token] = (sub, float(payload.get("exp") or now + 60))
+        if len(self._subjects) > 4096:
+            self._subjects.popitem(last=False)
+        return sub
+
+    async def watch_loop_lag(self, interval_s: float = LOOP_LAG_PROBE_S):
+        """Background task: a sleep that wakes late means the loop was busy for the difference."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval_s)
+            sample = max(0.0, loop.time() - start - interval_s)
+            # a stall is remembered for a few probes instead of one
+            self.loop_lag_s = max(sample, self.loop_lag_s * LOOP_LAG_DECAY)
+
+    def register_metrics(self):
+        REGISTRY.extend([
+            Gauge("http_in_flight", "Requests in progress (load shedding input)", lambda: self.in_flight),
+            Gauge("event_loop_lag_seconds", "Last measured event-loop lag", lambda: self.loop_lag_s),
+        ])
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "loop_lag_ms": round(self.loop_lag_s * 1000, 1),
+            "limited": self.limited,
+            "shed": self.shed,
+            "rules": {f"{m} {p}": {"rate": r, "burst": b} for (m, p), (r, b) in self.rules.items()},
+        }
+
+
+_WANTED_HEADERS = (b"authorization", b"cookie", b"x-forwarded-for")
+
+
+def _client_ip(scope, headers: dict) -> str:
+    if RATE_LIMIT_TRUST_PROXY and b"x-forwarded-for" in headers:
+        return headers[b"x-forwarded-for"].decode("latin-1").split(",", 1)[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+#  MIDDLEWARE
+class RateLimitMiddleware:
+    """Pure ASGI: rejected requests never reach routing; admitted ones count as in flight."""
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter
+        rejected = await limiter.admit(scope)
+        if rejected is not None:
+            await _reject(send, *rejected)
+            return
+
+        limiter.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight -= 1
+
+
+async def _reject(send, status: int, retry_after: float, detail: str):
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(max(1, math.ceil(min(retry_after, MAX_RETRY_AFTER_S)))).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+rate_limiter = RateLimiter(_default_store())
+rate_limiter.register_metrics()
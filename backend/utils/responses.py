@@ -0,0 +1,39 @@
+import importlib.util
+import json
+import os
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+
+# orjson is optional; without it responses fall back to compact stdlib json
+HAS_ORJSON = importlib.util.find_spec("orjson") is not None
+if HAS_ORJSON:
+    import orjson
+
+# responses smaller than this are sent as-is (gzip would cost more than it saves)
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    App-wide default response class. Routes with a response_model still go
+    through pydantic's own JSON dump; this renders everything else
+    (plain dicts, chat answers, trusted() payloads) with orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if HAS_ORJSON:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def trusted(content: Any, status_code: int = 200, headers: Optional[dict] = None) -> FastJSONResponse:
+    """
+    Return this from a handler whose payload is already in the response_model
+    shape (built from a fixed projection, as _ticket_out does). FastAPI sends
+    Response objects untouched, so the model is skipped at runtime but still
+    documents the route in OpenAPI.
+    """
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
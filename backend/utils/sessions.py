@@ -0,0 +1,300 @@
+import os
+import re
+import secrets
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from backend.utils.bm25 import STOPWORDS
+from backend.utils.context_builder import count_tokens, trim_sentences
+from backend.utils.fast_path import FastPathMatcher, fast_path, FARE_WORDS, COVERAGE_WORDS, POINT_WORDS
+from backend.utils.metrics import count
+
+
+# "memory" (per process) or "mongo" (shared between workers, survives restarts)
+SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "memory").lower()
+# global bound on live sessions; least recently used go first
+SESSION_MAX = int(os.getenv("CHAT_SESSION_MAX", "10000"))
+SESSION_IDLE_S = float(os.getenv("CHAT_SESSION_IDLE_S", "1800"))
+# turns kept verbatim; older ones are folded into the rolling summary
+SESSION_TURNS = int(os.getenv("CHAT_SESSION_TURNS", "3"))
+SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "160"))
+# each verbatim answer is cut to this many tokens in the prompt
+TURN_ANSWER_TOKENS = int(os.getenv("CHAT_TURN_ANSWER_TOKENS", "60"))
+# only short questions are treated as follow-ups
+FOLLOW_UP_MAX_WORDS = int(os.getenv("CHAT_FOLLOW_UP_MAX_WORDS", "10"))
+
+_WORD_RE = re.compile(r"[a-z]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_CONNECTOR_RE = re.compile(r"^\s*(and|also|or|so|then|what about|how about|what of)\b[\s,]*", re.I)
+ANAPHORA_WORDS = {"it", "its", "there", "that", "those", "them", "they", "their", "this", "same", "one"}
+# words that carry no topic of their own in a follow-up
+FILLER_WORDS = STOPWORDS | ANAPHORA_WORDS | {"about", "also", "then", "so", "bus", "buses", "ticket", "tickets"}
+INTENT_PHRASES = {"fare": "fare", "coverage": "which bus companies operate", "points": "dropping points"}
+
+
+def new_session() -> dict:
+    # summary: one compact line per folded turn; turns: [question, answer]
+    # pairs; focus: catalog entities and intent of the conversation so far;
+    # last: the previous standalone question
+    return {"summary": [], "turns": [], "focus": {}, "last": ""}
+
+
+#  STORAGE BACKENDS
+class SessionStore(ABC):
+    """Backend interface; state is a plain JSON-able dict (see new_session)."""
+
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def save(self, session_id: str, state: dict):
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process store bounded by count (LRU) and idleness. The OrderedDict is
+    in last-use order, so idle sessions are always at the front and
+    eviction is a pop from the left.
+    """
+
+    def __init__(self, max_sessions: int = SESSION_MAX, idle_s: float = SESSION_IDLE_S):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_s = idle_s
+        self._lock = threading.Lock()
+        # session id -> (state, last used)
+        self._sessions: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+
+    def _evict(self, now: float):
+        while self._sessions:
+            _, (_, used) = next(iter(self._sessions.items()))
+            if now - used < self.idle_s:
+                break
+            self._sessions.popitem(last=False)
+            self.evicted_idle += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted_lru += 1
+
+    async def load(self, session_id: str) -> Optional[dict]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    async def save(self, session_id: str, state: dict):
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = (state, now)
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+
+    async def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "evicted_lru": self.evicted_lru,
+                "evicted_idle": self.evicted_idle,
+            }
+
+
+class MongoSessionStore(SessionStore):
+    """One document per session; a TTL index on updated_at does idle eviction."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def load(self, session_id: str) -> Optional[dict]:
+        doc = await self.collection.find_one({"_id": session_id}, {"_id": 0, "updated_at": 0})
+        return doc
+
+    async def save(self, session_id: str, state: dict):
+        await self.collection.replace_one(
+            {"_id": session_id},
+            {**state, "updated_at": datetime.now(timezone.utc)},
+            upsert=True,
+        )
+
+    async def delete(self, session_id: str):
+        await self.collection.delete_one({"_id": session_id})
+
+    def stats(self) -> dict:
+        return {"backend": "mongo", "collection": self.collection.name}
+
+
+def _default_store() -> SessionStore:
+    if SESSION_BACKEND == "mongo":
+        from pymongo import ASCENDING
+        from backend.database import db, INDEX_PLAN
+        collection = db["chat_sessions"]
+        INDEX_PLAN.append((collection, [("updated_at", ASCENDING)],
+                           {"name": "updated_at_ttl", "expireAfterSeconds": int(SESSION_IDLE_S)}))
+        return MongoSessionStore(collection)
+    return MemorySessionStore()
+
+
+#  SESSIONS
+class ChatSessions:
+    """
+    Multi-turn state for /chat: rewrites follow-ups into standalone questions
+    (used for fast path, retrieval and the cache) and keeps the history the
+    prompt sees at a constant size: the last few turns verbatim plus an
+    extractive rolling summary of everything older.
+    """
+
+    def __init__(self, store: SessionStore, matcher: FastPathMatcher = fast_path):
+        self.store = store
+        self.matcher = matcher
+        self.rewrites = 0
+
+    async def open(self, session_id: Optional[str]) -> Tuple[str, dict]:
+        """
+        Existing session state, or a fresh one under a new server-issued id.
+        Unknown or expired ids are never adopted, so a client cannot pick an
+        id (or guess one) and read or write another client's history.
+        """
+        if session_id:
+            state = await self.store.load(session_id)
+            if state is not None:
+                return session_id, state
+        return secrets.token_urlsafe(16), new_session()
+
+    #  QUESTION REWRITING
+    def _intent(self, words: set) -> Optional[str]:
+        if words & FARE_WORDS:
+            return "fare"
+        if words & COVERAGE_WORDS:
+            return "coverage"
+        if words & POINT_WORDS:
+            return "points"
+        return None
+
+    def rewrite(self, question: str, state: dict) -> str:
+        """
+        Standalone version of a follow-up, or the question unchanged. Uses the
+        catalog entities of earlier turns, so "and how much to Agrabad?"
+        after a Chattogram question becomes "how much to Agrabad in Chattogram".
+        """
+        focus, last = state.get("focus") or {}, state.get("last") or ""
+        words = _WORD_RE.findall(question.lower())
+        if not last or not words or len(words) > FOLLOW_UP_MAX_WORDS:
+            return question
+
+        ents = self.matcher.entities(question)
+        intent = self._intent(set(words))
+        named = any(ents.values())
+        entity_words = {w for names in ents.values() for name in names for w in _WORD_RE.findall(name.lower())}
+        topic = set(words) - entity_words - FILLER_WORDS - FARE_WORDS - COVERAGE_WORDS - POINT_WORDS
+        if named and topic:
+            # "the privacy policy of Green Line" names its own subject
+            return question
+
+        follow_up = (
+            _CONNECTOR_RE.match(question) is not None
+            or bool(set(words) & ANAPHORA_WORDS)
+            # "what about Sylhet" (a place, no intent) or "how much is it" (the reverse)
+            or named != (intent is not None)
+        )
+        if not follow_up:
+            return question
+
+        core = _CONNECTOR_RE.sub("", question).strip().rstrip("?.!").strip()
+        if not (named or intent) or not (intent or focus.get("intent")):
+            # nothing structured to carry; let retrieval see the previous question
+            rewritten = f"{core} ({last.rstrip('?.!')})"
+        else:
+            parts = [core]
+            if intent is None and focus.get("intent"):
+                parts.insert(0, INTENT_PHRASES[focus["intent"]])
+            district, point = focus.get("district"), focus.get("point")
+            if not ents["district"] and district:
+                # a new drop point only inherits the district it belongs to
+                new_point = ents["point"][0] if ents["point"] else None
+                if new_point is None or district in self.matcher.catalog.snapshot().by_point.get(new_point, {}):
+                    parts.append(f"in {district}")
+            if not ents["point"] and not ents["district"] and point and (intent or focus.get("intent")) == "fare":
+                parts.append(f"to {point}")
+            if not ents["provider"] and focus.get("provider") and (intent or focus.get("intent")) == "coverage":
+                parts.append(f"for {focus['provider']}")
+            rewritten = " ".join(parts)
+
+        if rewritten != question:
+            self.rewrites += 1
+            count("chat_rewrite")
+        return rewritten
+
+    def _update_focus(self, state: dict, standalone: str):
+        ents = self.matcher.entities(standalone)
+        intent = self._intent(set(_WORD_RE.findall(standalone.lower())))
+        # a turn with no catalog intent (refunds, policies, ...) ends the
+        # catalog thread: only the entities it names itself carry forward.
+        # Follow-ups that inherit an intent carry its phrase in `standalone`.
+        focus = dict(state.get("focus") or {}) if intent else {}
+        if ents["district"] or ents["point"]:
+            # a new place replaces the old one as a unit
+            focus.pop("district", None)
+            focus.pop("point", None)
+        for kind in ("district", "point", "provider"):
+            if len(ents[kind]) == 1:
+                focus[kind] = ents[kind][0]
+        if intent:
+            focus["intent"] = intent
+        state["focus"] = focus
+
+    #  HISTORY
+    def history(self, state: dict) -> List[str]:
+        """Prompt lines: the rolling summary, then the verbatim recent turns."""
+        lines = []
+        if state.get("summary"):
+            lines.append("Earlier: " + " ".join(state["summary"]))
+        for question, answer in state.get("turns", []):
+            lines.append(f"User: {question}")
+            lines.append(f"Assistant: {trim_sentences(answer, TURN_ANSWER_TOKENS)[0]}")
+        return lines
+
+    def _fold(self, state: dict):
+        """Move turns beyond SESSION_TURNS into the summary, oldest lines out first."""
+        turns, summary = state["turns"], state.setdefault("summary", [])
+        while len(turns) > SESSION_TURNS:
+            question, answer = turns.pop(0)
+            first = _SENTENCE_RE.split(answer.strip(), maxsplit=1)[0]
+            summary.append(f"User asked: {question.rstrip('?.!')}; answer: {first}")
+        while len(summary) > 1 and count_tokens(" ".join(summary)) > SUMMARY_TOKENS:
+            summary.pop(0)
+
+    async def record(self, session_id: str, state: dict, question: str, standalone: str, answer: str):
+        state.setdefault("turns", []).append([question, answer])
+        state["last"] = standalone
+        self._update_focus(state, standalone)
+        self._fold(state)
+        await self.store.save(session_id, state)
+
+    def stats(self) -> dict:
+        return {**self.store.stats(), "rewrites": self.rewrites}
+
+
+chat_sessions = ChatSessions(_default_store())
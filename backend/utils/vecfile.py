@@ -0,0 +1,119 @@
+"""
+On-disk vectorstore format that every worker can mmap.
+
+    store.json      manifest: format version, dtype, rows, dim
+    vectors.npy     row-normalized vectors (float32, float16 or int8)
+    scales.npy      per-row float32 scales (int8 only)
+    metas.bin       UTF-8 JSON of each meta, back to back
+    metas.idx.npy   uint64 byte offsets into metas.bin (rows + 1 entries)
+
+Nothing is copied on load: arrays come back as read-only memmaps and metas
+are decoded on access, so N uvicorn workers share one page-cache copy and
+load time does not depend on corpus size.
+"""
+import json
+import mmap
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+
+
+FORMAT_VERSION = 2
+DTYPES = ("float32", "float16", "int8")
+
+MANIFEST_NAME = "store.json"
+VECTORS_NAME = "vectors.npy"
+SCALES_NAME = "scales.npy"
+METAS_NAME = "metas.bin"
+METAS_INDEX_NAME = "metas.idx.npy"
+
+
+def quantize(normed: np.ndarray, dtype: str):
+    """Return (vectors, scales) for the requested storage dtype."""
+    if dtype == "float32":
+        return np.ascontiguousarray(normed, dtype=np.float32), None
+    if dtype == "float16":
+        return normed.astype(np.float16), None
+    if dtype == "int8":
+        scales = np.abs(normed).max(axis=1).astype(np.float32) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(normed / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales
+    raise ValueError(f"Unknown vector dtype {dtype!r}; expected one of {DTYPES}")
+
+
+def dequantize(vectors: np.ndarray, scales=None) -> np.ndarray:
+    out = np.asarray(vectors, dtype=np.float32)
+    if scales is not None:
+        out = out * np.asarray(scales, dtype=np.float32)[:, None]
+    return out
+
+
+def write_store(directory: Path, normed: np.ndarray, metas: List[dict], dtype: str = "float32"):
+    vectors, scales = quantize(normed, dtype)
+    np.save(directory / VECTORS_NAME, vectors)
+    if scales is not None:
+        np.save(directory / SCALES_NAME, scales)
+    elif (directory / SCALES_NAME).exists():
+        (directory / SCALES_NAME).unlink()
+
+    offsets = np.zeros(len(metas) + 1, dtype=np.uint64)
+    with open(directory / METAS_NAME, "wb") as f:
+        for i, meta in enumerate(metas):
+            blob = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+            f.write(blob)
+            offsets[i + 1] = offsets[i] + len(blob)
+    np.save(directory / METAS_INDEX_NAME, offsets)
+
+    # manifest last: its presence marks a complete store
+    manifest = {"format": FORMAT_VERSION, "dtype": dtype, "rows": int(normed.shape[0]),
+                "dim": int(normed.shape[1])}
+    with open(directory / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+
+def has_store(directory: Path) -> bool:
+    return (directory / MANIFEST_NAME).exists()
+
+
+def remove_store(directory: Path):
+    for name in (MANIFEST_NAME, VECTORS_NAME, SCALES_NAME, METAS_NAME, METAS_INDEX_NAME):
+        if (directory / name).exists():
+            (directory / name).unlink()
+
+
+class MmapMetas(Sequence):
+    """Read-only list of metas backed by metas.bin + metas.idx.npy."""
+
+    def __init__(self, blob_path: Path, index_path: Path):
+        self._offsets = np.load(index_path, mmap_mode="r")
+        with open(blob_path, "rb") as f:
+            # mmap refuses zero-length files
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if f.seek(0, 2) else b""
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return json.loads(self._blob[start:end].decode("utf-8"))
+
+
+def open_store(directory: Path):
+    """Return (manifest, vectors, scales, metas) without reading the data."""
+    with open(directory / MANIFEST_NAME, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported vectorstore format {manifest.get('format')!r}")
+
+    vectors = np.load(directory / VECTORS_NAME, mmap_mode="r")
+    scales = np.load(directory / SCALES_NAME, mmap_mode="r") if manifest["dtype"] == "int8" else None
+    metas = MmapMetas(directory / METAS_NAME, directory / METAS_INDEX_NAME)
+    return manifest, vectors, scales, metas
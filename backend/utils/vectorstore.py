@@ -1,38 +1,90 @@
 from pathlib import Path
 import os
 import json
+import hashlib
+import importlib.util
+import shutil
+import threading
 import numpy as np
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from backend.utils.loader import prepare_chunks 
+from backend.utils.embedder import EmbeddingBroker
+from backend.utils import vecfile
+from backend.utils.bm25 import BM25Index, has_index as has_bm25_index
+from backend.utils.metrics import stage
 
 
-try:
-    from sentence_transformers import SentenceTransformer
-    HAS_LOCAL = True
-except Exception:
-    SentenceTransformer = None
-    HAS_LOCAL = False
+# sentence_transformers (torch) and faiss are imported on first use; importing
+# torch alone takes seconds, which every worker used to pay at start-up.
+HAS_LOCAL = importlib.util.find_spec("sentence_transformers") is not None
+HAS_FAISS = importlib.util.find_spec("faiss") is not None
 
-_LOCAL_MODEL: Optional[SentenceTransformer] = None
+_LOCAL_MODEL = None
+_model_lock = threading.Lock()
+_faiss_module = None
 DEFAULT_LOCAL_MODEL = "all-MiniLM-L6-v2"
 DEFAULT_DIM = 384  
 
 BASE_DIR = Path(__file__).parent.parent
 VECTOR_DIR = BASE_DIR / "vectorstore" / "simple"
 VECTOR_DIR.mkdir(parents=True, exist_ok=True)
+# legacy (pre-mmap) layout, still readable
 EMBED_FILE = VECTOR_DIR / "embeddings.npy"
 META_FILE = VECTOR_DIR / "metas.json"
 
+# Each build goes to its own versions/vNNNNNN directory; CURRENT names the
+# live one and is swapped atomically, so readers never see a partial store.
+VERSIONS_DIR = VECTOR_DIR / "versions"
+CURRENT_FILE = VECTOR_DIR / "CURRENT"
+KEEP_VERSIONS = 3
+INDEX_NAME = "index.faiss"
+INDEX_META_NAME = "index.json"
 
-def _load_local_model() -> SentenceTransformer:
+# "flat" is exact brute force; "ivf" / "hnsw" are approximate faiss indexes
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+DEFAULT_INDEX_PARAMS = {
+    "ivf": {"nlist": None, "nprobe": 8},
+    "hnsw": {"m": 32, "ef_construction": 80, "ef_search": 128},
+}
+
+# storage dtype for vectors.npy; float16 halves and int8 quarters the size.
+# int8 also scores faster than float16, whose upcast is slow in numpy.
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float32")
+# quantized stores are scored in blocks so the float32 copy stays small
+SEARCH_BLOCK_ROWS = 16384
+
+# hybrid_search: fused = dense cosine + weight * (bm25 / max attainable bm25 of
+# the query). A pure dense hit keeps its cosine, so existing similarity
+# thresholds still apply; only a doc matching every query term at its best
+# weight gets the full `weight`, one shared word gets a share of it.
+HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "0.3"))
+# candidates taken from each side before fusing, as a multiple of k
+HYBRID_POOL_FACTOR = 4
+
+
+def _load_local_model():
     global _LOCAL_MODEL
     if _LOCAL_MODEL is None:
-        _LOCAL_MODEL = SentenceTransformer(DEFAULT_LOCAL_MODEL)
+        # warm-up and a first request may race here; load the weights once
+        with _model_lock:
+            if _LOCAL_MODEL is None:
+                from sentence_transformers import SentenceTransformer
+                _LOCAL_MODEL = SentenceTransformer(DEFAULT_LOCAL_MODEL)
     return _LOCAL_MODEL
 
+
+def _faiss():
+    global _faiss_module
+    if _faiss_module is None:
+        import faiss
+        _faiss_module = faiss
+    return _faiss_module
+
 def embed_texts_local_safe(texts: List[str]) -> np.ndarray:
     model = _load_local_model()
-    embs = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    # one batch as sent by the broker (or a build); histogram only, no request context here
+    with stage("encode"):
+        embs = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
     embs = np.asarray(embs, dtype=np.float32)
  
     if embs.shape[1] != DEFAULT_DIM:
@@ -43,73 +95,464 @@ def embed_texts_local_safe(texts: List[str]) -> np.ndarray:
     return embs
 
 
-def create_vectorstore():
-    """Create vectorstore from chunks and save embeddings + metas."""
+# Single-query encodes from concurrent requests are coalesced into batches
+query_broker = EmbeddingBroker(embed_texts_local_safe)
+
+
+def _normalize_rows(embs: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embs, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (embs / norms).astype(np.float32)
+
+
+def build_index(normed: np.ndarray, index_type: str, params: Optional[dict] = None):
+    """Build an inner-product faiss index over row-normalized vectors."""
+    if not HAS_FAISS:
+        raise RuntimeError("faiss-cpu is not installed")
+
+    faiss = _faiss()
+    n, dim = normed.shape
+    params = {**DEFAULT_INDEX_PARAMS[index_type], **(params or {})}
+    vecs = np.ascontiguousarray(normed, dtype=np.float32)
+
+    if index_type == "ivf":
+        # faiss wants ~39 training points per list
+        nlist = params["nlist"] or max(1, min(int(4 * np.sqrt(n)), n // 39))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(vecs)
+        index.add(vecs)
+        params["nlist"] = nlist
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["m"], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = params["ef_construction"]
+        index.add(vecs)
+    else:
+        raise ValueError(f"Unknown index type {index_type!r}; expected one of {INDEX_TYPES}")
+
+    apply_search_params(index, index_type, params)
+    return index, params
+
+
+def apply_search_params(index, index_type: str, params: dict):
+    if index_type == "ivf":
+        index.nprobe = params["nprobe"]
+    elif index_type == "hnsw":
+        index.hnsw.efSearch = params["ef_search"]
+
+
+def chunk_hash(text: str) -> str:
+    """Content hash of a chunk; includes the model so a model swap re-embeds."""
+    return hashlib.sha1(f"{DEFAULT_LOCAL_MODEL}\0{text}".encode("utf-8")).hexdigest()
+
+
+def active_store_dir() -> Optional[Path]:
+    """Directory of the live versioned store, or None for the legacy layout."""
+    if not CURRENT_FILE.exists():
+        return None
+    name = CURRENT_FILE.read_text(encoding="utf-8").strip()
+    return VERSIONS_DIR / name if name else None
+
+
+def current_store_version() -> Optional[str]:
+    """Cheap version probe (no data read) used by the hot-reload watcher."""
+    directory = active_store_dir()
+    if directory is not None and vecfile.has_store(directory):
+        return _store_version(directory / vecfile.MANIFEST_NAME)
     if EMBED_FILE.exists():
-        EMBED_FILE.unlink()
-    if META_FILE.exists():
-        META_FILE.unlink()
+        return _store_version(EMBED_FILE)
+    return None
+
+
+def _next_version_name() -> str:
+    VERSIONS_DIR.mkdir(parents=True, exist_ok=True)
+    numbers = [int(p.name[1:]) for p in VERSIONS_DIR.glob("v[0-9]*") if p.name[1:].isdigit()]
+    return f"v{max(numbers, default=0) + 1:06d}"
+
+
+def _write_index(directory: Path, normed: np.ndarray, index_type: str, index_params: Optional[dict]):
+    index, params = build_index(normed, index_type, index_params)
+    _faiss().write_index(index, str(directory / INDEX_NAME))
+    with open(directory / INDEX_META_NAME, "w", encoding="utf-8") as f:
+        json.dump({"type": index_type, "params": params}, f)
+    print(f"[vectorstore] saved {index_type} index -> {directory / INDEX_NAME}")
+
+
+def _publish(normed: np.ndarray, metas: List[dict], dtype: str,
+             index_type: str = "flat", index_params: Optional[dict] = None) -> Path:
+    """Write a new store version and atomically point CURRENT at it."""
+    name = _next_version_name()
+    staging = VERSIONS_DIR / f".{name}.tmp"
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    if index_type != "flat":
+        _write_index(staging, normed, index_type, index_params)
+    BM25Index.build([m["text"] for m in metas]).save(staging)
+    vecfile.write_store(staging, normed, metas, dtype=dtype)
+
+    final = VERSIONS_DIR / name
+    os.rename(staging, final)
+    pointer = VECTOR_DIR / ".CURRENT.tmp"
+    pointer.write_text(name, encoding="utf-8")
+    os.replace(pointer, CURRENT_FILE)
+
+    # old versions stay briefly for workers that still have them mapped
+    versions = sorted(p for p in VERSIONS_DIR.glob("v[0-9]*") if p.is_dir())
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(old, ignore_errors=True)
+    return final
+
+
+def _reusable_vectors() -> dict:
+    """hash -> normalized float32 vector from the live store, if compatible."""
+    try:
+        store = load_vectorstore()
+    except (FileNotFoundError, ValueError):
+        return {}
+    if store.dim != DEFAULT_DIM:
+        return {}
+
+    rows = {}
+    for i in range(len(store)):
+        meta = store.metas[i]
+        rows.setdefault(meta.get("hash") or chunk_hash(meta["text"]), i)
+    if not rows:
+        return {}
+
+    idx = np.fromiter(rows.values(), dtype=np.int64, count=len(rows))
+    scales = store.scales[idx] if store.scales is not None else None
+    vecs = _normalize_rows(vecfile.dequantize(store.normed[idx], scales))
+    return dict(zip(rows.keys(), vecs))
+
+
+def _live_settings() -> dict:
+    """index type/params and dtype of the live store, to carry into rebuilds."""
+    directory = active_store_dir()
+    settings = {"index_type": "flat", "index_params": None, "dtype": VECTOR_DTYPE}
+    if directory is None or not vecfile.has_store(directory):
+        return settings
+
+    with open(directory / vecfile.MANIFEST_NAME, "r", encoding="utf-8") as f:
+        settings["dtype"] = json.load(f)["dtype"]
+    if (directory / INDEX_META_NAME).exists():
+        with open(directory / INDEX_META_NAME, "r", encoding="utf-8") as f:
+            index_meta = json.load(f)
+        settings["index_type"] = index_meta["type"]
+        settings["index_params"] = index_meta["params"]
+    return settings
+
+
+def create_vectorstore(index_type: Optional[str] = None,
+                       index_params: Optional[dict] = None,
+                       dtype: Optional[str] = None,
+                       full: bool = False) -> Path:
+    """
+    Build a new store version from loader chunks and make it live.
+    Chunks whose content hash is already in the live store reuse its vector;
+    only new or changed chunks are embedded (all of them when `full`).
+    Index type and dtype default to those of the live store.
+    """
+    live = _live_settings()
+    if index_type is None:
+        index_type = live["index_type"]
+        index_params = index_params or live["index_params"]
+    dtype = dtype or live["dtype"]
+
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}; expected one of {INDEX_TYPES}")
+    if dtype not in vecfile.DTYPES:
+        raise ValueError(f"Unknown vector dtype {dtype!r}; expected one of {vecfile.DTYPES}")
 
     chunks = prepare_chunks()
     if not chunks:
         raise ValueError("No chunks found")
 
-    print(f"[vectorstore] embedding {len(chunks)} chunks")
-    embs = embed_texts_local_safe(chunks)
-    np.save(EMBED_FILE, embs)
+    hashes = [chunk_hash(t) for t in chunks]
+    known = {} if full else _reusable_vectors()
+    missing = [i for i, h in enumerate(hashes) if h not in known]
 
-    metas = [{"text": t} for t in chunks]
-    with open(META_FILE, "w", encoding="utf-8") as f:
-        json.dump(metas, f, ensure_ascii=False)
+    normed = np.empty((len(chunks), DEFAULT_DIM), dtype=np.float32)
+    for i, h in enumerate(hashes):
+        if h in known:
+            normed[i] = known[h]
+    if missing:
+        print(f"[vectorstore] embedding {len(missing)} new/changed chunks "
+              f"({len(chunks) - len(missing)} reused)")
+        normed[missing] = _normalize_rows(embed_texts_local_safe([chunks[i] for i in missing]))
+    else:
+        print(f"[vectorstore] all {len(chunks)} chunks unchanged; re-publishing")
+
+    metas = [{"text": t, "hash": h} for t, h in zip(chunks, hashes)]
+    final = _publish(normed, metas, dtype, index_type, index_params)
+    print(f"[vectorstore] saved {len(chunks)} {dtype} vectors -> {final}")
+    return final
+
+class SimpleVectorStore:
+    def __init__(self, vectors: np.ndarray, metas: Sequence[dict], version: str = "",
+                 index=None, index_type: str = "flat", scales: Optional[np.ndarray] = None,
+                 lexical: Optional[BM25Index] = None):
+        """
+        `vectors` must already be row-normalized (use from_embeddings for raw
+        embeddings). They may be float16, or int8 with per-row `scales`, and
+        may be read-only memmaps shared with other workers.
+        """
+        self.normed = vectors
+        self.scales = scales
+        self.metas = metas
+        # identifies the files this store was loaded from; caches keyed on
+        # search results use it to notice a rebuilt store
+        self.version = version
+        self.dim = int(vectors.shape[1]) if vectors.ndim == 2 else 0
+        # optional faiss index; None means exact brute-force search
+        self.index = index
+        self.index_type = index_type if index is not None else "flat"
+        # optional BM25 index over the same chunks, used by hybrid_search
+        self.lexical = lexical
+
+    @classmethod
+    def from_embeddings(cls, embs: np.ndarray, metas: Sequence[dict], **kwargs):
+        return cls(_normalize_rows(np.asarray(embs, dtype=np.float32)), metas, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.metas)
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        return self._fit_dim(query_broker.embed(query))
+
+    async def _aembed_query(self, query: str) -> np.ndarray:
+        return self._fit_dim(await query_broker.aembed(query))
+
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """(len(queries), dim) embeddings from a single encode call."""
+        return self._fit_dim(query_broker.embed_many(queries))
+
+    def _fit_dim(self, q_emb: np.ndarray) -> np.ndarray:
+        # one query (dim,) or a batch (m, dim); fits the last axis
+        q_emb = np.asarray(q_emb, dtype=np.float32)
+
+        if q_emb.shape[-1] != self.dim:
+            if q_emb.shape[-1] > self.dim:
+                q_emb = q_emb[..., :self.dim]
+            else:
+                pad = np.zeros(q_emb.shape[:-1] + (self.dim - q_emb.shape[-1],), dtype=np.float32)
+                q_emb = np.concatenate([q_emb, pad], axis=-1)
+        return q_emb
+
+    def search_by_vector(self, q_emb: np.ndarray, k: int = 4) -> List[dict]:
+        ids, scores = self._dense_top(_unit(q_emb), k)
+        return [{"score": float(s), "text": self.metas[i]["text"], "id": int(i)} for i, s in zip(ids, scores)]
+
+    def hybrid_search(self, query: str, q_emb: np.ndarray, k: int = 4,
+                      lexical_weight: float = HYBRID_LEXICAL_WEIGHT) -> List[dict]:
+        """
+        Dense + BM25 fusion. Each side contributes its top k * HYBRID_POOL_FACTOR
+        candidates; lexical-only candidates get their exact dense score.
+        Falls back to search_by_vector when the store has no BM25 index.
+        """
+        if self.lexical is None or lexical_weight <= 0:
+            return self.search_by_vector(q_emb, k)
+
+        q_norm = _unit(q_emb)
+        dense_ids, dense_scores = self._dense_top(q_norm, k * HYBRID_POOL_FACTOR)
+        return self._fuse(query, q_norm, dense_ids, dense_scores, k, lexical_weight)
+
+    def hybrid_search_batch(self, queries: List[str], q_embs: np.ndarray, k: int = 4,
+                            lexical_weight: float = HYBRID_LEXICAL_WEIGHT) -> List[List[dict]]:
+        """
+        hybrid_search for many queries at once: the dense side is one
+        matrix-matrix product (or one batched faiss search) with a per-row
+        top-k; BM25 and fusion stay per query.
+        """
+        if not queries:
+            return []
+        q_norms = _unit_rows(q_embs)
+        use_lexical = self.lexical is not None and lexical_weight > 0
+        pool = k * HYBRID_POOL_FACTOR if use_lexical else k
+        dense = self._dense_top_batch(q_norms, pool)
+
+        if not use_lexical:
+            return [
+                [{"score": float(s), "text": self.metas[i]["text"], "id": int(i)} for i, s in zip(ids, scores)]
+                for ids, scores in dense
+            ]
+        return [
+            self._fuse(query, q_norm, ids, scores, k, lexical_weight)
+            for query, q_norm, (ids, scores) in zip(queries, q_norms, dense)
+        ]
+
+    def _fuse(self, query: str, q_norm: np.ndarray, dense_ids: np.ndarray,
+              dense_scores: np.ndarray, k: int, lexical_weight: float) -> List[dict]:
+        pool = k * HYBRID_POOL_FACTOR
+        lex_ids, lex_scores = self.lexical.top(query, pool)
+
+        dense = dict(zip(dense_ids.tolist(), dense_scores.tolist()))
+        lexical = {}
+        if lex_ids.size:
+            ceiling = max(self.lexical.max_score(query), float(lex_scores[0]))
+            lexical = dict(zip(lex_ids.tolist(), (lex_scores / ceiling).tolist()))
+            extra = [i for i in lexical if i not in dense]
+            if extra:
+                dense.update(zip(extra, self._row_scores(q_norm, np.asarray(extra)).tolist()))
+
+        fused = sorted(
+            ((dense[i] + lexical_weight * lexical.get(i, 0.0), i) for i in dense),
+            reverse=True,
+        )[:k]
+        return [
+            {"score": score, "text": self.metas[i]["text"], "id": i,
+             "dense": dense[i], "lexical": lexical.get(i, 0.0)}
+            for score, i in fused
+        ]
+
+    def _dense_top(self, q_norm: np.ndarray, k: int):
+        if self.index is not None:
+            scores, ids = self.index.search(q_norm[None, :], k)
+            keep = ids[0] >= 0
+            return ids[0][keep], scores[0][keep]
+
+        sims = self._scores(q_norm)
+        n = sims.shape[0]
+        if k < n:
+            # O(n) selection of the top k, then sort only those
+            idx = np.argpartition(-sims, k)[:k]
+            idx = idx[np.argsort(-sims[idx])]
+        else:
+            idx = np.argsort(-sims)
+        return idx, sims[idx]
+
+    def _dense_top_batch(self, q_norms: np.ndarray, k: int):
+        """Per-row (ids, scores) for an (m, dim) block of unit queries."""
+        if self.index is not None:
+            scores, ids = self.index.search(np.ascontiguousarray(q_norms), k)
+            return [(row_ids[row_ids >= 0], row_scores[row_ids >= 0])
+                    for row_ids, row_scores in zip(ids, scores)]
+
+        sims = self._scores_batch(q_norms)
+        n = sims.shape[1]
+        if k < n:
+            idx = np.argpartition(-sims, k, axis=1)[:, :k]
+            top = np.take_along_axis(sims, idx, axis=1)
+            order = np.argsort(-top, axis=1)
+            idx = np.take_along_axis(idx, order, axis=1)
+        else:
+            idx = np.argsort(-sims, axis=1)
+        top = np.take_along_axis(sims, idx, axis=1)
+        return list(zip(idx, top))
+
+    def vectors(self, ids: Sequence[int]) -> np.ndarray:
+        """Stored unit vectors of the given chunk ids as float32 (dequantized)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        return vecfile.dequantize(self.normed[ids], self.scales[ids] if self.scales is not None else None)
+
+    def _row_scores(self, q_norm: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        rows = np.asarray(self.normed[ids], dtype=np.float32)
+        sims = rows @ q_norm
+        if self.scales is not None:
+            sims *= self.scales[ids]
+        return sims
+
+    def _scores(self, q_norm: np.ndarray) -> np.ndarray:
+        if self.normed.dtype == np.float32:
+            return np.asarray(self.normed @ q_norm, dtype=np.float32)
+
+        n = self.normed.shape[0]
+        sims = np.empty(n, dtype=np.float32)
+        for start in range(0, n, SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, n)
+            block = np.asarray(self.normed[start:end], dtype=np.float32) @ q_norm
+            if self.scales is not None:
+                block *= self.scales[start:end]
+            sims[start:end] = block
+        return sims
+
+    def _scores_batch(self, q_norms: np.ndarray) -> np.ndarray:
+        """(m, n) cosine scores; quantized stores are upcast block by block."""
+        if self.normed.dtype == np.float32:
+            return np.asarray(q_norms @ self.normed.T, dtype=np.float32)
+
+        n = self.normed.shape[0]
+        sims = np.empty((q_norms.shape[0], n), dtype=np.float32)
+        for start in range(0, n, SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, n)
+            block = q_norms @ np.asarray(self.normed[start:end], dtype=np.float32).T
+            if self.scales is not None:
+                block *= self.scales[start:end]
+            sims[:, start:end] = block
+        return sims
+
+    def similarity_search(self, query: str, k: int = 4) -> List[dict]:
+        return self.hybrid_search(query, self._embed_query(query), k=k)
+
+
+def _unit(q_emb: np.ndarray) -> np.ndarray:
+    return (q_emb / (np.linalg.norm(q_emb) + 1e-12)).astype(np.float32)
+
+
+def _unit_rows(q_embs: np.ndarray) -> np.ndarray:
+    q_embs = np.asarray(q_embs, dtype=np.float32)
+    return (q_embs / (np.linalg.norm(q_embs, axis=1, keepdims=True) + 1e-12)).astype(np.float32)
+
+
+def _store_version(path: Path) -> str:
+    st = path.stat()
+    return f"{path.parent.name}:{st.st_mtime_ns}-{st.st_size}"
+
+
+def _load_index(directory: Path):
+    index_file, meta_file = directory / INDEX_NAME, directory / INDEX_META_NAME
+    if not (index_file.exists() and meta_file.exists()):
+        return None, "flat"
+    if not HAS_FAISS:
+        print("[vectorstore] faiss not installed; ignoring ANN index, using brute force")
+        return None, "flat"
+
+    with open(meta_file, "r", encoding="utf-8") as f:
+        index_meta = json.load(f)
+    faiss = _faiss()
+    try:
+        # shares pages across workers where the index type supports it
+        index = faiss.read_index(str(index_file), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        index = faiss.read_index(str(index_file))
+    apply_search_params(index, index_meta["type"], index_meta["params"])
+    return index, index_meta["type"]
 
-    print(f"[vectorstore] saved {len(chunks)} embeddings -> {EMBED_FILE}")
 
 def load_vectorstore():
     """Load persisted vectorstore and provide similarity search."""
-    if not EMBED_FILE.exists() or not META_FILE.exists():
+    directory = active_store_dir()
+    if directory is not None and vecfile.has_store(directory):
+        _, vectors, scales, metas = vecfile.open_store(directory)
+        version = _store_version(directory / vecfile.MANIFEST_NAME)
+    elif EMBED_FILE.exists() and META_FILE.exists():
+        # legacy layout: fully loaded and normalized per process
+        directory = VECTOR_DIR
+        vectors = _normalize_rows(np.load(EMBED_FILE))
+        scales = None
+        with open(META_FILE, "r", encoding="utf-8") as f:
+            metas = json.load(f)
+        version = _store_version(EMBED_FILE)
+    else:
         raise FileNotFoundError("Vector store missing; run create_vectorstore() first.")
 
-    embs = np.load(EMBED_FILE)
-    with open(META_FILE, "r", encoding="utf-8") as f:
-        metas = json.load(f)
-
-    class SimpleVectorStore:
-        def __init__(self, embs: np.ndarray, metas: List[dict]):
-            self.embs = embs
-            self.metas = metas
-            norms = np.linalg.norm(self.embs, axis=1, keepdims=True)
-            norms[norms == 0] = 1.0
-            self.normed = self.embs / norms
-            self.dim = int(self.embs.shape[1]) if self.embs.ndim == 2 else 0
-
-        def _embed_query(self, query: str) -> np.ndarray:
-            q_emb = embed_texts_local_safe([query])[0]
-            q_emb = np.asarray(q_emb, dtype=np.float32)
-            
-            if q_emb.shape[0] != self.dim:
-                if q_emb.shape[0] > self.dim:
-                    q_emb = q_emb[:self.dim]
-                else:
-                    pad = np.zeros((self.dim - q_emb.shape[0],), dtype=np.float32)
-                    q_emb = np.concatenate([q_emb, pad], axis=0)
-            return q_emb
-
-        def similarity_search(self, query: str, k: int = 4) -> List[dict]:
-            q_emb = self._embed_query(query)
-            q_norm = q_emb / (np.linalg.norm(q_emb) + 1e-12)
-            sims = (self.normed @ q_norm).astype(np.float32)
-            idx = np.argsort(-sims)[:k]
-            return [{"score": float(sims[i]), "text": self.metas[i]["text"]} for i in idx]
-
-    return SimpleVectorStore(embs, metas)
+    index, index_type = _load_index(directory)
+    lexical = None
+    if has_bm25_index(directory):
+        lexical = BM25Index.load(directory)
+    else:
+        # indexing is a build-time job; republish with create_vectorstore() to get it
+        print(f"[vectorstore] no BM25 index in {directory}; hybrid search falls back to dense only")
+    return SimpleVectorStore(vectors, metas, version=version,
+                             index=index, index_type=index_type, scales=scales,
+                             lexical=lexical)
 
 def create_dummy_vectorstore(n: int = 12, dim: int = 64) -> np.ndarray:
     """Create a dummy vectorstore for testing without embeddings."""
     chunks = [f"dummy doc {i}: sample info" for i in range(n)]
     embs = np.random.uniform(-1.0, 1.0, size=(n, dim)).astype(np.float32)
-    np.save(EMBED_FILE, embs)
     metas = [{"text": t} for t in chunks]
-    with open(META_FILE, "w", encoding="utf-8") as f:
-        json.dump(metas, f, ensure_ascii=False)
-    print(f"Created dummy vectorstore with {n} docs at {VECTOR_DIR}")
+    final = _publish(_normalize_rows(embs), metas, dtype="float32")
+    print(f"Created dummy vectorstore with {n} docs at {final}")
     return embs
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import sys
+from typing import List, Optional, Tuple
+
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+GROUP_COMMIT_ENABLED = os.getenv("TICKET_GROUP_COMMIT", "false").lower() in ("true", "1", "yes")
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("TICKET_GROUP_COMMIT_MAX_BATCH", "128"))
+GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("TICKET_GROUP_COMMIT_MAX_DELAY_MS", "5"))
+GROUP_COMMIT_MAX_QUEUE = int(os.getenv("TICKET_GROUP_COMMIT_MAX_QUEUE", "5000"))
+GROUP_COMMIT_ENQUEUE_TIMEOUT_S = float(os.getenv("TICKET_GROUP_COMMIT_ENQUEUE_TIMEOUT_S", "0.25"))
+
+
+class WriteQueueFull(Exception):
+    """The ingest queue stayed full past the enqueue timeout; answer 503."""
+
+
+class InsertBatcher:
+    """
+    Group-commit front for `collection.insert_many`.
+
+    insert() queues one document and waits on a future. A single flusher
+    task takes the first queued document, keeps collecting for up to
+    `max_delay_ms` or `max_batch` documents, and writes them with one
+    unordered insert_many using a journaled majority write concern. Each
+    future resolves only after that write is acknowledged, so a caller never
+    reports success for a ticket that is not durable. The queue is bounded:
+    when it stays full past `enqueue_timeout_s`, insert() raises
+    WriteQueueFull instead of piling up latency.
+    """
+
+    def __init__(self,
+                 collection,
+                 max_batch: int = GROUP_COMMIT_MAX_BATCH,
+                 max_delay_ms: float = GROUP_COMMIT_MAX_DELAY_MS,
+                 max_queue: int = GROUP_COMMIT_MAX_QUEUE,
+                 enqueue_timeout_s: float = GROUP_COMMIT_ENQUEUE_TIMEOUT_S):
+        self.collection = collection.with_options(write_concern=WriteConcern(w="majority", j=True))
+        self.max_batch = max(1, max_batch)
+        self.max_delay_s = max(0.0, max_delay_ms) / 1000.0
+        self.max_queue = max_queue
+        self.enqueue_timeout_s = enqueue_timeout_s
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.inserted = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._flusher())
+
+    async def stop(self):
+        """Flush everything already queued, then stop the flusher."""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def insert(self, doc: dict):
+        """Queue one document; returns its inserted _id once durable."""
+        if not self.running:
+            raise RuntimeError("InsertBatcher is not started")
+
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(self._queue.put((doc, fut)), timeout=self.enqueue_timeout_s)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise WriteQueueFull()
+        return await fut
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "inserted": self.inserted,
+            "avg_batch": (self.inserted / self.batches) if self.batches else 0.0,
+            "rejected": self.rejected,
+        }
+
+    async def _collect(self) -> List[Tuple[dict, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_delay_s
+
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flusher(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                print("[write_behind] flush failed:", e, file=sys.stderr)
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]):
+        docs = [doc for doc, _ in batch]
+        failed = {}
+
+        try:
+            # insert_many assigns _id on each doc before sending
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                failed[err["index"]] = PyMongoError(err.get("errmsg", "write error"))
+            if e.details.get("writeConcernErrors"):
+                # written but not confirmed durable: fail every caller
+                failed = {i: PyMongoError("write concern not satisfied") for i in range(len(docs))}
+
+        self.batches += 1
+        self.inserted += len(docs) - len(failed)
+        for i, (doc, fut) in enumerate(batch):
+            if fut.done():
+                continue
+            if i in failed:
+                fut.set_exception(failed[i])
+            else:
+                fut.set_result(doc["_id"])
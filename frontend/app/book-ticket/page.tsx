@@ -1,16 +1,15 @@
 'use client';
 
 import React, { useState, useEffect } from 'react';
-import busDataJson from '@/utils/busData.json';
-import { BusData, District, DroppingPoint } from '@/types/types';
+import { District, DroppingPoint } from '@/types/types';
+import { useBusData } from '@/utils/useBusData';
 import { useRouter } from 'next/navigation';
 import { useAppContext } from '@/contexts/AppContext';
 
-const busData: BusData = busDataJson as BusData;
-
 const BookTicketPage: React.FC = () => {
     const { user } = useAppContext();
     const router = useRouter();
+    const busData = useBusData();
     const [district, setDistrict] = useState<string>('');
     const [dropPoint, setDropPoint] = useState<string>('');
     const [price, setPrice] = useState<number>(0);
@@ -21,6 +21,8 @@ export default function ChatWidget({ excludePages = [] }: ChatWidgetProps) {
     const [input, setInput] = useState("");
     const [loading, setLoading] = useState(false);
     const messagesEndRef = useRef<HTMLDivElement | null>(null);
+    // server-side conversation; history stays on the server, only the id is sent
+    const sessionIdRef = useRef<string | null>(null);
 
     // 🔥 Your AI branding
     const AI_NAME = "Nexo AI";
@@ -44,19 +46,61 @@ export default function ChatWidget({ excludePages = [] }: ChatWidgetProps) {
         setLoading(true);
 
         try {
-            const res = await fetch("http://localhost:8000/chat/ask", {
+            const res = await fetch("http://localhost:8000/chat/stream", {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ q: trimmed }),
+                body: JSON.stringify({ q: trimmed, session_id: sessionIdRef.current }),
             });
-
-            const data = await res.json();
-            const aiMessage: Message = {
-                sender: "ai",
-                text: data.answer || "Hmm… couldn't process that!",
+            if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+            // Read Server-Sent Events and grow the AI bubble as deltas arrive
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = "";
+            let started = false;
+
+            const appendDelta = (text: string) => {
+                if (!started) {
+                    started = true;
+                    setLoading(false);
+                    setMessages((prev) => [...prev, { sender: "ai", text }]);
+                    return;
+                }
+                setMessages((prev) => {
+                    const last = prev[prev.length - 1];
+                    return [...prev.slice(0, -1), { ...last, text: last.text + text }];
+                });
             };
 
-            setMessages((prev) => [...prev, aiMessage]);
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                let sep: number;
+                while ((sep = buffer.indexOf("\n\n")) !== -1) {
+                    const frame = buffer.slice(0, sep);
+                    buffer = buffer.slice(sep + 2);
+
+                    const event = frame.match(/^event: (.*)$/m)?.[1];
+                    const data = frame.match(/^data: (.*)$/m)?.[1];
+                    if (event === "delta" && data) appendDelta(JSON.parse(data).text);
+                    if (event === "done" && data) sessionIdRef.current = JSON.parse(data).session_id ?? sessionIdRef.current;
+                    if (event === "error" && data) {
+                        // the answer so far is cut off; say so instead of passing it off as complete
+                        const info = JSON.parse(data);
+                        sessionIdRef.current = info.session_id ?? sessionIdRef.current;
+                        appendDelta(` (${info.message})`);
+                    }
+                }
+            }
+
+            if (!started) {
+                setMessages((prev) => [
+                    ...prev,
+                    { sender: "ai", text: "Hmm… couldn't process that!" },
+                ]);
+            }
         } catch (err) {
             setMessages((prev) => [
                 ...prev,
@@ -1,11 +1,10 @@
 "use client";
 
 import React, { useState, useEffect } from "react";
-import busDataJson from "@/utils/busData.json";
-import { BusData, District, DroppingPoint } from "@/types/types";
+import { District, DroppingPoint } from "@/types/types";
+import { useBusData } from "@/utils/useBusData";
 import { toast } from "react-toastify";
 
-const busData: BusData = busDataJson as BusData;
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://127.0.0.1:8000";
 
 interface TicketFormProps {
@@ -14,6 +13,7 @@ interface TicketFormProps {
 }
 
 const TicketForm: React.FC<TicketFormProps> = ({ open, onClose }) => {
+    const busData = useBusData();
     const [district, setDistrict] = useState<string>("");
     const [dropPoint, setDropPoint] = useState<string>("");
     const [price, setPrice] = useState<number>(0);
@@ -0,0 +1,47 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import { BusData } from "@/types/types";
+
+const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://127.0.0.1:8000";
+
+// Module-level copy so every form shares one fetch per page load.
+// The browser HTTP cache revalidates with If-None-Match (ETag from /routes).
+let cached: BusData | null = null;
+let pending: Promise<BusData> | null = null;
+
+function fetchBusData(): Promise<BusData> {
+    if (!pending) {
+        pending = fetch(`${API_BASE}/routes`)
+            .then((res) => {
+                if (!res.ok) throw new Error(`GET /routes failed: ${res.status}`);
+                return res.json() as Promise<BusData>;
+            })
+            .then((data) => {
+                cached = data;
+                return data;
+            })
+            .catch((err) => {
+                pending = null;
+                throw err;
+            });
+    }
+    return pending;
+}
+
+export function useBusData(): BusData {
+    const [busData, setBusData] = useState<BusData>(cached || { districts: [] });
+
+    useEffect(() => {
+        if (cached) return;
+        let active = true;
+        fetchBusData()
+            .then((data) => active && setBusData(data))
+            .catch((err) => console.error(err));
+        return () => {
+            active = false;
+        };
+    }, []);
+
+    return busData;
+}